@@ -1,11 +1,9 @@
+import time
+_run_started = time.perf_counter()
+
 import streamlit as st
-import FinanceDataReader as fdr
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-import requests
-from bs4 import BeautifulSoup
+from yisoo import prewarm
+from yisoo.timing import span, start_trace, timed
 
 # --- 🔒 자물쇠(비밀번호) 보안 장치 ---
 def check_password():
@@ -29,29 +27,93 @@ def check_password():
     else:
         return True
 
-if not check_password():
+# --- [구간별 속도 계측: 이번 화면 그리기의 구간 목록 (사이드바 디버그 표 + JSON 줄 기록)] ---
+run_spans = start_trace()
+
+with span("password_gate"):
+    is_authed = check_password()
+if not is_authed:
+    prewarm.mark("gate", _run_started)
     st.stop()
 
+# --- [무거운 부품은 자물쇠를 통과한 뒤에야 부른다 (자물쇠 화면은 streamlit 만으로 바로 뜸)] ---
+import pandas as pd
+from datetime import datetime, timedelta
+from functools import partial
+from zoneinfo import ZoneInfo
+from yisoo import http_pool, memo, price_panel, rate_limit, sessions
+from yisoo.bar_store import BarStore
+from yisoo.incremental import diagnose_layered
+from yisoo.scanner import krx_universe, scan
+from yisoo.name_index import NameIndex, load_us_listings
+from yisoo.market_feed import fetch_global_quotes, fetch_kr_history, fetch_kr_quote, fetch_us_history, fetch_us_quote, naver_item_page
+from yisoo.live import poller_for
+from yisoo.rate_limit import purpose
+from yisoo.replay import fdr_listing, yf_fast_info, yf_name
+from yisoo.shared_cache import CACHE as SHARED
+from yisoo.params import DEFAULT_MACRO as MACRO, DEFAULT_PARAMS as PARAMS
+from yisoo.volume_profile import volume_curve
+
 # --- [보급로 최적화 캐싱 장치: 반응속도 극대화 조율] ---
-@st.cache_data(ttl=3600)
+# 시세·일봉·상장목록은 세션끼리 공용 창고(SHARED)에서 나눠 쓰고, 동시 요청은 한 번만 출격
 def load_krx_listing():
-    try: return fdr.StockListing('KRX')
+    try: return SHARED.get("listing", "KRX", lambda: fdr_listing('KRX'))
     except: return pd.DataFrame()
 
-@st.cache_data(ttl=10) # 10초 단위로 신선도 유지
+def read_history(symbol, start_date, fetcher):
+    # 밤에 떠 둔 가격 판이 덮는 국내 종목은 몸통을 판에서 (SQLite 안 거침), 판 뒤 꼬리만 저장소에서
+    df = price_panel.history(symbol, start_date, get_bar_store(), fetcher) if symbol.isdigit() else None
+    return get_bar_store().history(symbol, start_date, fetcher) if df is None else df
+
+def load_history(symbol, start_date, fetcher):
+    key = (symbol, start_date.date())
+    with span("history", source="bar_store", symbol=symbol) as rec:
+        df = SHARED.get("history", key, lambda: read_history(symbol, start_date, fetcher))
+        rec["rows"] = len(df)
+        if df.empty:
+            SHARED.invalidate("history", key)  # 못 받은 빈 일봉은 10분씩 붙들지 않음
+            rec["outcome"] = "empty"
+    return df
+
+@st.cache_resource
+def open_name_index():
+    # 디스크 색인만 연다 (네트워크 없음) - 다시 짓기는 같은 객체를 제자리에서 고친다
+    return NameIndex.load()
+
+def refresh_name_index():
+    # 비었거나 하루 지난 색인만 상장 목록 4개를 받아 다시 짓는다 (실패하면 잠시 쉬었다가 다음 접근 때 다시)
+    open_name_index().refresh(load_krx_listing, load_us_listings)
+
+def get_name_index():
+    # 그리는 길에서는 목록을 받지 않는다: 묵은 색인이면 뒤에서 다시 짓게 걸어 두고 지금 것을 그대로 씀
+    idx = open_name_index()
+    if idx.is_stale():
+        prewarm.submit(refresh_name_index)
+    return idx
+
+@st.cache_resource
+def get_bar_store():
+    return BarStore()
+
+# --- [입력만 고친 재실행: 평단가·수동가 칸을 고치면 방금 받은 일봉·시세를 그대로 쓰고 진단 아래층만 다시 계산] ---
+FEED_PIN_SEC = 300  # 이보다 오래된 보급은 새로 받음 (🔄 정밀 분석은 언제나 새로 받음)
+
+def keep_feed():
+    st.session_state["_keep_feed"] = True
+
+def pinned_feed(symbol, keep):
+    pin = st.session_state.get("_feed")
+    if keep and pin and pin[0] == symbol and time.monotonic() - pin[1] < FEED_PIN_SEC:
+        return pin[2]
+    return None
+
+def pin_feed(symbol, *values):
+    st.session_state["_feed"] = (symbol, time.monotonic(), values)
+
+@timed("global_market")
 def fetch_global_market():
-    nasdaq = yf.Ticker("^IXIC").fast_info
-    sp500 = yf.Ticker("^GSPC").fast_info
-    dow = yf.Ticker("^DJI").fast_info
-    tnx = yf.Ticker("^TNX").fast_info
-    usdkrw = yf.Ticker("USDKRW=X").fast_info
-    return {
-        "n_last": nasdaq.last_price, "n_prev": nasdaq.previous_close,
-        "s_last": sp500.last_price, "s_prev": sp500.previous_close,
-        "d_last": dow.last_price, "d_prev": dow.previous_close,
-        "t_last": tnx.last_price, "t_prev": tnx.previous_close,
-        "u_last": usdkrw.last_price, "u_prev": usdkrw.previous_close
-    }
+    # 5대 지표 동시 호출 (지표당 3초 한도, 늦은 지표는 빈칸으로 두고 나머지만 표출) - 공용 창고 수명은 장 상태를 따름 (정규장 10초)
+    return fetch_global_quotes(timeout=3)
 
 # 1. 스타일 및 화면 구성
 st.set_page_config(page_title="이수할아버지의 냉정 진단기 v36062", layout="wide")
@@ -100,35 +162,59 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+# --- [실시간 스트리밍 모드: 켜 두면 시세 구역만 주기적으로 다시 그림 (전체 재실행·CSS·자물쇠 통과 생략)] ---
+# 주기는 정규장 기준. 장 전/후엔 장 달력(sessions)이 느슨히 늘리고, 장이 닫혀 있으면 멈춘다
+LIVE_SEC = 3          # 종목 시세/신호등 갱신 주기
+LIVE_GLOBAL_SEC = 10  # 글로벌 지표 갱신 주기 (fetch_global_market 캐시 수명과 맞춤)
+live_mode = st.session_state.get("live_mode", False)
+
+@st.fragment(run_every=sessions.poll_interval(regular=LIVE_GLOBAL_SEC) if live_mode else None)
 def display_global_risk():
     st.markdown("### 🌍 글로벌 5대 지수 및 환율·국채 종합 전황")
     try:
         data = fetch_global_market()
-        n_chg = (data["n_last"] / data["n_prev"] - 1) * 100
-        s_chg = (data["s_last"] / data["s_prev"] - 1) * 100
-        d_chg = (data["d_last"] / data["d_prev"] - 1) * 100
-        tnx_val, tnx_chg = data["t_last"], (data["t_last"] / data["t_prev"] - 1) * 100
-        u_val, u_chg = data["u_last"], (data["u_last"] / data["u_prev"] - 1) * 100
-        
+
+        def pct(key):
+            last, prev = data[f"{key}_last"], data[f"{key}_prev"]
+            return (last / prev - 1) * 100 if last is not None and prev else None
+
+        n_chg, s_chg, d_chg = pct("n"), pct("s"), pct("d")
+        tnx_val, tnx_chg = data["t_last"], pct("t")
+        u_val, u_chg = data["u_last"], pct("u")
+
+        def show(col, label, val, chg, val_fmt):
+            if val is None:
+                col.metric(label, "-", "지연")
+            else:
+                col.metric(label, val_fmt.format(val), f"{chg:+.2f}%" if chg is not None else None)
+
         c1, c2, c3, c4, c5 = st.columns(5)
-        c1.metric("나스닥 (NASDAQ)", f"{data['n_last']:,.2f}", f"{n_chg:+.2f}%")
-        c2.metric("S&P 500 (SPX)", f"{data['s_last']:,.2f}", f"{s_chg:+.2f}%")
-        c3.metric("다우존스 (DJI)", f"{data['d_last']:,.2f}", f"{d_chg:+.2f}%")
-        c4.metric("미 국채 10년 (TNX)", f"{tnx_val:.3f}%", f"{tnx_chg:+.2f}%")
-        c5.metric("원/달러 환율", f"{u_val:,.2f}원", f"{u_chg:+.2f}%")
-        
-       # 1. 미 증시 3대 지수 평균 및 방향성 진단
-        avg_us_chg = (n_chg + s_chg + d_chg) / 3
-        pos_cnt = sum([n_chg > 0, s_chg > 0, d_chg > 0])
-        neg_cnt = sum([n_chg < 0, s_chg < 0, d_chg < 0])
+        show(c1, "나스닥 (NASDAQ)", data["n_last"], n_chg, "{:,.2f}")
+        show(c2, "S&P 500 (SPX)", data["s_last"], s_chg, "{:,.2f}")
+        show(c3, "다우존스 (DJI)", data["d_last"], d_chg, "{:,.2f}")
+        show(c4, "미 국채 10년 (TNX)", tnx_val, tnx_chg, "{:.3f}%")
+        show(c5, "원/달러 환율", u_val, u_chg, "{:,.2f}원")
 
-        if pos_cnt == 3:
-            if avg_us_chg >= 1.0:
+        us_chgs = [c for c in (n_chg, s_chg, d_chg) if c is not None]
+        if not us_chgs and tnx_val is None and u_val is None:
+            raise ValueError("global quotes unavailable")
+
+       # 1. 미 증시 3대 지수 평균 및 방향성 진단
+        avg_us_chg = sum(us_chgs) / len(us_chgs) if us_chgs else 0.0
+        pos_cnt = sum([c > 0 for c in us_chgs])
+        neg_cnt = sum([c < 0 for c in us_chgs])
+
+        if not us_chgs:
+            market_mood = "미 증시 시세 지연으로 방향성 판독 보류!"
+        elif len(us_chgs) < 3:
+            market_mood = f"미 증시 {len(us_chgs)}개 지수만 수신, 평균 {avg_us_chg:+.2f}% 기준 잠정 판독!"
+        elif pos_cnt == 3:
+            if avg_us_chg >= MACRO.us_big_move_pct:
                 market_mood = "미 3대 지수 동반 훈풍 속 안도 랠리!"
             else:
                 market_mood = "미 3대 지수 일제히 상승 마감!"
         elif neg_cnt == 3:
-            if avg_us_chg <= -1.0:
+            if avg_us_chg <= -MACRO.us_big_move_pct:
                 market_mood = "미 3대 지수 동반 급락으로 투심 냉각!"
             else:
                 market_mood = "미 3대 지수 일제히 하락 (전면 약세 국면)!"
@@ -137,29 +223,38 @@ def display_global_risk():
 
         # 2. 금리 & 환율 매크로 리스크 진단
         macro_alerts = []
-        if tnx_val >= 4.5:
+        if tnx_val is None:
+            pass
+        elif tnx_val >= MACRO.tnx_spike:
             macro_alerts.append(f"🚨 [금리 발작] 국채 금리 {tnx_val:.3f}% 돌파!")
-        elif tnx_val <= 3.8:
+        elif tnx_val <= MACRO.tnx_calm:
             macro_alerts.append(f"🌱 [금리 안정] 국채 금리 {tnx_val:.3f}% 안정권 진입")
 
-        if u_val >= 1450:
+        if u_val is None:
+            pass
+        elif u_val >= MACRO.fx_extreme:
             macro_alerts.append(f"🚨 [환율 격랑] 원/달러 {u_val:,.2f}원! 초위험 고환율 비상!")
-        elif u_val >= 1400:
+        elif u_val >= MACRO.fx_alert:
             macro_alerts.append(f"⚠️ [환율 경계] 원/달러 {u_val:,.2f}원 1,400원대 고착화 압박!")
-        elif u_val >= 1380:
+        elif u_val >= MACRO.fx_pivot:
             macro_alerts.append(f"⚡ [환율 분기점] 원/달러 {u_val:,.2f}원! 1,400원 하회했으나 안심은 금물(외인 눈치보기)")
-        elif u_val <= 1330:
+        elif u_val <= MACRO.fx_friendly:
             macro_alerts.append(f"💵 [환율 우호] 원/달러 {u_val:,.2f}원 하향 안정세")
 
-        if u_chg > 0.3:
+        if u_chg is None:
+            pass
+        elif u_chg > MACRO.fx_move_pct:
             macro_alerts.append(f"📈 오늘 환율 {u_chg:+.2f}% 치솟는 중!")
-        elif u_chg < -0.3:
+        elif u_chg < -MACRO.fx_move_pct:
             macro_alerts.append(f"📉 오늘 환율 {u_chg:+.2f}% 진정세")
 
         # 3. 종합 행동 전략
-        if tnx_val >= 4.5 or u_val >= 1380:
+        # 못 받은 지표는 중립값으로 간주
+        tnx_val = tnx_val if tnx_val is not None else 4.0
+        u_val = u_val if u_val is not None else 1350
+        if tnx_val >= MACRO.tnx_spike or u_val >= MACRO.fx_pivot:
             strategy = "외인 수급 이탈 우려로 상단 저항이 강하니 추격매수 금지, 5일선 및 방어선 위주로 보수적 대응하시게."
-        elif avg_us_chg > 0.5 and tnx_val < 4.2 and u_val < 1350:
+        elif avg_us_chg > MACRO.us_friendly_pct and tnx_val < MACRO.tnx_friendly and u_val < MACRO.fx_strategy_friendly:
             strategy = "매크로 환경이 우호적이니 거래량 실린 정석 눌림목 주도주 위주로 적극 공략하시게."
         else:
             strategy = "장 초반 뇌동매매를 삼가고 지표 동조와 5일선 안착 여부를 끝까지 확인 후 진입하시게."
@@ -171,7 +266,10 @@ def display_global_risk():
     except: st.error("⚠️ 글로벌 데이터 호출 불가")
 
 st.title("🧐 이수할아버지의 냉정 진단기 v36062 (ATR 100점 완성판)")
-display_global_risk(); st.divider()
+# 글로벌 전황은 자리만 잡아 두고 뒤에서 받아 오는 동안 종목 진단부터 그린 뒤 맨 끝에 채운다
+prewarm.submit(fetch_global_market)
+global_slot = st.container()
+st.divider()
 
 # ==============================================================================
 # ★ [상단: 종목 / 수동입력 / 평단가 통합 입력창]
@@ -179,13 +277,28 @@ display_global_risk(); st.divider()
 col_symbol, col_manual, col_avg, col_btn = st.columns([1.8, 1.8, 1.8, 1.2])
 
 with col_symbol:
-    symbol = st.text_input("📊 종목번호 또는 티커", "005930").strip()
+    symbol = st.text_input("📊 종목번호 또는 티커", "005930", help="종목명(예: 삼성전자)으로 적으셔도 찾아드립니다.").strip()
+    if symbol and not symbol.isdigit():
+        name_idx = get_name_index()
+        resolved = name_idx.resolve(symbol)
+        if resolved is None and not symbol.isascii():
+            # 한글 이름 오타/일부 입력은 가장 가까운 후보로 안내
+            candidates = name_idx.search(symbol, limit=5)
+            if candidates:
+                resolved = candidates[0][0]
+                st.caption("🔎 후보: " + ", ".join(f"{n}({c})" for c, n in candidates))
+            elif not name_idx.kr:
+                st.caption("⏳ 종목명 색인을 뒤에서 짓는 중이오. 잠시 뒤 다시 눌러 보시게.")
+        if resolved and resolved != symbol.upper():
+            st.caption(f"🔎 '{symbol}' → {name_idx.name(resolved)} ({resolved})")
+            symbol = resolved
 
 with col_manual:
     manual_price_str = st.text_input(
         "⚡ 프리장/수동 실시간가 (선택)", 
         value="", 
-        help="프리장이나 주간거래 가격을 직접 적으시면 정규장 시세 대신 우선 적용합니다. (지우고 빈칸으로 만드시면 자동 시세 복귀)"
+        help="프리장이나 주간거래 가격을 직접 적으시면 정규장 시세 대신 우선 적용합니다. (지우고 빈칸으로 만드시면 자동 시세 복귀)",
+        on_change=keep_feed,
     ).strip()
 
 with col_avg:
@@ -194,7 +307,8 @@ with col_avg:
         min_value=0.0,
         value=0.0,
         step=100.0,
-        help="평단가를 입력하시면 수익권/손실권 맞춤형 실전 대응 가이드를 제공합니다."
+        help="평단가를 입력하시면 수익권/손실권 맞춤형 실전 대응 가이드를 제공합니다.",
+        on_change=keep_feed,
     )
 
 with col_btn:
@@ -202,6 +316,10 @@ with col_btn:
     st.write("") 
     if st.button("🔄 정밀 분석"):
         st.rerun()
+    live_mode = st.toggle("📡 실시간", key="live_mode", help=f"켜 두면 장중 {LIVE_SEC}초마다(장 전/후엔 더 느리게) 시세·신호등만 새로 그립니다. (장이 닫혀 있거나 수동 입력가가 있으면 멈춤)")
+
+prewarm.mark("inputs", _run_started)
+keep_feed_run = st.session_state.pop("_keep_feed", False)
 
 if symbol:
     try:
@@ -219,70 +337,49 @@ if symbol:
             utc_now = datetime.now(ZoneInfo('UTC'))
             now_local = utc_now.astimezone(ZoneInfo('Asia/Seoul') if is_kr else ZoneInfo('America/New_York'))
 
-        df = pd.DataFrame()
-        auto_p, v_curr = 0.0, 0.0
-        us_prev_p = None
+        currency, fmt_p = ("원", ",.0f") if is_kr else ("$", ",.2f")
+        feed = pinned_feed(symbol, keep_feed_run)
+        if feed is not None:
+            df, auto_p, v_curr, us_prev_p, quote_src = feed
+        else:
+            df = pd.DataFrame()
+            auto_p, v_curr = 0.0, 0.0
+            us_prev_p = None
+            quote_src = {}
 
-        if is_kr:
-            currency, fmt_p = "원", ",.0f"
-            try:
-                df = fdr.DataReader(symbol, start=start_date.strftime('%Y-%m-%d'))
-            except:
-                pass
-            
-            if df.empty:
-                try:
-                    df = yf.Ticker(f"{symbol}.KS").history(start=start_date)
-                    if df.empty:
-                        df = yf.Ticker(f"{symbol}.KQ").history(start=start_date)
-                except:
-                    pass
-
-            kr_fetched = False
-            try:
-                api_url = f"https://m.stock.naver.com/api/stock/{symbol}/basic"
-                headers = {'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X)'}
-                res = requests.get(api_url, headers=headers, timeout=1)
-                if res.status_code == 200:
-                    data = res.json()
-                    auto_p = float(data['closePrice'].replace(",", ""))
-                    v_curr = float(data['accumulatedTradingVolume'].replace(",", ""))
-                    kr_fetched = True
-            except:
-                pass
-
-            if not kr_fetched:
-                try:
-                    url = f"https://finance.naver.com/item/main.naver?code={symbol}"
-                    res = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=2)
-                    soup = BeautifulSoup(res.text, 'html.parser')
-                    auto_p = float(soup.select_one(".no_today .blind").text.replace(",", ""))
-                    v_curr = float(soup.select(".no_info .blind")[3].text.replace(",", ""))
-                    kr_fetched = True
-                except:
-                    if not df.empty:
+            if is_kr:
+                # 로컬 저장소에서 꺼내고 모자란 꼬리 구간만 새로 받음
+                df = load_history(symbol, start_date, fetch_kr_history)
+
+                # 네이버 API / 네이버 화면 동시 출격, 먼저 온 유효값 채택
+                with span("kr_quote", source="app", symbol=symbol) as rec:
+                    kr_quote, quote_src = fetch_kr_quote(symbol)
+                    if "price" in kr_quote:
+                        auto_p = kr_quote["price"]
+                        v_curr = kr_quote.get("volume", 0.0)
+                    elif not df.empty:
+                        # 시세를 못 받으면 마지막 일봉 종가로 대체
                         auto_p = float(df['Close'].iloc[-1])
                         v_curr = float(df['Volume'].iloc[-1])
-        else:
-            currency, fmt_p = "$", ",.2f"
-            ticker = yf.Ticker(symbol.upper())
-            
-            try:
-                df = ticker.history(start=start_date)
-            except Exception:
-                df = ticker.history(period="1y")
-                
-            try:
-                info = ticker.fast_info
-                auto_p = getattr(info, 'last_price', float(df['Close'].iloc[-1]))
-                v_curr = getattr(info, 'last_volume', float(df['Volume'].iloc[-1]))
-                us_prev_p = info.previous_close
-            except:
-                pass
-            
-            if auto_p == 0.0 and not df.empty:
-                auto_p = float(df['Close'].iloc[-1])
-                v_curr = float(df['Volume'].iloc[-1])
+                        rec["outcome"] = "fallback"
+            else:
+                df = load_history(symbol.upper(), start_date, fetch_us_history)
+
+                with span("us_quote", source="yf_fast_info", symbol=symbol.upper()) as rec:
+                    try:
+                        info = yf_fast_info(symbol.upper())
+                        auto_p = getattr(info, 'last_price', float(df['Close'].iloc[-1]))
+                        v_curr = getattr(info, 'last_volume', float(df['Volume'].iloc[-1]))
+                        us_prev_p = info.previous_close
+                    except Exception as e:
+                        rec.update(outcome="error", error=f"{type(e).__name__}: {e}"[:200])
+
+                    if auto_p == 0.0 and not df.empty:
+                        auto_p = float(df['Close'].iloc[-1])
+                        v_curr = float(df['Volume'].iloc[-1])
+                        rec["outcome"] = "fallback"
+            if not df.empty:
+                pin_feed(symbol, df, auto_p, v_curr, us_prev_p, quote_src)
 
         # ==============================================================================
         # ★ [현재가(p) 수동 입력 최우선 채택 스위치 연산]
@@ -306,607 +403,502 @@ if symbol:
         if df.empty:
             st.warning(f"⚠️ [{symbol}] 종목의 데이터를 불러오지 못했구먼. 종목번호를 다시 확인하거나 잠시 후 다시 시도해 주시게.")
         else:
-            df = df.ffill().dropna()
-            df.index = pd.to_datetime(df.index).date
-            today_date = now_local.date()
-
-            if not is_kr and us_prev_p and us_prev_p > 0:
-                prev_p = us_prev_p
-            else:
-                if today_date in df.index:
-                    # 이미 오늘자 행이 들어와 있는 장중/마감 후
-                    prev_p = float(df['Close'].iloc[-2]) if len(df) >= 2 else p
+            # --- [종목명: 시세와 무관하니 실시간 갱신 구역 밖에서 한 번만] ---
+            with span("name_lookup", symbol=symbol):
+                if is_kr:
+                    core_vault = {"005930": "삼성전자", "000660": "SK하이닉스", "033100": "제룡전기", "257720": "실리콘투", "058610": "에스피지"}
+                    final_display_name = core_vault.get(symbol) or get_name_index().name(symbol)
+                    if not final_display_name:
+                        final_display_name = f"국내종목 ({symbol})"
+                        try:
+                            # 시세 경주 때 받아 둔 종목 화면을 그대로 재사용 (없으면 한 번만 받음)
+                            with purpose("name"):
+                                final_display_name = naver_item_page(symbol)["name"]
+                        except: pass
                 else:
-                # 아직 장 시작 전 (df의 마지막 행이 바로 '어제 종가')
-                    prev_p = float(df['Close'].iloc[-1]) if len(df) >= 1 else p
-
-            if today_date in df.index:
-                df.loc[today_date, 'Close'] = p
-                df.loc[today_date, 'Volume'] = v_curr
-                if p > df.loc[today_date, 'High']: df.loc[today_date, 'High'] = p
-                if p < df.loc[today_date, 'Low']: df.loc[today_date, 'Low'] = p
-            else:
-                new_row = pd.DataFrame({
-                    'Open': [p], 'High': [p], 'Low': [p], 'Close': [p], 'Volume': [v_curr]
-                }, index=[today_date])
-                df = pd.concat([df, new_row])
-
-            # --- [거래량 및 시간보정 연산 장치] ---
-            v_avg5 = float(df['Volume'].iloc[-6:-1].mean()) if len(df) >= 6 else float(df['Volume'].mean())
-            v_ratio = (v_curr / v_avg5) * 100 if v_avg5 > 0 else 0
-            
-            p_diff = p - prev_p
-            p_chg = (p_diff / prev_p) * 100 if prev_p > 0 else 0
-            
-            if is_kr:
-                m_start = now_local.replace(hour=9, minute=0, second=0, microsecond=0)
-                m_end = now_local.replace(hour=15, minute=30, second=0, microsecond=0)
-                total_minutes = 390
-            else:
-                m_start = now_local.replace(hour=9, minute=30, second=0, microsecond=0)
-                m_end = now_local.replace(hour=16, minute=0, second=0, microsecond=0)
-                total_minutes = 390
-
-            if m_start <= now_local <= m_end and now_local.weekday() < 5:
-                elapsed = max(10, (now_local - m_start).seconds / 60)
-                vol_strength_auto = min(1000, v_ratio / (elapsed / total_minutes))
-            else:
-                vol_strength_auto = v_ratio 
+                    us_vault = {
+                        "TSLA": "테슬라", "NVDA": "엔비디아", "AAPL": "애플", 
+                        "MSFT": "마이크로소프트", "AMZN": "아마존", "GOOGL": "알파벳A", 
+                        "META": "메타", "IONQ": "아이온큐", "CPNG": "쿠팡", "NFLX": "넷플릭스",
+                        "SKHY": "SK하이닉스"
+                    }
+                    tk = symbol.upper()
+                    kor_name = us_vault.get(tk, None) or get_name_index().name(tk)
+                    if not kor_name:
+                        try:
+                            with purpose("name"):
+                                kor_name = yf_name(tk) or tk
+                        except: kor_name = tk
+                    final_display_name = f"{kor_name} ({tk})"
+
+            # --- [장중 거래량 분포 곡선: 종목 분봉으로 만든 곡선, 아직 없으면 뒤에서 만들고 이번엔 시장 기본 곡선] ---
+            with span("volume_profile", symbol=symbol):
+                vol_curve = volume_curve(symbol.upper(), wait=False)
+
+            # --- [실시간 스트리밍: 종목당 보급병 하나가 시세를 받아 두고, 아래 구역만 LIVE_SEC 초마다 다시 그림 (장이 닫혀 있으면 쉼)] ---
+            live_poller = live_every = None
+            if live_mode and not is_manual_mode:
+                market = sessions.market_of(symbol)
+                live_every = sessions.poll_interval(market, regular=LIVE_SEC)
+                if live_every:
+                    live_fetch = partial(fetch_kr_quote, symbol) if is_kr else partial(fetch_us_quote, symbol.upper())
+                    live_poller = poller_for(f"{market}:{symbol.upper()}", live_fetch, partial(sessions.poll_interval, market, regular=LIVE_SEC))
+                else:
+                    st.caption(f"⏸️ 장이 닫혀 있어 실시간 갱신을 쉬는 중이오 (다음 장 시작: {sessions.next_change(market):%m-%d %H:%M} 현지 시각)")
+
+            @st.fragment(run_every=live_every)
+            @timed("render_diagnosis")
+            def render_diagnosis(p, v_curr, now_local, quote_src):
+                if live_poller:
+                    live_q, live_src = live_poller.latest()
+                    if live_q.get("price"):
+                        p, v_curr, quote_src = live_q["price"], live_q.get("volume", v_curr), live_src
+                    now_local = datetime.now(now_local.tzinfo)
+
+                # --- [냉정 진단 엔진: 어제까지의 지표 상태는 재사용, 오늘 봉만 얹어 연산] ---
+                with span("diagnose", source="incremental", symbol=symbol):
+                    d = diagnose_layered(
+                        symbol, df, p, v_curr, now_local, is_kr,
+                        prev_p=us_prev_p if not is_kr else None,
+                        is_manual_mode=is_manual_mode, user_avg_price=user_avg_price, volume_curve=vol_curve,
+                    )
+                prev_p, p_diff, p_chg = d["prev_p"], d["p_diff"], d["p_chg"]
+                v_ratio, vol_strength, is_down_trend_v = d["v_ratio"], d["vol_strength"], d["is_down_trend_v"]
+                rsi_val, rsi_prev, will_val, will_prev = d["rsi_val"], d["rsi_prev"], d["will_val"], d["will_prev"]
+                is_macd_accelerating, is_macd_decelerating = d["is_macd_accelerating"], d["is_macd_decelerating"]
+                is_macd_recovering, is_macd_reverse_deepening = d["is_macd_recovering"], d["is_macd_reverse_deepening"]
+                mid_line, up_b, low_b, bandwidth, is_squeeze = d["mid_line"], d["up_b"], d["low_b"], d["bandwidth"], d["is_squeeze"]
+                ma5_val, ma60_val, ma120_val = d["ma5_val"], d["ma60_val"], d["ma120_val"]
+                bias_ma5, is_over_extended_5 = d["bias_ma5"], d["is_over_extended_5"]
+                is_valid_bottom_candle, is_valid_buy_candle = d["is_valid_bottom_candle"], d["is_valid_buy_candle"]
+                dynamic_stop_pct, dynamic_stop_price = d["dynamic_stop_pct"], d["dynamic_stop_price"]
+                is_below_ma5, stop_loss_price, defense_line = d["is_below_ma5"], d["stop_loss_price"], d["defense_line"]
+                is_bullish, is_bearish, is_ma5_safe = d["is_bullish"], d["is_bearish"], d["is_ma5_safe"]
+                bottom_score, recent_bottom_memory = d["bottom_score"], d["recent_bottom_memory"]
+                pullback_rebound_score, is_bandwidth_ok = d["pullback_rebound_score"], d["is_bandwidth_ok"]
+                is_stop_loss_triggered, stop_reason = d["is_stop_loss_triggered"], d["stop_reason"]
+                is_escape_buy_signal, is_pullback_buy_signal = d["is_escape_buy_signal"], d["is_pullback_buy_signal"]
+                target_price_100, final_code = d["target_price_100"], d["final_code"]
 
-            if is_manual_mode:
-                vol_strength = 100.0
-            else:
-                vol_strength = vol_strength_auto
+                if is_macd_accelerating:
+                    macd_status_name = "🔥 엔진 정회전 가속"
+                    macd_strategy_msg = "<b>🔥 엔진 정회전 가속 (엑셀 풀가동)</b><br>• <b>역할:</b> 상승 추진력 폭발.<br>• <b>진단:</b> 상승 가속도가 날마다 붙고 있네! 성벽을 향해 든든하게 추세를 즐기시게."
+                elif is_macd_decelerating:
+                    macd_status_name = "⚠️ 엔진 정회전 둔화"
+                    macd_strategy_msg = "<b>⚠️ 엔진 정회전 둔화 (탄력 저하 경보)</b><br>• <b>역할:</b> 상승 탄력 둔화 감지.<br>• <b>진단:</b> 상승세는 유지 중이나 추진력이 꺾였으니, 신규 매수를 자제하고 성벽 위 분할 익절을 준비하시게."
+                elif is_macd_recovering:
+                    macd_status_name = "🌤️ 역회전 감소"
+                    macd_strategy_msg = "<b>🌤️ 엔진 역회전 감소 (반등 시동)</b><br>• <b>역할:</b> 하락 둔화 및 바닥 다지기.<br>• <b>진단:</b> 매도세가 잦아들며 반등 채비 중이오. 5일선 안착 여부를 확인하시게."
+                else:
+                    macd_status_name = "⚙️ 엔진 역회전 심화"
+                    macd_strategy_msg = "<b>⚙️ 엔진 역회전 심화 (하락 가속)</b><br>• <b>역할:</b> 하락 조정 가속.<br>• <b>진단:</b> 하락 관성 지속. 섣부른 매수 및 물타기를 절대 금지하고 관망하시게."
 
-            # 보조지표 연산 (RSI 14/9, Williams %R 14/6, MACD 12/26/9, BB 20/2)
-            delta = df['Close'].diff(); gain = (delta.where(delta > 0, 0)).rolling(14).mean(); loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-            rsi_series = 100 - (100 / (1 + (gain / (loss + 1e-10))))
-            rsi_val, rsi_prev = rsi_series.iloc[-1], rsi_series.iloc[-2]
+                if not is_below_ma5:
+                    stop_loss_label = f"🛡️ 단기 추세 체크포인트: 5일선 -{dynamic_stop_pct:.1f}% 이탈 시 비중 조절 및 관망({stop_loss_price:{fmt_p}}{currency})"
+                else:
+                    stop_loss_label = f"🚨 칼손절 경보: 바닥권 전저점 이탈 마지노선({stop_loss_price:{fmt_p}}{currency})"
+
+                ma5_str = f"{ma5_val:{fmt_p}}{currency}"
+                ma20_str = f"{mid_line:{fmt_p}}{currency}"
+                ma60_str = f"{ma60_val:{fmt_p}}{currency}"
+                ma120_str = f"{ma120_val:{fmt_p}}{currency}"
+
+                if is_bullish: trend_status = "🔥 <b>[대세 정배열]</b> 완벽한 우상향 성벽 구축 완료"
+                elif is_bearish: trend_status = "⚠️ <b>[대세 역배열]</b> 지하실 향하는 하락 추세"
+                elif ma5_val > mid_line: trend_status = "🌱 <b>[단기 반등 초입]</b> 5일선이 20일선 돌파! 상방 반전 시도 중"
+                elif ma5_val < mid_line: trend_status = "📉 <b>[단기 조정 국면]</b> 5일선이 20일선 밑으로 밀려 숨고르기 중"
+                else: trend_status = "⚖️ <b>[추세 혼조]</b> 방향 탐색 중"
+
+                ma_price_summary = (
+                    f"<br>• 📌 <b>[주요 이동평균선 현황]</b><br>"
+                    f"&nbsp;&nbsp;<span style='color:#D32F2F; font-weight:bold;'>🔴 5일선: {ma5_str} (이격: {bias_ma5:+.1f}%)</span> | "
+                    f"<span style='color:#1976D2; font-weight:bold;'>🔵 20일선: {ma20_str}</span> | "
+                    f"<span style='color:#388E3C; font-weight:bold;'>🟢 60일선: {ma60_str}</span> | "
+                    f"<span style='color:#7B1FA2; font-weight:bold;'>🟣 120일선: {ma120_str}</span><br>"
+                )
+
+                if is_squeeze:
+                    squeeze_info_str = f"<br>• ⚡ <b>[밴드폭 극초축소({bandwidth:.1f}%)]</b> 에너지가 바짝 응축되었구먼! 얕은 조정 후 폭발할 수 있으니 돌파 시 정면 대응하시게."
+                elif bandwidth < PARAMS.min_bandwidth:
+                    squeeze_info_str = f"<br>• 🟡 <b>[밴드폭 협소({bandwidth:.1f}%)]</b> 밴드폭이 20% 미만이오! 눌림목 공략 시 먹을 자리가 부족하니 무리한 진입을 자제하시게."
+                else:
+                    squeeze_info_str = f"<br>• 🌊 <b>[밴드폭 넉넉함({bandwidth:.1f}%)]</b> 활주로가 넉넉히 트였으니 정석 눌림목 타점을 공략하시게."
+
+
+                st.markdown("### 📊 현재주가현황")
+                display_price = f"{p:{fmt_p}}{currency} (전일비: {p_diff:+{fmt_p}} / {p_chg:+.2f}%)"
+                st.markdown(f"<div style='background-color:#f8f9fa; padding:20px; border-radius:10px; border-left:10px solid #1565C0;'><p style='font-size:35px; color:#1565C0; font-weight:bold; margin:0;'>{final_display_name}</p><p style='font-size:30px; color:#FF4B4B; font-weight:bold; margin:10px 0 0 0;'>{display_price}</p></div>", unsafe_allow_html=True)
+                if quote_src and not is_manual_mode:
+                    live_stamp = f" · 실시간 {datetime.fromtimestamp(live_poller.updated_at, now_local.tzinfo):%H:%M:%S} 기준" if live_poller and live_poller.updated_at else ""
+                    st.caption("📡 시세 보급처: " + ", ".join(f"{k}={v}" for k, v in quote_src.items()) + live_stamp)
+
+                # --- [거래량 전황 판정] ---
+                if is_manual_mode:
+                    v_status, v_adv = "수동검증", f"⚡ <b>[프리장/수동 연산]</b> 수동 입력 시세를 기준으로 정밀 검증 중이외다."
+                elif vol_strength >= PARAMS.vol_overheat:
+                    if not is_down_trend_v:
+                        v_status, v_adv = "과열폭발", f"🔥 <b>[화력폭발]</b> 시간보정 강도 {vol_strength:.1f}점! 바닥 거래량 폭발 또는 본진 진격 중이오."
+                    else:
+                        v_status, v_adv = "역배열투매", f"🚨 <b>[역배열/하방 투매과열]</b> 시간보정 강도 {vol_strength:.1f}점! 하방 압력 속 투매 물량 폭발 중이니 절대 칼날을 잡지 마시게."
+                elif vol_strength >= PARAMS.vol_accumulate: 
+                    if not is_down_trend_v:
+                        v_status, v_adv = "매집시작", f"🚀 <b>[매집시작]</b> 시간보정 강도 {vol_strength:.1f}점! 화력이 차오르네."
+                    else:
+                        v_status, v_adv = "역배열과열", f"⚠️ <b>[역배열과열]</b> 시간보정 강도 {vol_strength:.1f}점! 하락 추세 속 속임수 음봉 거래량 주의."
+                elif vol_strength >= PARAMS.vol_entry: 
+                    v_status, v_adv = "정상화력", f"⚔️ <b>[정상화력]</b> 시간보정 강도 {vol_strength:.1f}점! 기세가 뻣뻣하구먼."
+                else: 
+                    v_status, v_adv = "거래절벽", f"🧊 <b>[거래절벽]</b> 시간보정 강도 {vol_strength:.1f}점! 수급이 마르고 동력이 없으니 속지 마시게."
             
-            h14, l14 = df['High'].rolling(14).max(), df['Low'].rolling(14).min()
-            will_series = (h14 - df['Close']) / (h14 - l14 + 1e-10) * -100
-            will_val, will_prev = will_series.iloc[-1], will_series.iloc[-2]
+                st.markdown(f"<div class='vol-box'><div style='font-size:32px; font-weight:bold; color:#0D47A1; margin-bottom:10px;'>📊 거래량 전황: {v_status} ({'수동 연산 모드' if is_manual_mode else f'실시간 {v_ratio:.1f}% / 5일평균대비'})</div><div class='vol-sub-text'>{v_adv}</div></div>", unsafe_allow_html=True)
+
+                # ==============================================================================
+                # ★ [3번 지표 세부 설명]
+                # ==============================================================================
+                if bottom_score >= 2:
+                    bottom_status_str = f"<b>(당일 진바닥 지표 {bottom_score}개 터치 달성!)</b>"
+                    if is_stop_loss_triggered:
+                        bottom_action_str = f"→ <b>[비상 후퇴]</b> 바닥권 전저점 이탈로 매수 금지"
+                    elif vol_strength < PARAMS.vol_entry:
+                        bottom_action_str = f"→ <b>[입질 대기]</b> 지표 충족이나 거래량 부족({vol_strength:.1f}점)으로 매수 보류"
+                    elif is_macd_reverse_deepening:
+                        bottom_action_str = f"→ <b>[매수 보류]</b> MACD 엔진 역회전 심화 중이므로 진입 금지"
+                    elif not is_valid_bottom_candle:
+                        bottom_action_str = f"→ <b>[캔들 대기]</b> 지표 충족했으나 음봉 매도세 지속으로 매수 보류"
+                    else:
+                        bottom_action_str = f"→ <b>[1단계 진바닥 입질 매수]</b> 지표 충족 + 거래량 유입 + 바닥 지지! 소량 입질 매수 시작."
+                elif recent_bottom_memory:
+                    bottom_status_str = f"<b>(최근 2~3일 내 진바닥 확인 완료!)</b>"
+                    if is_stop_loss_triggered:
+                        bottom_action_str = f"→ <b>[비상 후퇴]</b> 바닥권 전저점 이탈로 매수 금지"
+                    elif is_over_extended_5:
+                        bottom_action_str = f"→ <b>[추격 매수 금지]</b> 5일선 대비 +{bias_ma5:.1f}% 과다이격 발생으로 관망 대기."
+                    elif not is_valid_buy_candle:
+                        bottom_action_str = f"→ <b>[캔들 대기]</b> 5일선 회복 시도 중이나 유효 캔들 미충족으로 관망."
+                    elif is_escape_buy_signal:
+                        bottom_action_str = f"→ <b>[2단계 진바닥 탈출]</b> 바닥 다진 후 5일선 위 안착 성공! 추가 매수 유효."
+                    elif not is_ma5_safe:
+                        bottom_action_str = f"→ <b>[5일선 안착 대기]</b> 바닥은 확인되었으나 5일선 돌파 대기 중 관망."
+                    elif vol_strength < PARAMS.vol_entry:
+                        bottom_action_str = f"→ <b>[거래량 대기]</b> 5일선 위 안착했으나 거래량 부족({vol_strength:.1f}점)으로 관망."
+                    else:
+                        bottom_action_str = f"→ <b>[관망]</b> 추세 안착 대기 중."
+                else:
+                    bottom_status_str = "<b>(조건 미흡)</b>"
+                    bottom_action_str = "➔ <b>[관망]</b> 진바닥 지표 조건 미충족"
+
+                if not is_bandwidth_ok:
+                    pullback_status_str = f"<b>(밴드폭 {bandwidth:.1f}% / 협소·미흡)</b>"
+                    pullback_action_str = "-> <b>[매수 보류]</b> 밴드폭 20% 미만으로 먹을 자리가 부족하여 승수 확대 금지"
+                else:
+                    pullback_status_str = f"<b>(밴드폭 {bandwidth:.1f}% / 조건 만족)</b>"
+                    if pullback_rebound_score == 0:
+                        pullback_action_str = "-> <b>[관망]</b> 눌림목 지표 조건 미충족"
+                    elif pullback_rebound_score < 2:
+                        pullback_action_str = f"-> <b>[지표 미흡]</b> 눌림목 동조 점수 부족({pullback_rebound_score}점)으로 돌파/안착 대기"
+                    elif is_over_extended_5 and (p >= mid_line):
+                        pullback_action_str = f"-> <b>[추격 매수 금지]</b> 5일선 대비 +{bias_ma5:.1f}% 과다이격 발생으로 눌림목 지지 대기"
+                    elif not is_valid_buy_candle:
+                        pullback_action_str = "-> <b>[캔들 확인 대기]</b> 눌림목 영역이나 캔들 지지(양봉/밑꼬리) 미흡으로 관망"
+                    elif is_macd_reverse_deepening:
+                        pullback_action_str = "-> <b>[엔진 역회전 심화]</b> MACD 하락 가속 중이므로 관망"
+                    elif is_pullback_buy_signal:
+                        pullback_action_str = "-> <b>[3단계 눌림목 추가 매수]</b> 5·20일선 위 안착 + 지표 동조 확인, 승수 확대 진격!"
+                    else:
+                        pullback_action_str = "-> <b>[돌파/안착 대기]</b> 상방 공방 및 이격 조율 중 관망"
+
+                # ==============================================================================
+                # ★ [신호등 분기: 완벽 동기화]
+                # ==============================================================================
+                if final_code == "STOP_LOSS_ALERT":
+                    sig = "🚨 [비상 손절] 바닥권 전저점 붕괴! 전량 칼손절 후퇴!"
+                    col = "#D32F2F"
+                    final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[바닥권 전저점 방어선 붕괴]</b> 미련을 버리고 즉시 전량 칼손절 후퇴하시게."
             
-            macd = df['Close'].ewm(span=12).mean() - df['Close'].ewm(span=26).mean()
-            sig_line = macd.ewm(span=9).mean()
-            m_l, s_l, m_p, s_p = macd.iloc[-1], sig_line.iloc[-1], macd.iloc[-2], sig_line.iloc[-2]
+                elif final_code == "RED_SELL_WARNING":
+                    sig = "🟡 [경계] 성벽 위 음봉 출현 / 분할 익절 준비"
+                    col = "#EF6C00"
+                    final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[성벽 위 음봉 출현]</b> 성벽(방어선) 위에서 음봉이 발생했으니, 5일선 사수 여부를 살피며 기세 둔화 시 분할 익절할 준비를 하시게."
             
-            # ==============================================================================
-            # ★ [MACD 엔진 4단계 정밀 분기]
-            # ==============================================================================
-            curr_diff = m_l - s_l
-            prev_diff = m_p - s_p
-            is_macd_bullish = (m_l > s_l)
-
-            is_macd_accelerating = is_macd_bullish and (curr_diff >= prev_diff)           # 🔥 정회전 가속 (화력 폭발)
-            is_macd_decelerating = is_macd_bullish and (curr_diff < prev_diff)            # ⚠️ 정회전 둔화 (탄력 저하)
-            is_macd_recovering = (not is_macd_bullish) and (curr_diff > prev_diff)        # 🌤️ 역회전 감소 (반등 시동)
-            is_macd_reverse_deepening = (not is_macd_bullish) and (curr_diff <= prev_diff)# ⚙️ 역회전 심화 (하락 가속)
-
-            if is_macd_accelerating:
-                macd_status_name = "🔥 엔진 정회전 가속"
-                macd_strategy_msg = "<b>🔥 엔진 정회전 가속 (엑셀 풀가동)</b><br>• <b>역할:</b> 상승 추진력 폭발.<br>• <b>진단:</b> 상승 가속도가 날마다 붙고 있네! 성벽을 향해 든든하게 추세를 즐기시게."
-            elif is_macd_decelerating:
-                macd_status_name = "⚠️ 엔진 정회전 둔화"
-                macd_strategy_msg = "<b>⚠️ 엔진 정회전 둔화 (탄력 저하 경보)</b><br>• <b>역할:</b> 상승 탄력 둔화 감지.<br>• <b>진단:</b> 상승세는 유지 중이나 추진력이 꺾였으니, 신규 매수를 자제하고 성벽 위 분할 익절을 준비하시게."
-            elif is_macd_recovering:
-                macd_status_name = "🌤️ 역회전 감소"
-                macd_strategy_msg = "<b>🌤️ 엔진 역회전 감소 (반등 시동)</b><br>• <b>역할:</b> 하락 둔화 및 바닥 다지기.<br>• <b>진단:</b> 매도세가 잦아들며 반등 채비 중이오. 5일선 안착 여부를 확인하시게."
-            else:
-                macd_status_name = "⚙️ 엔진 역회전 심화"
-                macd_strategy_msg = "<b>⚙️ 엔진 역회전 심화 (하락 가속)</b><br>• <b>역할:</b> 하락 조정 가속.<br>• <b>진단:</b> 하락 관성 지속. 섣부른 매수 및 물타기를 절대 금지하고 관망하시게."
-
-            df['MA5'] = df['Close'].rolling(5).mean()
-            df['MA20'] = df['Close'].rolling(20).mean()
-            df['MA60'] = df['Close'].rolling(60).mean()
-            df['MA120'] = df['Close'].rolling(120).mean()
-            df['Std'] = df['Close'].rolling(20).std()
+                elif final_code == "RED_SELL_TARGET":
+                    sig = "🔴 [매도] 수확 목표선 도달! 이익실현 타점!"
+                    col = "#D32F2F"
+                    final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[수확 목표선 도달]</b> 성벽 위 목표선 도달 완료! 즉시 분할 익절 및 전량 매도로 수익을 확정하시게."
             
-            mid_line = df['MA20'].iloc[-1]
-            up_b = mid_line + (df['Std'].iloc[-1] * 2)
-            low_b = mid_line - (df['Std'].iloc[-1] * 2)
+                elif final_code == "YELLOW_CAUTION":
+                    sig = "🟡 [경계] 성벽 위 공방 / 매도 준비!"
+                    col = "#EF6C00"
+                    final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[성벽 위 진입 및 공방]</b> 추격 매수는 절대 금하고, 매도 준비 및 경계 태세를 갖추시게!"
 
-            bandwidth = ((up_b - low_b) / mid_line) * 100 if mid_line > 0 else 0
-            is_squeeze = (bandwidth <= 10.0)
-            
-            ma5_val = df['MA5'].iloc[-1] if len(df) >= 5 else mid_line
-            ma60_val = df['MA60'].iloc[-1] if len(df) >= 60 else mid_line
-            ma120_val = df['MA120'].iloc[-1] if len(df) >= 120 else mid_line
-            ma20_slope = (df['MA20'].iloc[-1] - df['MA20'].iloc[-5]) if len(df) >= 5 else 0
-            
-            # ★ 5일선 및 20일선 이격도 정밀 연산
-            bias_ma5 = ((p - ma5_val) / ma5_val) * 100 if ma5_val > 0 else 0
-            bias_ma20 = ((p - mid_line) / mid_line) * 100 if mid_line > 0 else 0
-            is_over_extended_5 = (bias_ma5 >= 5.0)
-
-            # ==============================================================================
-            # ★ [캔들 판독 정밀화: 바닥 전용 밑꼬리와 추세 전용 밑꼬리 분리]
-            # ==============================================================================
-            today_open = float(df['Open'].iloc[-1])
-            today_high = float(df['High'].iloc[-1])
-            today_low = float(df['Low'].iloc[-1])
-
-            candle_range = max(0.01, today_high - today_low)
-            lower_tail = min(today_open, p) - today_low
-            body_len = abs(today_open - p)
-
-            # 1) 순수 양봉 여부
-            is_pure_bullish_candle = (p >= today_open)
-
-            # 2) 바닥 전용 밑꼬리 (5일선 무관! 극단 바닥에서 세력이 꼬리 달고 말아올린 봉)
-            is_bottom_lower_tail = (lower_tail >= candle_range * 0.45) or (lower_tail >= body_len * 1.3)
-            is_valid_bottom_candle = is_pure_bullish_candle or is_bottom_lower_tail
-
-            # 3) 2·3단계 추세용 밑꼬리 (5일선 사수 + 전일비 방어 필수)
-            is_trend_lower_tail = is_bottom_lower_tail and (p >= ma5_val) and (p_chg >= -1.5)
-            is_valid_buy_candle = is_pure_bullish_candle or is_trend_lower_tail
-
-            # 4) 성벽 위 경계용 음봉
-            is_bearish_candle = (p < today_open) and (not is_trend_lower_tail)
-
-            # ATR(14) 변동성 연산
-            tr1 = df['High'] - df['Low']
-            tr2 = (df['High'] - df['Close'].shift(1)).abs()
-            tr3 = (df['Low'] - df['Close'].shift(1)).abs()
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            atr_14 = float(tr.rolling(14).mean().iloc[-1]) if len(df) >= 14 else float(tr.mean())
+                elif final_code == "WAIT_OVER_EXTENDED":
+                    sig = f"🟡 [관망/경계] 5일선 과다이격(+{bias_ma5:.1f}%) / 추격 매수 금지"
+                    col = "#F57C00"
+                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[5일선 과다이격(+{bias_ma5:.1f}%)]</b> 주가가 5일선에서 5% 이상 벌어져 단기 차익 매물(되돌림) 위험이 크니, 5일선 부근으로 숨고르기할 때까지 추격 매수를 엄금하시게."
             
-            atr_ratio = (atr_14 / ma5_val) if ma5_val > 0 else 0.03
-            dynamic_stop_rate = max(0.02, min(0.05, atr_ratio))
-            dynamic_stop_pct = dynamic_stop_rate * 100
-            dynamic_stop_price = ma5_val * (1 - dynamic_stop_rate)
+                elif final_code == "BOTTOM_ENTRY":
+                    sig = "🟢 [매입] 1단계 진바닥 입질 매수 (소량)"
+                    col = "#388E3C"
+                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[진바닥 입질 매수]</b> 3중 지표 터치 + 거래량 유입 + 바닥 지지 확인! 소량 씨앗 뿌리기 진격."
 
-            prev_low = float(df['Low'].iloc[-61:-1].min()) if len(df) > 60 else float(df['Low'].min())
-            is_below_ma5 = (p < ma5_val)
+                elif final_code == "ESCAPE_BUY":
+                    sig = "🟢 [매수] 2단계 진바닥 탈출 추가 매수 (5일선 위 안착)"
+                    col = "#2E7D32"
+                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[진바닥 탈출 매수]</b> 최근 바닥 다진 후 거래량이 실리며 5일선 위 안착 성공! 배팅 비중을 늘려 밭을 다짐."
 
-            if not is_below_ma5:
-                stop_loss_price = dynamic_stop_price
-                stop_loss_label = f"🛡️ 단기 추세 체크포인트: 5일선 -{dynamic_stop_pct:.1f}% 이탈 시 비중 조절 및 관망({stop_loss_price:{fmt_p}}{currency})"
-            else:
-                stop_loss_price = prev_low
-                stop_loss_label = f"🚨 칼손절 경보: 바닥권 전저점 이탈 마지노선({stop_loss_price:{fmt_p}}{currency})"
-
-            defense_link_idx = min(21, len(df))
-            defense_line = float(df['High'].iloc[-defense_link_idx:-1].max()) * 0.93 if len(df) > 1 else p * 0.93
-
-            high_52w = float(df['High'].rolling(window=250, min_periods=1).max().iloc[-1])
-            low_52w = float(df['Low'].rolling(window=250, min_periods=1).min().iloc[-1])
-
-            is_bullish = (ma5_val > mid_line and mid_line > ma60_val and ma60_val > ma120_val)
-            is_bearish = (ma5_val < mid_line and mid_line < ma60_val and ma60_val < ma120_val)
-            is_ma5_safe = (p >= ma5_val)
-
-            ma5_str = f"{ma5_val:{fmt_p}}{currency}"
-            ma20_str = f"{mid_line:{fmt_p}}{currency}"
-            ma60_str = f"{ma60_val:{fmt_p}}{currency}"
-            ma120_str = f"{ma120_val:{fmt_p}}{currency}"
-
-            if is_bullish: trend_status = "🔥 <b>[대세 정배열]</b> 완벽한 우상향 성벽 구축 완료"
-            elif is_bearish: trend_status = "⚠️ <b>[대세 역배열]</b> 지하실 향하는 하락 추세"
-            elif ma5_val > mid_line: trend_status = "🌱 <b>[단기 반등 초입]</b> 5일선이 20일선 돌파! 상방 반전 시도 중"
-            elif ma5_val < mid_line: trend_status = "📉 <b>[단기 조정 국면]</b> 5일선이 20일선 밑으로 밀려 숨고르기 중"
-            else: trend_status = "⚖️ <b>[추세 혼조]</b> 방향 탐색 중"
-
-            ma_price_summary = (
-                f"<br>• 📌 <b>[주요 이동평균선 현황]</b><br>"
-                f"&nbsp;&nbsp;<span style='color:#D32F2F; font-weight:bold;'>🔴 5일선: {ma5_str} (이격: {bias_ma5:+.1f}%)</span> | "
-                f"<span style='color:#1976D2; font-weight:bold;'>🔵 20일선: {ma20_str}</span> | "
-                f"<span style='color:#388E3C; font-weight:bold;'>🟢 60일선: {ma60_str}</span> | "
-                f"<span style='color:#7B1FA2; font-weight:bold;'>🟣 120일선: {ma120_str}</span><br>"
-            )
-
-            if is_squeeze:
-                squeeze_info_str = f"<br>• ⚡ <b>[밴드폭 극초축소({bandwidth:.1f}%)]</b> 에너지가 바짝 응축되었구먼! 얕은 조정 후 폭발할 수 있으니 돌파 시 정면 대응하시게."
-            elif bandwidth < 20.0:
-                squeeze_info_str = f"<br>• 🟡 <b>[밴드폭 협소({bandwidth:.1f}%)]</b> 밴드폭이 20% 미만이오! 눌림목 공략 시 먹을 자리가 부족하니 무리한 진입을 자제하시게."
-            else:
-                squeeze_info_str = f"<br>• 🌊 <b>[밴드폭 넉넉함({bandwidth:.1f}%)]</b> 활주로가 넉넉히 트였으니 정석 눌림목 타점을 공략하시게."
+                elif final_code == "PULLBACK_BUY":
+                    sig = "🔵 [매수] 3단계 눌림목 추가 매수 (승수 확대)"
+                    col = "#1976D2"
+                    final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[승수 확대]</b> 5일선·20일선 위 안정적 안착 및 활주로 확보 완료! 알짜배기 추가 매수."
 
-            is_down_trend_v = (p < prev_p) and (p_chg < 0)
+                elif final_code == "WAIT_INDICATOR":
+                    sig = "🟡 [관망/보류] 5일선 회복 시도 중이나 지표 미흡 (외바닥 주의)"
+                    col = "#F57C00"
+                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[지표 미흡]</b> 5일선은 넘었으나 최근 바닥 지표 동조({bottom_score}개)가 부족하므로 외바닥 속임수를 경계하고 관망하시게."
 
-            if is_kr:
-                core_vault = {"005930": "삼성전자", "000660": "SK하이닉스", "033100": "제룡전기", "257720": "실리콘투", "058610": "에스피지"}
-                final_display_name = core_vault.get(symbol, f"국내종목 ({symbol})")
-                if symbol not in core_vault:
-                    try:
-                        url = f"https://finance.naver.com/item/main.naver?code={symbol}"
-                        res = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=1)
-                        soup = BeautifulSoup(res.text, 'html.parser')
-                        final_display_name = soup.select_one(".wrap_company h2 a").text.strip()
-                    except:
-                        try:
-                            df_krx_backup = load_krx_listing()
-                            final_display_name = df_krx_backup[df_krx_backup['Code'] == symbol]['Name'].values[0]
-                        except: pass
-            else:
-                us_vault = {
-                    "TSLA": "테슬라", "NVDA": "엔비디아", "AAPL": "애플", 
-                    "MSFT": "마이크로소프트", "AMZN": "아마존", "GOOGL": "알파벳A", 
-                    "META": "메타", "IONQ": "아이온큐", "CPNG": "쿠팡", "NFLX": "넷플릭스",
-                    "SKHY": "SK하이닉스"
-                }
-                tk = symbol.upper()
-                kor_name = us_vault.get(tk, None)
-                if not kor_name:
-                    try:
-                        info_dict = ticker.info
-                        kor_name = info_dict.get('longName', info_dict.get('shortName', tk))
-                    except: kor_name = tk
-                final_display_name = f"{kor_name} ({tk})"
-
-            st.markdown("### 📊 현재주가현황")
-            display_price = f"{p:{fmt_p}}{currency} (전일비: {p_diff:+{fmt_p}} / {p_chg:+.2f}%)"
-            st.markdown(f"<div style='background-color:#f8f9fa; padding:20px; border-radius:10px; border-left:10px solid #1565C0;'><p style='font-size:35px; color:#1565C0; font-weight:bold; margin:0;'>{final_display_name}</p><p style='font-size:30px; color:#FF4B4B; font-weight:bold; margin:10px 0 0 0;'>{display_price}</p></div>", unsafe_allow_html=True)
-
-            # --- [거래량 전황 판정] ---
-            if is_manual_mode:
-                v_status, v_adv = "수동검증", f"⚡ <b>[프리장/수동 연산]</b> 수동 입력 시세를 기준으로 정밀 검증 중이외다."
-            elif vol_strength >= 150:
-                if not is_down_trend_v:
-                    v_status, v_adv = "과열폭발", f"🔥 <b>[화력폭발]</b> 시간보정 강도 {vol_strength:.1f}점! 바닥 거래량 폭발 또는 본진 진격 중이오."
-                else:
-                    v_status, v_adv = "역배열투매", f"🚨 <b>[역배열/하방 투매과열]</b> 시간보정 강도 {vol_strength:.1f}점! 하방 압력 속 투매 물량 폭발 중이니 절대 칼날을 잡지 마시게."
-            elif vol_strength >= 100: 
-                if not is_down_trend_v:
-                    v_status, v_adv = "매집시작", f"🚀 <b>[매집시작]</b> 시간보정 강도 {vol_strength:.1f}점! 화력이 차오르네."
-                else:
-                    v_status, v_adv = "역배열과열", f"⚠️ <b>[역배열과열]</b> 시간보정 강도 {vol_strength:.1f}점! 하락 추세 속 속임수 음봉 거래량 주의."
-            elif vol_strength >= 80: 
-                v_status, v_adv = "정상화력", f"⚔️ <b>[정상화력]</b> 시간보정 강도 {vol_strength:.1f}점! 기세가 뻣뻣하구먼."
-            else: 
-                v_status, v_adv = "거래절벽", f"🧊 <b>[거래절벽]</b> 시간보정 강도 {vol_strength:.1f}점! 수급이 마르고 동력이 없으니 속지 마시게."
-            
-            st.markdown(f"<div class='vol-box'><div style='font-size:32px; font-weight:bold; color:#0D47A1; margin-bottom:10px;'>📊 거래량 전황: {v_status} ({'수동 연산 모드' if is_manual_mode else f'실시간 {v_ratio:.1f}% / 5일평균대비'})</div><div class='vol-sub-text'>{v_adv}</div></div>", unsafe_allow_html=True)
-
-            # ==============================================================================
-            # ★ [지표 정밀 연산 및 2~3일 바닥 기억 장치]
-            # ==============================================================================
-            bb_bot_series = (df['Close'] <= (low_b * 1.02)).astype(int)
-            rsi_bot_series = (rsi_series <= 35).astype(int)
-            will_bot_series = (will_series <= -80).astype(int)
-            bottom_score_series = bb_bot_series + rsi_bot_series + will_bot_series
-            
-            bottom_score = bottom_score_series.iloc[-1]
-            recent_bottom_memory = (bottom_score_series.iloc[-3:].max() >= 2)
-
-            # 눌림목 동조 연산
-            p_will = 1 if will_val <= -50 else 0
-            p_bb = 1 if (mid_line * 0.98 <= p <= mid_line * 1.02) else 0
-            p_rsi = 1 if (40 <= rsi_val <= 55) else 0
-            pullback_rebound_score = p_will + p_bb + p_rsi
-
-            # --- [손절 조건 검증] ---
-            is_stop_loss_triggered = False
-            stop_reason = ""
-            if user_avg_price > 0 and p < stop_loss_price:
-                is_stop_loss_triggered = True
-                stop_reason = f"보유 평단가 대비 손절 마지노선 이탈"
-            elif (recent_bottom_memory or bottom_score >= 2) and p < prev_low:
-                is_stop_loss_triggered = True
-                stop_reason = f"바닥권 전저점 이탈 마지노선"
-
-            # 성벽 & 수확목표선
-            target_price_100 = up_b
-            is_target_reached = p >= (target_price_100 * 0.97)
-            is_on_the_wall = (p >= defense_line) and (p < target_price_100)
-
-            # ==============================================================================
-            # ★ [1·2·3단계 매수 판정: 1단계는 5일선 무관 바닥캔들 / 2·3단계는 5일선 필수 추세캔들]
-            # ==============================================================================
-            is_bottom_indicator_ok = (bottom_score >= 2 or recent_bottom_memory)
-            is_macd_not_deepening = not is_macd_reverse_deepening
-            is_bandwidth_ok = (bandwidth >= 20.0)
-
-            # 1단계 진바닥 입질 매수 (5일선 무관! 바닥 2개 이상 + 거래량 80점 + MACD 역회전 가속 아님 + 바닥 지지캔들)
-            is_bottom_entry_signal = (bottom_score >= 2) and (vol_strength >= 80) and is_macd_not_deepening and is_valid_bottom_candle
-
-            # 2단계 진바닥 탈출 매수 (5일선 위 + 최근 바닥기억 + 거래량 80점 + MACD 역회전 가속 아님 + 추세 유효캔들)
-            is_escape_buy_signal = is_ma5_safe and is_bottom_indicator_ok and (vol_strength >= 80) and is_macd_not_deepening and is_valid_buy_candle
-
-            # 3단계 눌림목 추가 매수 (20일선 위 + 5일선 위 + 눌림목 동조 ≥ 2점 + 밴드폭 ≥ 20% + 거래량 + MACD + 추세 유효캔들)
-            is_pullback_buy_signal = (p >= mid_line) and is_ma5_safe and (pullback_rebound_score >= 2) and (vol_strength >= 80) and is_bandwidth_ok and is_macd_not_deepening and is_valid_buy_candle
-
-            # ==============================================================================
-            # ★ [3번 지표 세부 설명]
-            # ==============================================================================
-            if bottom_score >= 2:
-                bottom_status_str = f"<b>(당일 진바닥 지표 {bottom_score}개 터치 달성!)</b>"
-                if is_stop_loss_triggered:
-                    bottom_action_str = f"→ <b>[비상 후퇴]</b> 바닥권 전저점 이탈로 매수 금지"
-                elif vol_strength < 80:
-                    bottom_action_str = f"→ <b>[입질 대기]</b> 지표 충족이나 거래량 부족({vol_strength:.1f}점)으로 매수 보류"
-                elif is_macd_reverse_deepening:
-                    bottom_action_str = f"→ <b>[매수 보류]</b> MACD 엔진 역회전 심화 중이므로 진입 금지"
-                elif not is_valid_bottom_candle:
-                    bottom_action_str = f"→ <b>[캔들 대기]</b> 지표 충족했으나 음봉 매도세 지속으로 매수 보류"
-                else:
-                    bottom_action_str = f"→ <b>[1단계 진바닥 입질 매수]</b> 지표 충족 + 거래량 유입 + 바닥 지지! 소량 입질 매수 시작."
-            elif recent_bottom_memory:
-                bottom_status_str = f"<b>(최근 2~3일 내 진바닥 확인 완료!)</b>"
-                if is_stop_loss_triggered:
-                    bottom_action_str = f"→ <b>[비상 후퇴]</b> 바닥권 전저점 이탈로 매수 금지"
-                elif is_over_extended_5:
-                    bottom_action_str = f"→ <b>[추격 매수 금지]</b> 5일선 대비 +{bias_ma5:.1f}% 과다이격 발생으로 관망 대기."
-                elif not is_valid_buy_candle:
-                    bottom_action_str = f"→ <b>[캔들 대기]</b> 5일선 회복 시도 중이나 유효 캔들 미충족으로 관망."
-                elif is_escape_buy_signal:
-                    bottom_action_str = f"→ <b>[2단계 진바닥 탈출]</b> 바닥 다진 후 5일선 위 안착 성공! 추가 매수 유효."
-                elif not is_ma5_safe:
-                    bottom_action_str = f"→ <b>[5일선 안착 대기]</b> 바닥은 확인되었으나 5일선 돌파 대기 중 관망."
-                elif vol_strength < 80:
-                    bottom_action_str = f"→ <b>[거래량 대기]</b> 5일선 위 안착했으나 거래량 부족({vol_strength:.1f}점)으로 관망."
-                else:
-                    bottom_action_str = f"→ <b>[관망]</b> 추세 안착 대기 중."
-            else:
-                bottom_status_str = "<b>(조건 미흡)</b>"
-                bottom_action_str = "➔ <b>[관망]</b> 진바닥 지표 조건 미충족"
+                elif final_code == "WAIT_MACD":
+                    sig = "🟡 [관망/보류] 5일선 회복 중이나 엔진 역회전 심화 (진입 자제)"
+                    col = "#F57C00"
+                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[엔진 역회전 심화]</b> 5일선 위 안착 시도 중이나 MACD 하락 압력이 가속되므로 속임수 반등을 주의하고 관망하시게."
 
-            if not is_bandwidth_ok:
-                pullback_status_str = f"<b>(밴드폭 {bandwidth:.1f}% / 협소·미흡)</b>"
-                pullback_action_str = "-> <b>[매수 보류]</b> 밴드폭 20% 미만으로 먹을 자리가 부족하여 승수 확대 금지"
-            else:
-                pullback_status_str = f"<b>(밴드폭 {bandwidth:.1f}% / 조건 만족)</b>"
-                if pullback_rebound_score == 0:
-                    pullback_action_str = "-> <b>[관망]</b> 눌림목 지표 조건 미충족"
-                elif pullback_rebound_score < 2:
-                    pullback_action_str = f"-> <b>[지표 미흡]</b> 눌림목 동조 점수 부족({pullback_rebound_score}점)으로 돌파/안착 대기"
-                elif is_over_extended_5 and (p >= mid_line):
-                    pullback_action_str = f"-> <b>[추격 매수 금지]</b> 5일선 대비 +{bias_ma5:.1f}% 과다이격 발생으로 눌림목 지지 대기"
-                elif not is_valid_buy_candle:
-                    pullback_action_str = "-> <b>[캔들 확인 대기]</b> 눌림목 영역이나 캔들 지지(양봉/밑꼬리) 미흡으로 관망"
-                elif is_macd_reverse_deepening:
-                    pullback_action_str = "-> <b>[엔진 역회전 심화]</b> MACD 하락 가속 중이므로 관망"
-                elif is_pullback_buy_signal:
-                    pullback_action_str = "-> <b>[3단계 눌림목 추가 매수]</b> 5·20일선 위 안착 + 지표 동조 확인, 승수 확대 진격!"
-                else:
-                    pullback_action_str = "-> <b>[돌파/안착 대기]</b> 상방 공방 및 이격 조율 중 관망"
-
-            # ==============================================================================
-            # ★ [신호등 분기: 완벽 동기화]
-            # ==============================================================================
-            if is_stop_loss_triggered:
-                final_code = "STOP_LOSS_ALERT"
-                sig = "🚨 [비상 손절] 바닥권 전저점 붕괴! 전량 칼손절 후퇴!"
-                col = "#D32F2F"
-                final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[바닥권 전저점 방어선 붕괴]</b> 미련을 버리고 즉시 전량 칼손절 후퇴하시게."
-            
-            elif is_on_the_wall and is_bearish_candle:
-                final_code = "RED_SELL_WARNING"
-                sig = "🟡 [경계] 성벽 위 음봉 출현 / 분할 익절 준비"
-                col = "#EF6C00"
-                final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[성벽 위 음봉 출현]</b> 성벽(방어선) 위에서 음봉이 발생했으니, 5일선 사수 여부를 살피며 기세 둔화 시 분할 익절할 준비를 하시게."
-            
-            elif is_target_reached:
-                final_code = "RED_SELL_TARGET"
-                sig = "🔴 [매도] 수확 목표선 도달! 이익실현 타점!"
-                col = "#D32F2F"
-                final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[수확 목표선 도달]</b> 성벽 위 목표선 도달 완료! 즉시 분할 익절 및 전량 매도로 수익을 확정하시게."
-            
-            elif is_on_the_wall:
-                final_code = "YELLOW_CAUTION"
-                sig = "🟡 [경계] 성벽 위 공방 / 매도 준비!"
-                col = "#EF6C00"
-                final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[성벽 위 진입 및 공방]</b> 추격 매수는 절대 금하고, 매도 준비 및 경계 태세를 갖추시게!"
-
-            elif (is_escape_buy_signal or is_pullback_buy_signal) and is_over_extended_5:
-                final_code = "WAIT_OVER_EXTENDED"
-                sig = f"🟡 [관망/경계] 5일선 과다이격(+{bias_ma5:.1f}%) / 추격 매수 금지"
-                col = "#F57C00"
-                final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[5일선 과다이격(+{bias_ma5:.1f}%)]</b> 주가가 5일선에서 5% 이상 벌어져 단기 차익 매물(되돌림) 위험이 크니, 5일선 부근으로 숨고르기할 때까지 추격 매수를 엄금하시게."
+                elif final_code == "WAIT_VOLUME":
+                    sig = "🟡 [입질 대기] 지표 충족 / 거래량 수반 대기"
+                    col = "#E65100"
+                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[수급 부진]</b> 바닥 지표는 확인했으나 거래량이 실리지 않은 속임수 구간이니, 확실한 거래량 유입을 확인 후 진입하시게."
+
+                elif final_code == "WAIT_PULLBACK":
+                    if not is_bandwidth_ok:
+                        sig = "🟡 [관망/보류] 눌림목 영역이나 밴드폭 협소 (먹을자리 부족)"
+                        final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[밴드폭 협소({bandwidth:.1f}%)]</b> 밴드폭 20% 미만으로 먹을 자리가 부족하여 승수 확대 금지."
+                    else:
+                        sig = "🟡 [관망/보류] 눌림목 영역 도달했으나 지표 동조 미흡"
+                        final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[눌림목 지표 미흡]</b> 20일선 부근이나 지표 동조({pullback_rebound_score}점) 및 지지 캔들 확인 전까지 매수 보류."
+                    col = "#F57C00"
             
-            elif is_bottom_entry_signal:
-                final_code = "BOTTOM_ENTRY"
-                sig = "🟢 [매입] 1단계 진바닥 입질 매수 (소량)"
-                col = "#388E3C"
-                final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[진바닥 입질 매수]</b> 3중 지표 터치 + 거래량 유입 + 바닥 지지 확인! 소량 씨앗 뿌리기 진격."
-
-            elif is_escape_buy_signal:
-                final_code = "ESCAPE_BUY"
-                sig = "🟢 [매수] 2단계 진바닥 탈출 추가 매수 (5일선 위 안착)"
-                col = "#2E7D32"
-                final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[진바닥 탈출 매수]</b> 최근 바닥 다진 후 거래량이 실리며 5일선 위 안착 성공! 배팅 비중을 늘려 밭을 다짐."
-
-            elif is_pullback_buy_signal:
-                final_code = "PULLBACK_BUY"
-                sig = "🔵 [매수] 3단계 눌림목 추가 매수 (승수 확대)"
-                col = "#1976D2"
-                final_adv = f" • <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[승수 확대]</b> 5일선·20일선 위 안정적 안착 및 활주로 확보 완료! 알짜배기 추가 매수."
-
-            elif is_ma5_safe and not is_bottom_indicator_ok:
-                final_code = "WAIT_INDICATOR"
-                sig = "🟡 [관망/보류] 5일선 회복 시도 중이나 지표 미흡 (외바닥 주의)"
-                col = "#F57C00"
-                final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[지표 미흡]</b> 5일선은 넘었으나 최근 바닥 지표 동조({bottom_score}개)가 부족하므로 외바닥 속임수를 경계하고 관망하시게."
-
-            elif is_ma5_safe and is_macd_reverse_deepening:
-                final_code = "WAIT_MACD"
-                sig = "🟡 [관망/보류] 5일선 회복 중이나 엔진 역회전 심화 (진입 자제)"
-                col = "#F57C00"
-                final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[엔진 역회전 심화]</b> 5일선 위 안착 시도 중이나 MACD 하락 압력이 가속되므로 속임수 반등을 주의하고 관망하시게."
-
-            elif (bottom_score >= 2 or recent_bottom_memory) and vol_strength < 80:
-                final_code = "WAIT_VOLUME"
-                sig = "🟡 [입질 대기] 지표 충족 / 거래량 수반 대기"
-                col = "#E65100"
-                final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[수급 부진]</b> 바닥 지표는 확인했으나 거래량이 실리지 않은 속임수 구간이니, 확실한 거래량 유입을 확인 후 진입하시게."
-
-            elif (p >= mid_line * 0.98 and p <= mid_line * 1.03) and (pullback_rebound_score >= 1) and (pullback_rebound_score < 2 or not is_bandwidth_ok):
-                final_code = "WAIT_PULLBACK"
-                if not is_bandwidth_ok:
-                    sig = "🟡 [관망/보류] 눌림목 영역이나 밴드폭 협소 (먹을자리 부족)"
-                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[밴드폭 협소({bandwidth:.1f}%)]</b> 밴드폭 20% 미만으로 먹을 자리가 부족하여 승수 확대 금지."
                 else:
-                    sig = "🟡 [관망/보류] 눌림목 영역 도달했으나 지표 동조 미흡"
-                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). <b>[눌림목 지표 미흡]</b> 20일선 부근이나 지표 동조({pullback_rebound_score}점) 및 지지 캔들 확인 전까지 매수 보류."
-                col = "#F57C00"
-            
-            else:
-                final_code = "WAIT_GENERAL"
-                sig = "🟡 [관망] 조건 미충족 / 뇌동매매 금지"
-                col = "#FBC02D"
-                final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). 조건 미충족 상태이므로 뇌동매매를 금하고 관망 유지."
-
-            indicator_verify_text = (
-                f"{ma_price_summary}<br>"
-                f"• <b>[추세 정밀 판독]:</b> {trend_status}<br>"
-                f"• <b>[지표 검증 연산]</b><br>"
-                f"   - <b>진바닥 입질 동조:</b> {bottom_score}개 터치 {bottom_status_str} {bottom_action_str}<br>"
-                f"   - <b>눌림목 동조:</b> {pullback_rebound_score}/3점 {pullback_status_str} {pullback_action_str}"
-                f"{squeeze_info_str}"
-            )
-
-            # --- 보유 평단가 맞춤형 실전 대응 가이드 (ATR 동적 반영) ---
-            ma5_dynamic_stop = dynamic_stop_price
-
-            if user_avg_price <= 0:
-                holder_guide_msg = f"현재 추세 탐색 및 방향 정립 구간이니 성벽({defense_line:{fmt_p}}{currency})이나 5일선 사수 여부를 확인하며 차분히 보유 판단을 내리시게. (★ <b>손절 마지노선: {stop_loss_label}</b>)"
-            else:
-                profit_rate = ((p - user_avg_price) / user_avg_price) * 100
-                if p >= user_avg_price:
-                    holder_guide_msg = (
-                        f" • <b>[수익권 보유자 (평단가: {user_avg_price:{fmt_p}}{currency} / 수익률: +{profit_rate:.2f}%)]</b><br>"
-                        f" • <b>기세 지속:</b> 5일선({ma5_val:{fmt_p}}{currency})을 이탈하지 않는 한 성벽 및 수확목표선까지 추세를 즐기시게.<br>"
-                        f" • <b>단기 트레이딩:</b> 5일선 -{dynamic_stop_pct:.1f}% 이탈 시 수익 보존을 위해 일부 분할 익절({ma5_dynamic_stop:{fmt_p}}{currency})<br>"
-                        f" • <b>수익 확정선:</b> 성벽 위 음봉 발생 또는 볼린저 상단 도달 시 분할 매도 집행."
-                    )
+                    sig = "🟡 [관망] 조건 미충족 / 뇌동매매 금지"
+                    col = "#FBC02D"
+                    final_adv = f"• <b>[최종 결론]</b> 보정강도({vol_strength:.1f}점). 조건 미충족 상태이므로 뇌동매매를 금하고 관망 유지."
+
+                indicator_verify_text = (
+                    f"{ma_price_summary}<br>"
+                    f"• <b>[추세 정밀 판독]:</b> {trend_status}<br>"
+                    f"• <b>[지표 검증 연산]</b><br>"
+                    f"   - <b>진바닥 입질 동조:</b> {bottom_score}개 터치 {bottom_status_str} {bottom_action_str}<br>"
+                    f"   - <b>눌림목 동조:</b> {pullback_rebound_score}/3점 {pullback_status_str} {pullback_action_str}"
+                    f"{squeeze_info_str}"
+                )
+
+                # --- 보유 평단가 맞춤형 실전 대응 가이드 (ATR 동적 반영) ---
+                ma5_dynamic_stop = dynamic_stop_price
+
+                if user_avg_price <= 0:
+                    holder_guide_msg = f"현재 추세 탐색 및 방향 정립 구간이니 성벽({defense_line:{fmt_p}}{currency})이나 5일선 사수 여부를 확인하며 차분히 보유 판단을 내리시게. (★ <b>손절 마지노선: {stop_loss_label}</b>)"
                 else:
-                    holder_guide_msg = (
-                        f" • <b>[손실권 보유자 (평단가: {user_avg_price:{fmt_p}}{currency} / 손실률: {profit_rate:.2f}%)]</b><br>"
-                        f" • <b>5일선({ma5_val:{fmt_p}}{currency}) 아래에서는 추측 추가 매수(물타기)를 절대 금지하네.</b><br>"
-                        f" • <b>단기 트레이딩:</b> 5일선 -{dynamic_stop_pct:.1f}% 이탈 시 추가 하락 방어를 위해 비중 조절({ma5_dynamic_stop:{fmt_p}}{currency})<br>"
-                        f" • <b>최후 방어선:</b> 바닥권 전저점({stop_loss_price:{fmt_p}}{currency}) 이탈 시 미련 없이 전량 칼손절 후퇴."
-                    )
-
-            # 신호등 설명글 보정
-            if final_code == "STOP_LOSS_ALERT":
-                s_adv = f" • <b>[긴급 집행] {stop_reason}!</b> 추가 손실을 막기 위해 미련 없이 즉시 전량 칼손절 후퇴하시게."
-            elif final_code == "RED_SELL_TARGET":
-                s_adv = " • <b>[수확 완료]</b> 수확 목표선에 거뜬히 도달했네! 물량 30~50%를 매도하며 수익을 확실하게 챙기시게.<br> • <b>[미보유자]</b> 고가 추격 매수 절대 금지!"
-            elif final_code == "RED_SELL_WARNING":
-                s_adv = " • <b>[경계 태세]</b> 성벽(방어선) 위에서 음봉이 발생했네! 5일선 지지 여부를 확인하며 기세가 꺾일 때를 대비해 분할 익절 준비를 하시게."
-            elif final_code == "YELLOW_CAUTION":
-                s_adv = " • <b>[경계 태세]</b> 성벽(방어선) 위 진입! 추격 매수는 철저히 차단하고, <b>수확</b> 목표선 도달 시 매도할 준비를 하시게."
-            elif final_code == "WAIT_OVER_EXTENDED":
-                s_adv = f" • <b>[과다이격 경계]</b> 5일선 대비 +{bias_ma5:.1f}% 벌어져 단기 과열 구간이오! 5일선 부근으로 이격을 좁힐 때까지 추격 매수 절대 금지."
-            elif final_code == "BOTTOM_ENTRY":
-                s_adv = " • <b>[입질 진격]</b> 진바닥 터치 + 거래량 유입 + 바닥 지지 캔들 포착! 소량 씨앗 뿌리기 진격 (전저점 방어선 철저 준수)."
-            elif final_code == "ESCAPE_BUY":
-                s_adv = " • <b>[추가 진격]</b> 최근 바닥 다진 후 거래량이 실리며 5일선 위 안착 성공! 배팅 비중을 늘려 밭을 다짐."
-            elif final_code == "PULLBACK_BUY":
-                s_adv = " • <b>[승수 확대]</b> 5일선·20일선 위 안착 및 활주로 확보로 알짜배기 추가 매수 집행."
-            elif final_code in ["WAIT_INDICATOR", "WAIT_MACD"]:
-                s_adv = " • <b>[지표 검증 대기]</b> 5일선 위에 있으나 바닥 지표 미충족 또는 MACD 하락세 지속 중이오! 뇌동 진입을 엄격히 금함."
-            elif final_code == "WAIT_PULLBACK":
-                s_adv = " • <b>[눌림목 지지 대기]</b> 20일선 영역이나 지표 동조 미흡 또는 밴드폭 협소! 확실한 지지 캔들과 거래량 확인 전까지 매수 보류."
-            elif final_code == "WAIT_VOLUME":
-                s_adv = " • <b>[수급 대기]</b> 기술적 바닥 신호는 충족했으나 거래량이 부족하니, 확실한 거래량 폭발 전까지 진입을 보류하시게."
-            else:
-                s_adv = " • <b>[관망 유지]</b> 확실한 바닥 신호나 매수/매도 조건이 맞을 때까지 손가락을 묶고 대기하시게."
-            
-            st.markdown(f"<div class='signal-box' style='background-color:{col};'><p class='signal-text'>{sig}</p><div class='signal-subtext'>{s_adv}</div></div>", unsafe_allow_html=True)
-
-            c1, c2, c3 = st.columns(3)
-            with c1: st.markdown(f"<div class='price-card'><p>⚖️ 공략 대기선 (볼린저하단)</p><p style='color:#388E3C; font-size:32px;'>{format(low_b, fmt_p)}</p></div>", unsafe_allow_html=True)
-            with c2: st.markdown(f"<div class='price-card'><p>🎯 수확 목표선 (볼린저상단)</p><p style='color:#D32F2F; font-size:32px;'>{format(target_price_100, fmt_p)}</p></div>", unsafe_allow_html=True)
-            with c3: st.markdown(f"<div class='price-card'><p>🛡️ 성벽(방어선)</p><p style='color:#E65100; font-size:32px;'>{format(defense_line, fmt_p)}</p></div>", unsafe_allow_html=True)
-
-            if defense_line > up_b:
-                def_status = f"성벽({defense_line:{fmt_p}}{currency})이 수확목표선({up_b:{fmt_p}}{currency})보다 높은 <b>[고점 매물대]</b> 구역이오! 1차 수확선에서 짧게 익절하고 관망하시게."
-            elif p >= defense_line:
-                if p >= prev_p and p >= ma5_val:
-                    def_status = f"성벽({defense_line:{fmt_p}}{currency}) 위에서 5일선 기세를 타고 <b>위로 진격 중</b>이네! 든든한 방어선을 등지고 계속 밀어붙이시게."
+                    profit_rate = ((p - user_avg_price) / user_avg_price) * 100
+                    if p >= user_avg_price:
+                        holder_guide_msg = (
+                            f" • <b>[수익권 보유자 (평단가: {user_avg_price:{fmt_p}}{currency} / 수익률: +{profit_rate:.2f}%)]</b><br>"
+                            f" • <b>기세 지속:</b> 5일선({ma5_val:{fmt_p}}{currency})을 이탈하지 않는 한 성벽 및 수확목표선까지 추세를 즐기시게.<br>"
+                            f" • <b>단기 트레이딩:</b> 5일선 -{dynamic_stop_pct:.1f}% 이탈 시 수익 보존을 위해 일부 분할 익절({ma5_dynamic_stop:{fmt_p}}{currency})<br>"
+                            f" • <b>수익 확정선:</b> 성벽 위 음봉 발생 또는 볼린저 상단 도달 시 분할 매도 집행."
+                        )
+                    else:
+                        holder_guide_msg = (
+                            f" • <b>[손실권 보유자 (평단가: {user_avg_price:{fmt_p}}{currency} / 손실률: {profit_rate:.2f}%)]</b><br>"
+                            f" • <b>5일선({ma5_val:{fmt_p}}{currency}) 아래에서는 추측 추가 매수(물타기)를 절대 금지하네.</b><br>"
+                            f" • <b>단기 트레이딩:</b> 5일선 -{dynamic_stop_pct:.1f}% 이탈 시 추가 하락 방어를 위해 비중 조절({ma5_dynamic_stop:{fmt_p}}{currency})<br>"
+                            f" • <b>최후 방어선:</b> 바닥권 전저점({stop_loss_price:{fmt_p}}{currency}) 이탈 시 미련 없이 전량 칼손절 후퇴."
+                        )
+
+                # 신호등 설명글 보정
+                if final_code == "STOP_LOSS_ALERT":
+                    s_adv = f" • <b>[긴급 집행] {stop_reason}!</b> 추가 손실을 막기 위해 미련 없이 즉시 전량 칼손절 후퇴하시게."
+                elif final_code == "RED_SELL_TARGET":
+                    s_adv = " • <b>[수확 완료]</b> 수확 목표선에 거뜬히 도달했네! 물량 30~50%를 매도하며 수익을 확실하게 챙기시게.<br> • <b>[미보유자]</b> 고가 추격 매수 절대 금지!"
+                elif final_code == "RED_SELL_WARNING":
+                    s_adv = " • <b>[경계 태세]</b> 성벽(방어선) 위에서 음봉이 발생했네! 5일선 지지 여부를 확인하며 기세가 꺾일 때를 대비해 분할 익절 준비를 하시게."
+                elif final_code == "YELLOW_CAUTION":
+                    s_adv = " • <b>[경계 태세]</b> 성벽(방어선) 위 진입! 추격 매수는 철저히 차단하고, <b>수확</b> 목표선 도달 시 매도할 준비를 하시게."
+                elif final_code == "WAIT_OVER_EXTENDED":
+                    s_adv = f" • <b>[과다이격 경계]</b> 5일선 대비 +{bias_ma5:.1f}% 벌어져 단기 과열 구간이오! 5일선 부근으로 이격을 좁힐 때까지 추격 매수 절대 금지."
+                elif final_code == "BOTTOM_ENTRY":
+                    s_adv = " • <b>[입질 진격]</b> 진바닥 터치 + 거래량 유입 + 바닥 지지 캔들 포착! 소량 씨앗 뿌리기 진격 (전저점 방어선 철저 준수)."
+                elif final_code == "ESCAPE_BUY":
+                    s_adv = " • <b>[추가 진격]</b> 최근 바닥 다진 후 거래량이 실리며 5일선 위 안착 성공! 배팅 비중을 늘려 밭을 다짐."
+                elif final_code == "PULLBACK_BUY":
+                    s_adv = " • <b>[승수 확대]</b> 5일선·20일선 위 안착 및 활주로 확보로 알짜배기 추가 매수 집행."
+                elif final_code in ["WAIT_INDICATOR", "WAIT_MACD"]:
+                    s_adv = " • <b>[지표 검증 대기]</b> 5일선 위에 있으나 바닥 지표 미충족 또는 MACD 하락세 지속 중이오! 뇌동 진입을 엄격히 금함."
+                elif final_code == "WAIT_PULLBACK":
+                    s_adv = " • <b>[눌림목 지지 대기]</b> 20일선 영역이나 지표 동조 미흡 또는 밴드폭 협소! 확실한 지지 캔들과 거래량 확인 전까지 매수 보류."
+                elif final_code == "WAIT_VOLUME":
+                    s_adv = " • <b>[수급 대기]</b> 기술적 바닥 신호는 충족했으나 거래량이 부족하니, 확실한 거래량 폭발 전까지 진입을 보류하시게."
                 else:
-                    def_status = f"성벽({defense_line:{fmt_p}}{currency}) 위에는 있으나 단기 기세가 <b>숨고르기 중</b>이네! 성벽 위 음봉 발생 시 선제적 익절을 준비하시게."
-            else:
-                if is_ma5_safe:
-                    def_status = f"성벽({defense_line:{fmt_p}}{currency}) 아래에 있으나, 단기 5일선<b>(생명선)을 사수</b>하며 반격의 시동을 거는 중이네!"
+                    s_adv = " • <b>[관망 유지]</b> 확실한 바닥 신호나 매수/매도 조건이 맞을 때까지 손가락을 묶고 대기하시게."
+            
+                st.markdown(f"<div class='signal-box' style='background-color:{col};'><p class='signal-text'>{sig}</p><div class='signal-subtext'>{s_adv}</div></div>", unsafe_allow_html=True)
+
+                c1, c2, c3 = st.columns(3)
+                with c1: st.markdown(f"<div class='price-card'><p>⚖️ 공략 대기선 (볼린저하단)</p><p style='color:#388E3C; font-size:32px;'>{format(low_b, fmt_p)}</p></div>", unsafe_allow_html=True)
+                with c2: st.markdown(f"<div class='price-card'><p>🎯 수확 목표선 (볼린저상단)</p><p style='color:#D32F2F; font-size:32px;'>{format(target_price_100, fmt_p)}</p></div>", unsafe_allow_html=True)
+                with c3: st.markdown(f"<div class='price-card'><p>🛡️ 성벽(방어선)</p><p style='color:#E65100; font-size:32px;'>{format(defense_line, fmt_p)}</p></div>", unsafe_allow_html=True)
+
+                if defense_line > up_b:
+                    def_status = f"성벽({defense_line:{fmt_p}}{currency})이 수확목표선({up_b:{fmt_p}}{currency})보다 높은 <b>[고점 매물대]</b> 구역이오! 1차 수확선에서 짧게 익절하고 관망하시게."
+                elif p >= defense_line:
+                    if p >= prev_p and p >= ma5_val:
+                        def_status = f"성벽({defense_line:{fmt_p}}{currency}) 위에서 5일선 기세를 타고 <b>위로 진격 중</b>이네! 든든한 방어선을 등지고 계속 밀어붙이시게."
+                    else:
+                        def_status = f"성벽({defense_line:{fmt_p}}{currency}) 위에는 있으나 단기 기세가 <b>숨고르기 중</b>이네! 성벽 위 음봉 발생 시 선제적 익절을 준비하시게."
                 else:
-                    def_status = f"성벽({defense_line:{fmt_p}}{currency}) 아래로 함락된 채 기세마저 밑으로 처박히고 있네! <b>절대 칼을 뽑지 마시게.</b>"
-
-            st.markdown(f"""<div class='trend-card'>
-<div class='trend-title'>⚔️ 실전 필살 대응 전략</div>
-<div style='margin-bottom: 20px;'>
-<span style='color: #1565C0; font-weight: 900; font-size: 24px;'>1. 단기 생명선(5일선) 사수</span><br>
-<span style='color: #333333; font-weight: bold; font-size: 20px;'>현재가({p:{fmt_p}}{currency})가 5일선({ma5_val:{fmt_p}}{currency}) {'아래로 이탈했으니 종가 안착 전까진 손가락을 묶으시게.' if not is_ma5_safe else '위에 안착하여 단기 전투선이 살아있네. 본진 진격 가능구역이오.'}</span>
-</div>
-<div style='margin-bottom: 20px;'>
-<span style='color: #1565C0; font-weight: 900; font-size: 24px;'>2. 성벽 사수 및 공방 확인</span><br>
-<span style='color: #333333; font-weight: bold; font-size: 20px;'>{def_status}</span>
-</div>
-<div style='margin-bottom: 20px;'>
-<span style='color: #1565C0; font-weight: 900; font-size: 24px;'>3. 중장기 추세 진단 및 지표 동조 현황</span><br>
-<span style='color: #333333; font-weight: bold; font-size: 20px;'>{indicator_verify_text}</span>
-</div>
-<div style='margin-bottom: 20px;'>
-<span style='color: #1565C0; font-weight: 900; font-size: 24px;'>4. 엔진(MACD) 확인</span><br>
-<span style='color: #333333; font-weight: bold; font-size: 20px;'>{macd_strategy_msg}</span>
-</div>
-<div style='margin-bottom: 25px;'>
-<span style='color: #D32F2F; font-weight: 900; font-size: 24px;'>5. 🛡️ [보유자 전용] 실전 행동 가이드</span><br>
-<span style='color: #2E7D32; font-weight: bold; font-size: 20px;'>👉 {holder_guide_msg}</span>
-</div>
-<hr style='border:1px solid #FFEBEE; margin: 20px 0;'>
-<div class='final-msg'>
-{final_adv}
-</div>
-</div>""", unsafe_allow_html=True)
-
-            st.divider()
+                    if is_ma5_safe:
+                        def_status = f"성벽({defense_line:{fmt_p}}{currency}) 아래에 있으나, 단기 5일선<b>(생명선)을 사수</b>하며 반격의 시동을 거는 중이네!"
+                    else:
+                        def_status = f"성벽({defense_line:{fmt_p}}{currency}) 아래로 함락된 채 기세마저 밑으로 처박히고 있네! <b>절대 칼을 뽑지 마시게.</b>"
+
+                st.markdown(f"""<div class='trend-card'>
+    <div class='trend-title'>⚔️ 실전 필살 대응 전략</div>
+    <div style='margin-bottom: 20px;'>
+    <span style='color: #1565C0; font-weight: 900; font-size: 24px;'>1. 단기 생명선(5일선) 사수</span><br>
+    <span style='color: #333333; font-weight: bold; font-size: 20px;'>현재가({p:{fmt_p}}{currency})가 5일선({ma5_val:{fmt_p}}{currency}) {'아래로 이탈했으니 종가 안착 전까진 손가락을 묶으시게.' if not is_ma5_safe else '위에 안착하여 단기 전투선이 살아있네. 본진 진격 가능구역이오.'}</span>
+    </div>
+    <div style='margin-bottom: 20px;'>
+    <span style='color: #1565C0; font-weight: 900; font-size: 24px;'>2. 성벽 사수 및 공방 확인</span><br>
+    <span style='color: #333333; font-weight: bold; font-size: 20px;'>{def_status}</span>
+    </div>
+    <div style='margin-bottom: 20px;'>
+    <span style='color: #1565C0; font-weight: 900; font-size: 24px;'>3. 중장기 추세 진단 및 지표 동조 현황</span><br>
+    <span style='color: #333333; font-weight: bold; font-size: 20px;'>{indicator_verify_text}</span>
+    </div>
+    <div style='margin-bottom: 20px;'>
+    <span style='color: #1565C0; font-weight: 900; font-size: 24px;'>4. 엔진(MACD) 확인</span><br>
+    <span style='color: #333333; font-weight: bold; font-size: 20px;'>{macd_strategy_msg}</span>
+    </div>
+    <div style='margin-bottom: 25px;'>
+    <span style='color: #D32F2F; font-weight: 900; font-size: 24px;'>5. 🛡️ [보유자 전용] 실전 행동 가이드</span><br>
+    <span style='color: #2E7D32; font-weight: bold; font-size: 20px;'>👉 {holder_guide_msg}</span>
+    </div>
+    <hr style='border:1px solid #FFEBEE; margin: 20px 0;'>
+    <div class='final-msg'>
+    {final_adv}
+    </div>
+    </div>""", unsafe_allow_html=True)
+
+                st.divider()
             
-            # --- 하단 4대 핵심 지표 박스 ---
-            i1, i2, i3, i4 = st.columns(4)
+                # --- 하단 4대 핵심 지표 박스 ---
+                i1, i2, i3, i4 = st.columns(4)
             
-            with i1:
-                if final_code == "BOTTOM_ENTRY":
-                    bb_diag = f"🔴 <b>[1단계 진바닥 입질 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 과매도 바닥권 선취매.<br>• <b>진단:</b> 지표 터치 + 거래량 유입 + 바닥 지지! 소량 입질 매수 시작 (전저점 마지노선 준수)."
-                elif final_code == "ESCAPE_BUY":
-                    bb_diag = f"🟢 <b>[2단계 진바닥 탈출 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 5일선 안착 후 배팅 확대.<br>• <b>진단:</b> 최근 바닥 확인 후 5일선 위 안착 성공! 추가 매수로 비중 확대."
-                elif final_code == "WAIT_VOLUME":
-                    bb_diag = f"🟡 <b>[수급 대기 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 속임수 반등 차단.<br>• <b>진단:</b> 바닥 기술 지표는 달성했으나 거래량이 부족하니, 확실한 수급 유입 전까지 진입 보류."
-                elif final_code == "PULLBACK_BUY":
-                    bb_diag = f"🔵 <b>[3단계 눌림목 추가 매수 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 추세 속 승수 확대.<br>• <b>진단:</b> 5·20일선 위 안정적 안착 및 활주로 확보로 알짜배기 추가 매수 집행."
-                elif final_code in ["RED_SELL_TARGET", "RED_SELL_WARNING"]:
-                    bb_diag = f"🔴 <b>[성벽 위 수확 및 음봉 익절 구간]</b><br>• <b>역할:</b> 고점 수익 확정.<br>• <b>진단:</b> 목표선 도달 또는 성벽 위 음봉 발생으로 선제적 익절 실행."
-                elif final_code == "YELLOW_CAUTION":
-                    bb_diag = f"🟡 <b>[성벽 위 경계 및 추격 차단 구역]</b><br>• <b>역할:</b> 고가 추격 매수 원천 차단.<br>• <b>진단:</b> 성벽 위 공방 중이므로 신규 매수를 금지하고 익절 타이밍을 노림."
-                elif final_code == "WAIT_OVER_EXTENDED":
-                    bb_diag = f"🟡 <b>[과다이격 추격 금지 구역] (5일선 이격: +{bias_ma5:.1f}%)</b><br>• <b>역할:</b> 고점 물림 방지.<br>• <b>진단:</b> 5일선 대비 5% 이상 벌어졌으니 5일선 부근 숨고르기까지 매수 보류."
-                elif final_code in ["WAIT_INDICATOR", "WAIT_MACD", "WAIT_PULLBACK"]:
-                    bb_diag = f"🟡 <b>[지표/밴드폭 검증 대기 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 속임수 휩소 방지.<br>• <b>진단:</b> 이평선에는 닿았으나 세부 지표 및 밴드폭 기준 미달로 관망 유지."
-                else:
-                    bb_diag = f"⚖️ <b>[관망 및 대기 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 뇌동매매 방지.<br>• <b>진단:</b> 명확한 바닥/추세 신호가 뜰 때까지 손가락을 묶고 관망 유지."
+                with i1:
+                    if final_code == "BOTTOM_ENTRY":
+                        bb_diag = f"🔴 <b>[1단계 진바닥 입질 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 과매도 바닥권 선취매.<br>• <b>진단:</b> 지표 터치 + 거래량 유입 + 바닥 지지! 소량 입질 매수 시작 (전저점 마지노선 준수)."
+                    elif final_code == "ESCAPE_BUY":
+                        bb_diag = f"🟢 <b>[2단계 진바닥 탈출 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 5일선 안착 후 배팅 확대.<br>• <b>진단:</b> 최근 바닥 확인 후 5일선 위 안착 성공! 추가 매수로 비중 확대."
+                    elif final_code == "WAIT_VOLUME":
+                        bb_diag = f"🟡 <b>[수급 대기 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 속임수 반등 차단.<br>• <b>진단:</b> 바닥 기술 지표는 달성했으나 거래량이 부족하니, 확실한 수급 유입 전까지 진입 보류."
+                    elif final_code == "PULLBACK_BUY":
+                        bb_diag = f"🔵 <b>[3단계 눌림목 추가 매수 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 추세 속 승수 확대.<br>• <b>진단:</b> 5·20일선 위 안정적 안착 및 활주로 확보로 알짜배기 추가 매수 집행."
+                    elif final_code in ["RED_SELL_TARGET", "RED_SELL_WARNING"]:
+                        bb_diag = f"🔴 <b>[성벽 위 수확 및 음봉 익절 구간]</b><br>• <b>역할:</b> 고점 수익 확정.<br>• <b>진단:</b> 목표선 도달 또는 성벽 위 음봉 발생으로 선제적 익절 실행."
+                    elif final_code == "YELLOW_CAUTION":
+                        bb_diag = f"🟡 <b>[성벽 위 경계 및 추격 차단 구역]</b><br>• <b>역할:</b> 고가 추격 매수 원천 차단.<br>• <b>진단:</b> 성벽 위 공방 중이므로 신규 매수를 금지하고 익절 타이밍을 노림."
+                    elif final_code == "WAIT_OVER_EXTENDED":
+                        bb_diag = f"🟡 <b>[과다이격 추격 금지 구역] (5일선 이격: +{bias_ma5:.1f}%)</b><br>• <b>역할:</b> 고점 물림 방지.<br>• <b>진단:</b> 5일선 대비 5% 이상 벌어졌으니 5일선 부근 숨고르기까지 매수 보류."
+                    elif final_code in ["WAIT_INDICATOR", "WAIT_MACD", "WAIT_PULLBACK"]:
+                        bb_diag = f"🟡 <b>[지표/밴드폭 검증 대기 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 속임수 휩소 방지.<br>• <b>진단:</b> 이평선에는 닿았으나 세부 지표 및 밴드폭 기준 미달로 관망 유지."
+                    else:
+                        bb_diag = f"⚖️ <b>[관망 및 대기 구역] (밴드폭: {bandwidth:.1f}%)</b><br>• <b>역할:</b> 뇌동매매 방지.<br>• <b>진단:</b> 명확한 바닥/추세 신호가 뜰 때까지 손가락을 묶고 관망 유지."
                 
-                st.markdown(f"<div class='ind-box'><p class='ind-title'>Bollinger (기세/위치)</p><p class='ind-diag'>{bb_diag}</p></div>", unsafe_allow_html=True)
+                    st.markdown(f"<div class='ind-box'><p class='ind-title'>Bollinger (기세/위치)</p><p class='ind-diag'>{bb_diag}</p></div>", unsafe_allow_html=True)
             
-            with i2:
-                rsi_trend = "▲ 상승" if rsi_val > rsi_prev else ("▼ 하락" if rsi_val < rsi_prev else "─ 변동없음")
-                if rsi_val >= 60: 
-                    r_status = f"<b>👿 불지옥 과열권</b><br>• <b>역할:</b> 매수 에너지 고갈 경보.<br>• <b>진단:</b> 과열 구간 진입, 성벽 위 익절 및 차익 실현을 준비하시게."
-                elif rsi_val <= 35: 
-                    r_status = f"<b>🧊 냉골 바닥권</b><br>• <b>역할:</b> 진바닥 수급 에너지 감지.<br>• <b>진단:</b> 바닥권 지표 터치 및 거래량 유입 시 1단계 입질 매수 타이밍."
-                else: 
-                    r_status = f"<b>⚖️ 적정 온도 구간</b><br>• <b>역할:</b> 에너지 충전 및 눌림목 동조.<br>• <b>진단:</b> 에너지 충전 중. 보조지표 고개 돌림을 주시하시게."
-                st.markdown(f"<div class='ind-box'><p class='ind-title'>RSI (매수 온도)</p><p style='font-size:36px; color:#E65100; margin:10px 0;'>{rsi_val:.2f} <span style='font-size:22px; color:#333333;'>({rsi_trend})</span></p><p class='ind-diag'>{r_status}</p></div>", unsafe_allow_html=True)
+                with i2:
+                    rsi_trend = "▲ 상승" if rsi_val > rsi_prev else ("▼ 하락" if rsi_val < rsi_prev else "─ 변동없음")
+                    if rsi_val >= 60: 
+                        r_status = f"<b>👿 불지옥 과열권</b><br>• <b>역할:</b> 매수 에너지 고갈 경보.<br>• <b>진단:</b> 과열 구간 진입, 성벽 위 익절 및 차익 실현을 준비하시게."
+                    elif rsi_val <= 35: 
+                        r_status = f"<b>🧊 냉골 바닥권</b><br>• <b>역할:</b> 진바닥 수급 에너지 감지.<br>• <b>진단:</b> 바닥권 지표 터치 및 거래량 유입 시 1단계 입질 매수 타이밍."
+                    else: 
+                        r_status = f"<b>⚖️ 적정 온도 구간</b><br>• <b>역할:</b> 에너지 충전 및 눌림목 동조.<br>• <b>진단:</b> 에너지 충전 중. 보조지표 고개 돌림을 주시하시게."
+                    st.markdown(f"<div class='ind-box'><p class='ind-title'>RSI (매수 온도)</p><p style='font-size:36px; color:#E65100; margin:10px 0;'>{rsi_val:.2f} <span style='font-size:22px; color:#333333;'>({rsi_trend})</span></p><p class='ind-diag'>{r_status}</p></div>", unsafe_allow_html=True)
             
-            with i3:
-                will_trend = "▲ 상승" if will_val > will_prev else ("▼ 하락" if will_val < will_prev else "─ 변동없음")
-                if will_val >= -20: 
-                    w_status = "<b>🚀 상방 돌파 도전 구역</b><br>• <b>역할:</b> 단기 상향 압력 측정.<br>• <b>진단:</b> 성벽 위 목표선 근접 구역이오. 음봉 발생 시 선제적 매도 대비."
-                elif will_val <= -80: 
-                    w_status = "<b>🏳️ 개미 항복 구역</b><br>• <b>역할:</b> 세력 선취매 및 반전 포착.<br>• <b>진단:</b> 🧊 <b>[바닥 침체]</b> -80 밑 투매 진행 중! 지표 동조 및 거래량 유입 시 입질 대기."
-                else: 
-                    w_status = "<b>⚖️ 중간 지대</b><br>• <b>역할:</b> 추세 방향 탐색.<br>• <b>진단:</b> 상/하방 방향 탐색 중."
-                st.markdown(f"<div class='ind-box'><p class='ind-title'>Williams %R (민감 반전)</p><p style='font-size:36px; color:#E65100; margin:10px 0;'>{will_val:.2f} <span style='font-size:22px; color:#333333;'>({will_trend})</span></p><p class='ind-diag'>{w_status}</p></div>", unsafe_allow_html=True)
+                with i3:
+                    will_trend = "▲ 상승" if will_val > will_prev else ("▼ 하락" if will_val < will_prev else "─ 변동없음")
+                    if will_val >= -20: 
+                        w_status = "<b>🚀 상방 돌파 도전 구역</b><br>• <b>역할:</b> 단기 상향 압력 측정.<br>• <b>진단:</b> 성벽 위 목표선 근접 구역이오. 음봉 발생 시 선제적 매도 대비."
+                    elif will_val <= -80: 
+                        w_status = "<b>🏳️ 개미 항복 구역</b><br>• <b>역할:</b> 세력 선취매 및 반전 포착.<br>• <b>진단:</b> 🧊 <b>[바닥 침체]</b> -80 밑 투매 진행 중! 지표 동조 및 거래량 유입 시 입질 대기."
+                    else: 
+                        w_status = "<b>⚖️ 중간 지대</b><br>• <b>역할:</b> 추세 방향 탐색.<br>• <b>진단:</b> 상/하방 방향 탐색 중."
+                    st.markdown(f"<div class='ind-box'><p class='ind-title'>Williams %R (민감 반전)</p><p style='font-size:36px; color:#E65100; margin:10px 0;'>{will_val:.2f} <span style='font-size:22px; color:#333333;'>({will_trend})</span></p><p class='ind-diag'>{w_status}</p></div>", unsafe_allow_html=True)
             
-            with i4:
-                if is_macd_accelerating:
-                    m_diag = "<b>🔥 엔진 정회전 가속</b><br>• <b>역할:</b> 상승 추진력 폭발.<br>• <b>진단:</b> 성벽 사수하며 5일선 타고 목표선까지 거침없이 진격하시게."
-                elif is_macd_decelerating:
-                    m_diag = "<b>⚠️ 엔진 정회전 둔화</b><br>• <b>역할:</b> 상승 탄력 저하 감지.<br>• <b>진단:</b> 상승세는 유지 중이나 추진력이 꺾였으니, 성벽 위 분할 익절을 준비하시게."
-                elif is_macd_recovering:
-                    m_diag = "<b>🌤️ 역회전 감소</b><br>• <b>역할:</b> 하락 둔화 / 반등 시동.<br>• <b>진단:</b> 매도세 소멸 중! 5일선 안착(2단계) 및 거래량 확인 시 추매 준비하시게."
-                else:
-                    m_diag = "<b>⚙️ 엔진 역회전 심화</b><br>• <b>역할:</b> 하락 조정 가속.<br>• <b>진단:</b> 하락 관성 지속. 신규 매수 및 물타기 금지, 관망하시게."
-
-                st.markdown(f"<div class='ind-box'><p class='ind-title'>MACD (추세 엔진)</p><p class='ind-diag'>{m_diag}</p></div>", unsafe_allow_html=True)
+                with i4:
+                    if is_macd_accelerating:
+                        m_diag = "<b>🔥 엔진 정회전 가속</b><br>• <b>역할:</b> 상승 추진력 폭발.<br>• <b>진단:</b> 성벽 사수하며 5일선 타고 목표선까지 거침없이 진격하시게."
+                    elif is_macd_decelerating:
+                        m_diag = "<b>⚠️ 엔진 정회전 둔화</b><br>• <b>역할:</b> 상승 탄력 저하 감지.<br>• <b>진단:</b> 상승세는 유지 중이나 추진력이 꺾였으니, 성벽 위 분할 익절을 준비하시게."
+                    elif is_macd_recovering:
+                        m_diag = "<b>🌤️ 역회전 감소</b><br>• <b>역할:</b> 하락 둔화 / 반등 시동.<br>• <b>진단:</b> 매도세 소멸 중! 5일선 안착(2단계) 및 거래량 확인 시 추매 준비하시게."
+                    else:
+                        m_diag = "<b>⚙️ 엔진 역회전 심화</b><br>• <b>역할:</b> 하락 조정 가속.<br>• <b>진단:</b> 하락 관성 지속. 신규 매수 및 물타기 금지, 관망하시게."
+
+                    st.markdown(f"<div class='ind-box'><p class='ind-title'>MACD (추세 엔진)</p><p class='ind-diag'>{m_diag}</p></div>", unsafe_allow_html=True)
+
+            render_diagnosis(p, v_curr, now_local, quote_src)
     except Exception as e: st.error(f"👵 아이구! 오류: {e}")
+
+with global_slot:
+    display_global_risk()
+
+# 첫 화면을 다 그린 뒤에야 나머지 무거운 모듈·상장 목록을 뒤에서 데움 (프로세스당 한 번)
+prewarm.start("us" if symbol and not symbol.isdigit() else "kr", names=refresh_name_index)
+
+# ==============================================================================
+# ★ [관심종목 / 시장 전체 일괄 냉정 진단]
+# ==============================================================================
+st.divider()
+with st.expander("📋 관심종목 일괄 냉정 진단 (여러 종목 한 번에)"):
+    scan_scope = st.radio("진단 범위", ["관심종목", "KOSPI 전체", "KOSDAQ 전체"], horizontal=True)
+    watchlist_str = st.text_area("관심종목 (쉼표/줄바꿈 구분)", "005930, 000660, 033100, 257720, 058610")
+    scan_offline = st.checkbox("저장된 일봉만 사용 (네트워크 없이 빠르게)", value=scan_scope != "관심종목")
+    if st.button("🚀 일괄 진단 시작"):
+        if scan_scope == "관심종목":
+            scan_symbols = [s for s in watchlist_str.replace("\n", ",").split(",") if s.strip()]
+        else:
+            scan_symbols = krx_universe(load_krx_listing(), scan_scope.split()[0])
+        with st.spinner(f"{len(scan_symbols)}개 종목 진단 중..."):
+            scan_df = scan(scan_symbols, refresh=not scan_offline)
+        name_idx = get_name_index()
+        scan_df.insert(1, "name", [name_idx.name(s) or s for s in scan_df["symbol"]])
+        st.dataframe(scan_df, use_container_width=True, hide_index=True)
+
+# ==============================================================================
+# ★ [공용 보급 창고 현황: 종류별 적중/합류/헛걸음/실패]
+# ==============================================================================
+with st.sidebar.expander("🧮 공용 보급 창고 현황"):
+    cache_stats = SHARED.stats()
+    if cache_stats:
+        st.dataframe(pd.DataFrame(cache_stats).T, use_container_width=True)
+    else:
+        st.caption("아직 보급 기록이 없구먼.")
+    pool_stats = http_pool.stats()
+    if pool_stats:
+        st.caption("🔌 네이버 연결 풀 (재시도 / 시간 초과 / 최근 응답·제한 시간 ms)")
+        st.dataframe(pd.DataFrame(pool_stats).T, use_container_width=True)
+    limit_stats = rate_limit.stats()
+    if limit_stats:
+        st.caption("🚦 보급처별 속도 제한 (용도별 통과 / 줄섬 / 포기 / 평균 대기 ms)")
+        st.dataframe(pd.DataFrame(limit_stats).T, use_container_width=True)
+    st.caption("🧮 진단 층층 기억 (일봉 상태 / 현재가 지표 / 신호등 - 적중 / 계산 / 버림 / 보관 수)")
+    st.dataframe(pd.DataFrame(memo.stats()).T, use_container_width=True)
+
+# ==============================================================================
+# ★ [속도 계측 디버그: 이번 화면 그리기의 구간별 소요 시간]
+# ==============================================================================
+if st.sidebar.checkbox("🛠 구간별 속도 계측 보기", key="debug_timing"):
+    if run_spans:
+        span_df = pd.DataFrame(run_spans)
+        span_cols = [c for c in ("stage", "source", "symbol", "ms", "outcome", "error") if c in span_df.columns]
+        st.sidebar.dataframe(span_df[span_cols], use_container_width=True, hide_index=True)
+        st.sidebar.caption("※ 보급처 경주는 동시에 달리니 구간 합계가 전체 시간보다 클 수 있구먼. 하루치 p50/p95: python -m yisoo.timing")
+    else:
+        st.sidebar.caption("아직 계측 기록이 없구먼.")
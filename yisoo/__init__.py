@@ -0,0 +1,8 @@
+"""이수할아버지의 냉정 진단기 - 화면(yisoo-app.py) 뒤에서 도는 보급/연산 부품 모음"""
+import os
+
+# 로컬 보관소(시세 저장소, 캐시 파일 등)의 기본 위치. 컨테이너에서는 환경변수로 바꿔 끼우면 된다.
+DATA_DIR = os.environ.get(
+    "YISOO_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".yisoo_data"),
+)
@@ -0,0 +1,257 @@
+"""관심종목 감시병 - 화면을 열어 두지 않아도 신호등이 바뀌거나 성벽·손절선·목표선을 넘나들 때만 알린다.
+
+asyncio 로 관심종목 전체를 interval 초마다 한 바퀴 돌며 시세를 받고(동시 출격 수 제한),
+종목마다 어제까지의 지표 상태(IndicatorState)를 메모리에 들고 오늘 봉만 얹어 판정한다.
+종목당 상태는 날이 바뀔 때만 새로 만들고, 알림 대기열도 크기가 정해져 있어 수백 종목도 코어 하나로 돈다.
+장 달력(sessions)을 따라 장이 닫힌 시장의 종목은 건너뛰고, 두 시장이 다 닫히면 다음 장 전환까지 잔다
+(장 전/후에는 주기를 느슨히). --once 는 장 상태와 상관없이 전부 한 바퀴 돈다.
+
+    python -m yisoo.alerts 005930 000660 AAPL --interval 30
+    python -m yisoo.alerts --watchlist watch.txt --sink file:alerts.jsonl --sink webhook:http://127.0.0.1:9000/hook
+    python -m yisoo.alerts 005930 --once --emit-initial      # 한 바퀴만 돌고 지금 신호등을 그대로 내보냄
+
+알림(event) 형식: {ts, symbol, kind: signal|level, ...}
+    signal: {from, to, price}                      신호등(final_code) 변경
+    level:  {level, value, direction: up|down, price}  현재가가 성벽/손절선/목표선을 넘나듦
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from zoneinfo import ZoneInfo
+
+from . import sessions, snapshot, timing
+from .bar_store import BarStore
+from .incremental import IndicatorState, diagnose_live
+from .market_feed import fetch_kr_history, fetch_kr_quote, fetch_us_history, fetch_us_quote
+from .volume_profile import volume_curve
+
+HISTORY_DAYS = 500
+MAX_IDLE_SEC = 1800.0  # 장이 다 닫혀 있을 때 한 번에 자는 최대 시간
+# 넘나듦을 지켜볼 가격선 (diagnose 결과 키 → 이름)
+LEVELS = {"defense_line": "성벽", "stop_loss_price": "손절선", "target_price_100": "목표선"}
+
+
+class Watch:
+    """종목 하나의 감시 상태: 오늘의 지표 상태, 마지막 신호등, 가격선별 위/아래"""
+    __slots__ = ("symbol", "is_kr", "market", "tz", "state", "day", "curve", "code", "sides")
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.is_kr = symbol.isdigit()
+        self.market = sessions.market_of(symbol)
+        self.tz = ZoneInfo('Asia/Seoul') if self.is_kr else ZoneInfo('America/New_York')
+        self.state = self.day = self.curve = self.code = None
+        self.sides = {}
+
+    def update(self, d, p, emit_initial=False):
+        """새 진단값으로 바뀐 것만 알림 목록으로"""
+        events = []
+        code = d["final_code"]
+        if code != self.code and (self.code is not None or emit_initial):
+            events.append({"kind": "signal", "from": self.code, "to": code, "price": p})
+        self.code = code
+        for key, name in LEVELS.items():
+            value = d.get(key)
+            if value is None or value != value:
+                continue
+            side = p >= value
+            prev = self.sides.get(key)
+            if prev is not None and prev != side:
+                events.append({"kind": "level", "level": name, "value": float(value), "direction": "up" if side else "down", "price": p})
+            self.sides[key] = side
+        stamp = datetime.now(self.tz).isoformat(timespec="seconds")
+        return [{"ts": stamp, "symbol": self.symbol, **e} for e in events]
+
+
+# --- [알림 받는 곳] ---
+class StdoutSink:
+    async def emit(self, event):
+        print(json.dumps(event, ensure_ascii=False), flush=True)
+
+
+class FileSink:
+    """JSON 한 줄씩 덧붙임"""
+
+    def __init__(self, path):
+        self.path = path
+
+    async def emit(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class WebhookSink:
+    """알림을 JSON 으로 POST (로컬 webhook 받이 등)"""
+
+    def __init__(self, url, timeout=3.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def emit(self, event):
+        await asyncio.to_thread(self._post, event)
+
+    def _post(self, event):
+        import requests
+
+        requests.post(self.url, json=event, timeout=self.timeout).raise_for_status()
+
+
+SINKS = {"stdout": StdoutSink, "file": FileSink, "webhook": WebhookSink}
+
+
+def make_sink(spec):
+    """'stdout' / 'file:경로' / 'webhook:URL'"""
+    name, _, arg = spec.partition(":")
+    if name not in SINKS:
+        raise ValueError(f"unknown sink: {spec} (stdout / file:PATH / webhook:URL)")
+    return SINKS[name](arg) if arg else SINKS[name]()
+
+
+# --- [감시병] ---
+class AlertDaemon:
+    def __init__(self, symbols, sinks, interval=30.0, concurrency=16, store=None, emit_initial=False, queue_size=1000):
+        self.watches = [Watch(s) for s in dict.fromkeys(s.strip().upper() for s in symbols if s.strip())]
+        self.sinks = sinks
+        self.interval = interval
+        self.concurrency = concurrency
+        self.store = store or BarStore()
+        self.emit_initial = emit_initial
+        self.queue_size = queue_size
+        self.stats = {"rounds": 0, "polls": 0, "closed_skips": 0, "errors": 0, "events": 0, "dropped": 0, "sink_errors": 0}
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, partial(fn, *args))
+
+    async def _prepare(self, w, today):
+        """날이 바뀌면 어제까지의 지표 상태를 새로 만든다 (저녁 스냅샷이 맞으면 그대로 되살림)"""
+        start = datetime.now() - timedelta(days=HISTORY_DAYS)
+        df = await self._call(self.store.history, w.symbol, start, fetch_kr_history if w.is_kr else fetch_us_history)
+        if df.empty:
+            raise LookupError(f"no history for {w.symbol}")
+        w.state = snapshot.lookup(w.symbol, df, today) or await self._call(IndicatorState.for_today, df, today)
+        w.curve = await self._call(volume_curve, w.symbol)
+        w.day = today
+
+    async def poll(self, w):
+        now_local = datetime.now(w.tz)
+        if w.day != now_local.date():
+            await self._prepare(w, now_local.date())
+        values, _ = await self._call(fetch_kr_quote if w.is_kr else fetch_us_quote, w.symbol)
+        p = values.get("price")
+        if not p:
+            return
+        d = diagnose_live(w.state, p, values.get("volume") or 0.0, now_local, w.is_kr,
+                          prev_p=values.get("prev_close"), volume_curve=w.curve)
+        for event in w.update(d, p, self.emit_initial):
+            self._publish(event)
+
+    def _publish(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()  # 받는 곳이 밀리면 오래된 알림부터 버린다
+            self.stats["dropped"] += 1
+        self.queue.put_nowait(event)
+        self.stats["events"] += 1
+
+    async def _guarded(self, sem, w):
+        async with sem:
+            try:
+                await self.poll(w)
+                self.stats["polls"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[감시병] {w.symbol}: {type(e).__name__}: {e}", file=sys.stderr)
+
+    def _schedule(self):
+        """시장별 이번 주기 {시장: 초 또는 None(닫힘)}"""
+        return {m: sessions.poll_interval(m, regular=self.interval) for m in {w.market for w in self.watches}}
+
+    def _next_sleep(self, schedule):
+        """열린 시장 중 가장 촘촘한 주기. 다 닫혔으면 가장 이른 장 전환까지 (MAX_IDLE_SEC 한도)"""
+        open_ = [sec for sec in schedule.values() if sec]
+        if open_:
+            return min(open_)
+        now = datetime.now().astimezone()
+        until = min((sessions.next_change(m, now) - now).total_seconds() for m in schedule) if schedule else self.interval
+        return min(MAX_IDLE_SEC, max(self.interval, until))
+
+    async def run_round(self, schedule=None):
+        """한 바퀴. schedule 을 주면 닫힌 시장의 종목은 건너뛴다 (없으면 전부)"""
+        sem = asyncio.Semaphore(self.concurrency)
+        targets = [w for w in self.watches if schedule is None or schedule.get(w.market)]
+        self.stats["closed_skips"] += len(self.watches) - len(targets)
+        await asyncio.gather(*(self._guarded(sem, w) for w in targets))
+        self.stats["rounds"] += 1
+
+    async def _deliver(self):
+        while True:
+            event = await self.queue.get()
+            for sink in self.sinks:
+                try:
+                    await sink.emit(event)
+                except Exception as e:
+                    self.stats["sink_errors"] += 1
+                    print(f"[감시병] 알림 전달 실패 {type(sink).__name__}: {e}", file=sys.stderr)
+            self.queue.task_done()
+
+    async def run(self, once=False):
+        self.queue = asyncio.Queue(self.queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="yisoo-alert")
+        deliver = asyncio.create_task(self._deliver())
+        try:
+            while True:
+                started = time.monotonic()
+                schedule = None if once else self._schedule()
+                await self.run_round(schedule)
+                if once:
+                    break
+                await asyncio.sleep(max(0.0, self._next_sleep(schedule) - (time.monotonic() - started)))
+            await self.queue.join()
+        finally:
+            deliver.cancel()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def read_watchlist(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.split("#")[0].strip() for line in f if line.split("#")[0].strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="관심종목 신호등 감시병")
+    parser.add_argument("symbols", nargs="*", help="종목번호 또는 티커")
+    parser.add_argument("--watchlist", help="종목을 한 줄에 하나씩 적은 파일 (# 뒤는 주석)")
+    parser.add_argument("--interval", type=float, default=30.0, help="정규장 한 바퀴 주기(초). 장 전/후엔 느슨히, 닫힌 장은 건너뜀")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 시세 출격 수")
+    parser.add_argument("--sink", action="append", default=[], help="stdout / file:PATH / webhook:URL (여러 번 가능)")
+    parser.add_argument("--once", action="store_true", help="한 바퀴만 돌고 끝냄")
+    parser.add_argument("--emit-initial", action="store_true", help="처음 본 신호등도 알림으로 내보냄")
+    parser.add_argument("--timing", action="store_true", help="구간 계측을 로그 파일에 남김 (기본: 끔)")
+    args = parser.parse_args(argv)
+
+    symbols = list(args.symbols) + (read_watchlist(args.watchlist) if args.watchlist else [])
+    if not symbols:
+        parser.error("감시할 종목을 적으시게 (인자 또는 --watchlist)")
+    try:
+        sinks = [make_sink(s) for s in args.sink or ["stdout"]]
+    except ValueError as e:
+        parser.error(str(e))
+    timing.ENABLED = args.timing  # 수백 종목을 계속 돌면 로그가 금방 불어난다
+    daemon = AlertDaemon(symbols, sinks, args.interval, args.concurrency, emit_initial=args.emit_initial)
+    try:
+        asyncio.run(daemon.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
+    print(f"[감시병] {daemon.stats}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
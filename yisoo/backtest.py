@@ -0,0 +1,369 @@
+"""신호등 과거 복기 장치 - decide() 의 1·2·3단계 매수 / 성벽 매도 규칙을 모든 과거 봉에 한꺼번에 적용
+
+하루씩 돌리는 루프 없이 (날짜 × 종목) 판 위의 불리언 마스크로 신호등을 통째로 계산한다.
+각 봉은 '그날 장 마감 뒤 냉정 진단'과 같다 (scanner 와 같이 현재가=종가, 거래량 시간보정 없음).
+
+매매 규칙
+- 보유 없음: 신호등이 BOTTOM_ENTRY / ESCAPE_BUY / PULLBACK_BUY 면 그날 종가에 매수
+- 보유 중: 평단가를 넣은 진단(손절선 이탈 포함)이 STOP_LOSS_ALERT / RED_SELL_WARNING / RED_SELL_TARGET 이면 그날 종가에 매도
+- 매도 다음 봉부터 다시 매수 신호를 찾는다. 끝까지 못 판 매매는 마지막 봉 종가로 평가(open)
+
+    python -m yisoo.backtest 005930 000660 --years 10
+    python -m yisoo.backtest --market KOSPI --offline
+    python -m yisoo.backtest --panel                 # 가격 판의 국내 종목 전부
+"""
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .diagnosis import SIGNAL_CODES
+from .indicators import _shift, build_panel, compute_indicators, rolling_max, rolling_mean, rolling_min
+from .params import DEFAULT_PARAMS
+
+CODE_INDEX = {c: i for i, c in enumerate(SIGNAL_CODES)}
+BUY_CODES = ("BOTTOM_ENTRY", "ESCAPE_BUY", "PULLBACK_BUY")
+SELL_CODES = ("STOP_LOSS_ALERT", "RED_SELL_WARNING", "RED_SELL_TARGET")
+STAGE_NAMES = {"BOTTOM_ENTRY": "1단계 진바닥 입질", "ESCAPE_BUY": "2단계 탈출", "PULLBACK_BUY": "3단계 눌림목"}
+NO_DATA = -1
+
+
+# --- [판 다듬기] ---
+def ffill_panel(x):
+    """종목별(열) 앞 값으로 빈칸 채우기 - 상장 전 앞쪽 NaN 은 그대로 둔다 (diagnose_frame 의 ffill 과 같음)"""
+    t = np.arange(len(x))[:, None]
+    last = np.maximum.accumulate(np.where(np.isnan(x), 0, t), axis=0)
+    out = x[last, np.arange(x.shape[1])]
+    return out
+
+
+def _expanding_mean(x):
+    valid = ~np.isnan(x)
+    return np.cumsum(np.where(valid, x, 0.0), axis=0) / np.maximum(np.cumsum(valid, axis=0), 1)
+
+
+def _expanding_min(x):
+    return np.fmin.accumulate(x, axis=0)
+
+
+# --- [신호등 판: decide() 를 마스크로 옮김] ---
+def signal_base(open_, high, low, close, volume, ind=None):
+    """문턱값과 무관한 중간 판 묶음 - 문턱값 조합을 여러 번 돌릴 때 한 번만 만들어 재사용한다.
+
+    ind 에 compute_indicators 결과를 주면 지표도 다시 계산하지 않는다.
+    """
+    o, h, lo, p, v = open_, high, low, close, volume
+    ind = compute_indicators(h, lo, p) if ind is None else ind
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid = ~np.isnan(p)
+        n = np.cumsum(valid, axis=0)
+
+        # 거래량: 직전 5봉 평균 (6봉 미만이면 오늘 포함 전체 평균), 장 마감 기준이라 시간보정 없음
+        v_avg5 = np.where(n >= 6, rolling_mean(_shift(v, 1), 5), _expanding_mean(v))
+        prev_p = np.where(n >= 2, _shift(p, 1), p)
+
+        # MACD 4단계 중 '역회전 심화'만 판정에 쓰인다
+        curr_diff = ind["MACD"] - ind["SIGNAL"]
+        is_macd_bullish = ind["MACD"] > ind["SIGNAL"]
+
+        mid_line, up_b, low_b = ind["MA20"], ind["BB_UP"], ind["BB_LOW"]
+        ma5_val = np.where(n >= 5, ind["MA5"], mid_line)
+        atr_14 = np.where(n >= 14, ind["ATR14"], _expanding_mean(ind["TR"]))
+        rsi, will = ind["RSI"], ind["WILL"]
+        return {
+            "valid": valid, "p": p, "o": o, "mid_line": mid_line, "up_b": up_b, "low_b": low_b, "ma5_val": ma5_val,
+            "vol_strength": np.where(v_avg5 > 0, v / v_avg5 * 100, 0.0),
+            "p_chg": np.where(prev_p > 0, (p - prev_p) / prev_p * 100, 0.0),
+            "is_macd_not_deepening": ~(~is_macd_bullish & (curr_diff <= _shift(curr_diff, 1))),
+            "bandwidth": np.where(mid_line > 0, (up_b - low_b) / mid_line * 100, 0.0),
+            "bias_ma5": np.where(ma5_val > 0, (p - ma5_val) / ma5_val * 100, 0.0),
+            # 캔들
+            "candle_range": np.maximum(0.01, h - lo),
+            "lower_tail": np.minimum(o, p) - lo,
+            "body_len": np.abs(o - p),
+            # ATR 손절 / 전저점 / 성벽 (20일 고점, 첫 봉은 현재가)
+            "atr_ratio": np.where(ma5_val > 0, atr_14 / ma5_val, np.nan),
+            "prev_low": np.where(n > 60, rolling_min(_shift(lo, 1), 60), _expanding_min(lo)),
+            "defense_high": np.where(n > 1, rolling_max(_shift(h, 1), 20, 1), p),
+            # 2~3일 바닥 기억용 최근 3봉
+            "recent": [(_shift(p, k), _shift(rsi, k), _shift(will, k)) for k in (0, 1, 2)],
+            "rsi": rsi, "will": will,
+        }
+
+
+def signal_panels(open_, high, low, close, volume, ind=None, params=DEFAULT_PARAMS, base=None):
+    """(보유 없음, 보유 중) 두 벌의 (T, N) 신호등 코드 번호 판 (SIGNAL_CODES 의 위치, 자료 없는 칸은 NO_DATA)
+
+    보유 중(평단가 > 0)은 현재가가 손절선 아래면 STOP_LOSS_ALERT 인 것만 다르다.
+    base 에 signal_base 결과를 주면 문턱값 부분만 계산한다.
+    """
+    base = signal_base(open_, high, low, close, volume, ind) if base is None else base
+    return codes_from_base(base, params)
+
+
+def codes_from_base(base, params=DEFAULT_PARAMS):
+    """signal_base 결과에 문턱값만 적용한 (보유 없음, 보유 중) 신호등 판"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _codes(base, params)
+
+
+def signal_panel(open_, high, low, close, volume, ind=None, held=False, params=DEFAULT_PARAMS):
+    """signal_panels 중 한 벌"""
+    return signal_panels(open_, high, low, close, volume, ind, params)[1 if held else 0]
+
+
+def _codes(b, P):
+    p, mid_line, ma5_val = b["p"], b["mid_line"], b["ma5_val"]
+    vol_ok = b["vol_strength"] >= P.vol_entry
+    is_macd_not_deepening = b["is_macd_not_deepening"]
+    is_over_extended_5 = b["bias_ma5"] >= P.over_extended_bias
+
+    # 캔들
+    lower_tail = b["lower_tail"]
+    is_pure_bullish_candle = p >= b["o"]
+    is_bottom_lower_tail = (lower_tail >= b["candle_range"] * P.tail_range_ratio) | (lower_tail >= b["body_len"] * P.tail_body_ratio)
+    is_valid_bottom_candle = is_pure_bullish_candle | is_bottom_lower_tail
+    is_trend_lower_tail = is_bottom_lower_tail & (p >= ma5_val) & (b["p_chg"] >= P.trend_tail_min_chg)
+    is_valid_buy_candle = is_pure_bullish_candle | is_trend_lower_tail
+    is_bearish_candle = ~is_pure_bullish_candle & ~is_trend_lower_tail
+
+    # ATR 동적 손절 / 성벽
+    atr_ratio = np.where(np.isnan(b["atr_ratio"]), P.atr_stop_default, b["atr_ratio"])
+    dynamic_stop_price = ma5_val * (1 - np.clip(atr_ratio, P.atr_stop_min, P.atr_stop_max))
+    prev_low = b["prev_low"]
+    stop_loss_price = np.where(p < ma5_val, prev_low, dynamic_stop_price)
+    defense_line = b["defense_high"] * P.defense_ratio
+    is_ma5_safe = p >= ma5_val
+
+    # 2~3일 바닥 기억 (오늘 볼린저 하단 기준으로 최근 3봉 비교)
+    low_line = b["low_b"] * P.bottom_bb_margin
+    scores = [(c <= low_line).astype(np.int8) + (r <= P.rsi_bottom) + (w <= P.will_bottom) for c, r, w in b["recent"]]
+    bottom_score = scores[0]
+    recent_bottom_memory = np.maximum(np.maximum(scores[0], scores[1]), scores[2]) >= P.bottom_min_score
+    is_bottom_indicator_ok = (bottom_score >= P.bottom_min_score) | recent_bottom_memory
+
+    rsi, will = b["rsi"], b["will"]
+    pullback_rebound_score = (
+        (will <= P.will_pullback).astype(np.int8)
+        + ((mid_line * (1 - P.pullback_mid_band) <= p) & (p <= mid_line * (1 + P.pullback_mid_band)))
+        + ((P.rsi_pullback_low <= rsi) & (rsi <= P.rsi_pullback_high))
+    )
+
+    is_stop_loss_triggered = is_bottom_indicator_ok & (p < prev_low)
+    is_held_stop_triggered = is_stop_loss_triggered | (p < stop_loss_price)
+
+    target_price_100 = b["up_b"]
+    is_target_reached = p >= target_price_100 * P.target_ratio
+    is_on_the_wall = (p >= defense_line) & (p < target_price_100)
+    is_bandwidth_ok = b["bandwidth"] >= P.min_bandwidth
+
+    is_bottom_entry_signal = (bottom_score >= P.bottom_min_score) & vol_ok & is_macd_not_deepening & is_valid_bottom_candle
+    is_escape_buy_signal = is_ma5_safe & is_bottom_indicator_ok & vol_ok & is_macd_not_deepening & is_valid_buy_candle
+    is_pullback_buy_signal = ((p >= mid_line) & is_ma5_safe & (pullback_rebound_score >= P.pullback_min_score) & vol_ok
+                              & is_bandwidth_ok & is_macd_not_deepening & is_valid_buy_candle)
+
+    conds = [
+        is_stop_loss_triggered,
+        is_on_the_wall & is_bearish_candle,
+        is_target_reached,
+        is_on_the_wall,
+        (is_escape_buy_signal | is_pullback_buy_signal) & is_over_extended_5,
+        is_bottom_entry_signal,
+        is_escape_buy_signal,
+        is_pullback_buy_signal,
+        is_ma5_safe & ~is_bottom_indicator_ok,
+        is_ma5_safe & ~is_macd_not_deepening,
+        is_bottom_indicator_ok & ~vol_ok,
+        ((p >= mid_line * (1 - P.pullback_mid_band)) & (p <= mid_line * P.wait_pullback_upper) & (pullback_rebound_score >= 1)
+         & ((pullback_rebound_score < P.pullback_min_score) | ~is_bandwidth_ok)),
+    ]
+    out = []
+    for stop in (is_stop_loss_triggered, is_held_stop_triggered):
+        codes = np.select([stop] + conds[1:], [CODE_INDEX[c] for c in SIGNAL_CODES[:-1]], CODE_INDEX["WAIT_GENERAL"]).astype(np.int8)
+        codes[~b["valid"]] = NO_DATA
+        out.append(codes)
+    return tuple(out)
+
+
+# --- [매매 복기] ---
+def _next_true(mask):
+    """각 칸에서 자기 자신 포함 다음 True 의 행 번호 (없으면 T). 끝에 T 행 하나를 더 붙여 (T+1, N) 으로 돌려준다."""
+    t = len(mask)
+    idx = np.where(mask, np.arange(t)[:, None], t)
+    nxt = np.minimum.accumulate(idx[::-1], axis=0)[::-1]
+    return np.vstack([nxt, np.full((1, mask.shape[1]), t)])
+
+
+def simulate(flat_codes, held_codes, close):
+    """매수/매도 신호 판 → 매매 목록 (열 번호, 매수 행, 매도 행, 미청산 여부)
+
+    날짜가 아니라 '매매 회차' 단위로만 돌고, 회차마다 전 종목을 한 번에 진행한다.
+    """
+    t, n_sym = close.shape
+    buy = np.isin(flat_codes, [CODE_INDEX[c] for c in BUY_CODES])
+    sell = np.isin(held_codes, [CODE_INDEX[c] for c in SELL_CODES])
+    next_buy, next_sell = _next_true(buy), _next_true(sell)
+    last_row = np.where(~np.isnan(close), np.arange(t)[:, None], -1).max(axis=0)
+
+    cols = np.arange(n_sym)
+    entry = next_buy[0]
+    out = []
+    while True:
+        active = entry < t
+        if not active.any():
+            break
+        c, e = cols[active], entry[active]
+        x = next_sell[np.minimum(e + 1, t), c]
+        is_open = x >= t
+        x = np.where(is_open, last_row[c], x)
+        out.append((c, e, x, is_open))
+        nxt = np.full(n_sym, t)
+        nxt[c] = np.where(is_open, t, next_buy[np.minimum(x + 1, t), c])
+        entry = nxt
+    if not out:
+        return tuple(np.empty(0, dtype=int) for _ in range(3)) + (np.empty(0, dtype=bool),)
+    return tuple(np.concatenate(parts) for parts in zip(*out))
+
+
+def equity_curves(close, cols, entries, exits):
+    """보유 구간(매수 다음 봉 ~ 매도 봉)의 일간 수익률을 복리로 쌓은 종목별 자산 곡선 (T, N)"""
+    t, n_sym = close.shape
+    delta = np.zeros((t + 1, n_sym), dtype=np.int32)
+    np.add.at(delta, (entries + 1, cols), 1)
+    np.add.at(delta, (exits + 1, cols), -1)
+    holding = np.cumsum(delta, axis=0)[:t] > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        daily = close / _shift(close, 1) - 1
+    daily = np.where(holding & np.isfinite(daily), daily, 0.0)
+    return np.cumprod(1 + daily, axis=0)
+
+
+def max_drawdown(equity):
+    """종목별 최대 낙폭 (음수, 예: -0.23)"""
+    return (equity / np.maximum.accumulate(equity, axis=0) - 1).min(axis=0)
+
+
+def summarize(trades, group=None):
+    """적중률/평균·중앙 수익률/보유 기간 요약표"""
+    def one(t):
+        return pd.Series({
+            "trades": len(t),
+            "hit_rate": (t["ret"] > 0).mean() if len(t) else np.nan,
+            "avg_ret": t["ret"].mean(),
+            "median_ret": t["ret"].median(),
+            "avg_hold": t["hold"].mean(),
+            "median_hold": t["hold"].median(),
+            "max_hold": t["hold"].max(),
+        })
+
+    if group is None:
+        return one(trades)
+    rows = {k: one(g) for k, g in trades.groupby(group)}
+    rows["전체"] = one(trades)
+    return pd.DataFrame(rows).T
+
+
+def trade_stats(close, flat, held):
+    """문턱값 탐색용 요약 한 줄 (DataFrame 없이 numpy 로만)"""
+    cols, entries, exits, _ = simulate(flat, held, close)
+    ret = close[exits, cols] / close[entries, cols] - 1
+    hold = exits - entries
+    dd = max_drawdown(equity_curves(close, cols, entries, exits)) if close.size else np.array([np.nan])
+    return {
+        "trades": len(ret),
+        "hit_rate": float((ret > 0).mean()) if len(ret) else np.nan,
+        "avg_ret": float(ret.mean()) if len(ret) else np.nan,
+        "median_ret": float(np.median(ret)) if len(ret) else np.nan,
+        "avg_hold": float(hold.mean()) if len(ret) else np.nan,
+        "max_drawdown_median": float(np.median(dd)),
+        "max_drawdown_worst": float(dd.min()),
+    }
+
+
+def backtest_panel(index, symbols, arrays, ind=None, params=DEFAULT_PARAMS):
+    """build_panel 결과로 복기. 반환: {"trades", "by_stage", "by_symbol", "summary"}"""
+    o, h, lo, c, v = (ffill_panel(arrays[f]) for f in ("Open", "High", "Low", "Close", "Volume"))
+    flat, held = signal_panels(o, h, lo, c, v, ind, params)
+    cols, entries, exits, is_open = simulate(flat, held, c)
+
+    code_names = np.array(SIGNAL_CODES)
+    entry_px, exit_px = c[entries, cols], c[exits, cols]
+    trades = pd.DataFrame({
+        "symbol": np.array(symbols, dtype=object)[cols],
+        "stage": [STAGE_NAMES[s] for s in code_names[flat[entries, cols]]],
+        "entry_date": index[entries], "exit_date": index[exits],
+        "entry_price": entry_px, "exit_price": exit_px,
+        "ret": exit_px / entry_px - 1, "hold": exits - entries,
+        "exit_code": np.where(is_open, "OPEN", code_names[np.maximum(held[exits, cols], 0)]),
+    }).sort_values(["symbol", "entry_date"], ignore_index=True)
+
+    equity = equity_curves(c, cols, entries, exits)
+    by_symbol = summarize(trades, "symbol") if len(trades) else pd.DataFrame()
+    if len(by_symbol):
+        pos = {s: i for i, s in enumerate(symbols)}
+        sym_cols = [pos[s] for s in by_symbol.index[:-1]]
+        by_symbol["total_ret"] = list(equity[-1, sym_cols] - 1) + [np.nan]
+        by_symbol["max_drawdown"] = list(max_drawdown(equity)[sym_cols]) + [max_drawdown(equity).min()]
+    summary = summarize(trades)
+    summary["max_drawdown_worst"] = max_drawdown(equity).min() if len(symbols) else np.nan
+    summary["max_drawdown_median"] = float(np.median(max_drawdown(equity))) if len(symbols) else np.nan
+    return {
+        "trades": trades,
+        "by_stage": summarize(trades, "stage") if len(trades) else pd.DataFrame(),
+        "by_symbol": by_symbol,
+        "summary": summary,
+    }
+
+
+def backtest(frames, params=DEFAULT_PARAMS):
+    """{종목: 일봉 DataFrame} 을 복기"""
+    frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return backtest_panel(pd.DatetimeIndex([]), [], {f: np.empty((0, 0)) for f in ("Open", "High", "Low", "Close", "Volume")})
+    return backtest_panel(*build_panel(frames), params=params)
+
+
+def load_frames(symbols, start, refresh=False):
+    """저장소에서 일봉 묶음 (refresh=True 면 모자란 꼬리만 받아 채움)"""
+    from .bar_store import BarStore
+
+    store = BarStore()
+    frames = {}
+    for sym in symbols:
+        if refresh:
+            from .market_feed import fetch_kr_history, fetch_us_history
+            frames[sym] = store.history(sym, start, fetch_kr_history if sym.isdigit() else fetch_us_history)
+        else:
+            frames[sym] = store.load(sym, start)
+    return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="신호등 과거 복기 (1·2·3단계 매수 / 성벽 매도)")
+    parser.add_argument("symbols", nargs="*", help="종목번호 또는 티커")
+    parser.add_argument("--market", choices=["KOSPI", "KOSDAQ", "KRX"], help="KRX 시장 전체를 복기")
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--offline", action="store_true", help="저장된 일봉만 사용 (네트워크 호출 없음)")
+    parser.add_argument("--panel", action="store_true", help="가격 판(python -m yisoo.price_panel build)에서 읽음 (네트워크 호출 없음)")
+    args = parser.parse_args(argv)
+
+    symbols = [s.strip().upper() for s in args.symbols]
+    if args.market:
+        from .replay import fdr_listing
+        from .scanner import krx_universe
+        symbols += krx_universe(fdr_listing('KRX'), None if args.market == "KRX" else args.market)
+    start = (datetime.now() - timedelta(days=int(args.years * 365))).date()
+    if args.panel:
+        from .price_panel import PricePanel
+        result = backtest_panel(*PricePanel.open().arrays(symbols or None, start))
+    else:
+        result = backtest(load_frames(symbols, start, refresh=not args.offline))
+    with pd.option_context("display.max_rows", 50, "display.width", 200):
+        print(result["by_stage"].to_string())
+        print()
+        print(result["summary"].to_string())
+
+
+if __name__ == "__main__":
+    main()
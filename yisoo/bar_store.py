@@ -0,0 +1,177 @@
+"""일봉(OHLCV) 로컬 저장소 - 한 번 받은 과거 시세는 디스크에 보관하고 모자란 꼬리 구간만 새로 받아온다."""
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+from . import DATA_DIR
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _to_day(value):
+    """date / datetime / Timestamp / 문자열을 모두 date 로 맞춘다."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def normalize_bars(df):
+    """보급처마다 다른 인덱스(tz 포함 Timestamp, date 등)를 날짜만 남긴 OHLCV 프레임으로 통일"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=COLUMNS, dtype=float)
+    out = df[[c for c in COLUMNS if c in df.columns]].copy()
+    idx = pd.to_datetime(out.index)
+    if getattr(idx, "tz", None) is not None:
+        idx = idx.tz_localize(None)
+    out.index = idx.normalize()
+    out = out[~out.index.duplicated(keep="last")].sort_index()
+    return out.astype(float)
+
+
+class BarStore:
+    """종목별 일봉을 SQLite 한 파일에 모아 두는 저장소.
+
+    history()는 저장분을 먼저 꺼내고, 마지막 저장일(장중에 받았을 수 있으니 그날 포함)부터
+    오늘까지만 fetcher 로 다시 받아 덮어쓴다. 같은 종목을 refresh_sec 안에 다시 부르면
+    디스크도 네트워크도 건드리지 않고 메모리에 든 프레임을 바로 돌려준다.
+    """
+
+    def __init__(self, path=None, refresh_sec=600):
+        self.path = path or os.path.join(DATA_DIR, "bars.sqlite")
+        self.refresh_sec = refresh_sec
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._mem = {}  # symbol -> (적재 시각, 프레임, 요청 시작일)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bars ("
+            " symbol TEXT NOT NULL, day TEXT NOT NULL,"
+            " open REAL, high REAL, low REAL, close REAL, volume REAL,"
+            " PRIMARY KEY (symbol, day))"
+        )
+        # 상장일이 요청 시작일보다 늦은 종목도 매번 통째로 받지 않도록, 어디서부터 받아 봤는지 기록
+        self._conn.execute("CREATE TABLE IF NOT EXISTS coverage (symbol TEXT PRIMARY KEY, covered_from TEXT)")
+        self._conn.commit()
+
+    # --- [디스크 입출력] ---
+    def load(self, symbol, start=None):
+        """저장된 일봉을 꺼낸다 (start 이후만)"""
+        sql = "SELECT day, open, high, low, close, volume FROM bars WHERE symbol = ?"
+        args = [symbol]
+        if start is not None:
+            sql += " AND day >= ?"
+            args.append(_to_day(start).isoformat())
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY day", args).fetchall()
+        if not rows:
+            return pd.DataFrame(columns=COLUMNS, dtype=float)
+        df = pd.DataFrame(rows, columns=["day"] + COLUMNS)
+        df.index = pd.to_datetime(df.pop("day"))
+        return df.astype(float)
+
+    def load_many(self, symbols=None, start=None):
+        """여러 종목 일봉을 긴 표(symbol, day, OHLCV) 하나로 (종목 목록이 없으면 전부). 가격 판 만들 때 쓴다."""
+        sql = "SELECT symbol, day, open, high, low, close, volume FROM bars"
+        args = []
+        if start is not None:
+            sql += " WHERE day >= ?"
+            args.append(_to_day(start).isoformat())
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY symbol, day", args).fetchall()
+        out = pd.DataFrame(rows, columns=["symbol", "day"] + COLUMNS)
+        if symbols is not None:
+            out = out[out["symbol"].isin(set(symbols))]
+        return out
+
+    def last_bars(self, before):
+        """종목마다 before 전 마지막 일봉 한 줄 (symbol 인덱스, day + OHLCV)"""
+        sql = (
+            "SELECT b.symbol, b.day, b.open, b.high, b.low, b.close, b.volume FROM bars b JOIN"
+            " (SELECT symbol, MAX(day) AS last FROM bars WHERE day < ? GROUP BY symbol) t"
+            " ON b.symbol = t.symbol AND b.day = t.last"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (_to_day(before).isoformat(),)).fetchall()
+        return pd.DataFrame(rows, columns=["symbol", "day"] + COLUMNS).set_index("symbol")
+
+    def span(self, symbol):
+        """(보급 확인된 시작일, 마지막 저장일) - 없으면 (None, None)"""
+        with self._lock:
+            first, last = self._conn.execute(
+                "SELECT MIN(day), MAX(day) FROM bars WHERE symbol = ?", (symbol,)
+            ).fetchone()
+            row = self._conn.execute("SELECT covered_from FROM coverage WHERE symbol = ?", (symbol,)).fetchone()
+        if first is None:
+            return None, None
+        if row and row[0] < first:
+            first = row[0]
+        return date.fromisoformat(first), date.fromisoformat(last)
+
+    def mark_covered(self, symbol, start):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?)", (symbol, _to_day(start).isoformat())
+            )
+            self._conn.commit()
+
+    def upsert(self, symbol, df):
+        """같은 날짜는 새 값으로 덮어쓰며 저장"""
+        df = normalize_bars(df)
+        if df.empty:
+            return 0
+        rows = [
+            (symbol, ts.date().isoformat(), r.Open, r.High, r.Low, r.Close, r.Volume)
+            for ts, r in zip(df.index, df.itertuples(index=False))
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+            self._mem.pop(symbol, None)
+        return len(rows)
+
+    def upsert_day(self, day, bars):
+        """하루치 여러 종목(symbol 인덱스, OHLCV)을 한 번에 덮어쓰기 저장 (전 종목 일괄 적재용)"""
+        day = _to_day(day).isoformat()
+        rows = [(sym, day, r.Open, r.High, r.Low, r.Close, r.Volume)
+                for sym, r in zip(bars.index, bars[COLUMNS].astype(float).itertuples(index=False))]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+            for sym in bars.index:
+                self._mem.pop(sym, None)
+        return len(rows)
+
+    # --- [증분 보급] ---
+    def history(self, symbol, start, fetcher):
+        """start 부터의 일봉. fetcher(symbol, start_date) -> DataFrame 은 모자란 구간만 호출된다."""
+        start = _to_day(start)
+        now = time.monotonic()
+        cached = self._mem.get(symbol)
+        if cached and now - cached[0] < self.refresh_sec and cached[2] <= start:
+            df = cached[1]
+            return df[df.index >= pd.Timestamp(start)].copy()
+
+        first, last = self.span(symbol)
+        # 저장분이 요청 시작일을 못 덮으면 통째로, 아니면 마지막 저장일부터 꼬리만 받는다
+        full = first is None or first > start
+        fetch_from = start if full else last
+        try:
+            fresh = fetcher(symbol, fetch_from)
+        except Exception:
+            fresh = None
+        if fresh is not None and not fresh.empty:
+            self.upsert(symbol, fresh)
+            if full:
+                self.mark_covered(symbol, start)
+
+        df = self.load(symbol, start)
+        with self._lock:
+            self._mem[symbol] = (now, df, start)
+        return df.copy()
@@ -0,0 +1,606 @@
+"""속도 측정대 - 진단 한 번(끝에서 끝), 지표 계산, 여러 종목 일괄 진단 처리량을 숫자로 남긴다.
+
+네트워크 없이 돌도록 임시 폴더에 가짜 녹화본(FDR 일봉 / 네이버 basic JSON / 종목 화면 HTML)과
+일봉 저장소를 만들고 보급선을 재생 모드로 돌려 잰다. 실제 응답으로 재려면
+YISOO_FEED=record 로 떠 둔 녹화 폴더를 --fixtures 로 주고 종목을 지정하면 된다.
+
+    python -m yisoo.bench                                  # 전부
+    python -m yisoo.bench -k diagnosis --save base         # DATA_DIR/bench/base.json 으로 기준 저장
+    python -m yisoo.bench --compare base --fail-over 20    # 기준 중앙값보다 20% 넘게 느려지면 종료코드 1
+    python -m yisoo.bench --fixtures .yisoo_data/fixtures 005930 000660
+    python -m yisoo.bench --check                          # 빠른 경로가 기준 경로와 같은 값을 내는지만 (어긋나면 종료코드 1)
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from . import DATA_DIR, price_panel, replay, sessions, snapshot, timing
+from .bar_store import BarStore
+from .diagnosis import diagnose_frame, latest_values
+from .incremental import IndicatorState, diagnose_layered, diagnose_live, state_for
+from .indicators import build_panel, compute_indicators
+from .market_feed import NAVER_BASIC_URL, NAVER_ITEM_URL, fetch_kr_history, fetch_kr_quote
+from .price_panel import PricePanel
+from .scanner import scan
+from .volume_profile import default_curve
+from .shared_cache import CACHE
+
+BENCH_DIR = os.path.join(DATA_DIR, "bench")
+KST = ZoneInfo('Asia/Seoul')
+
+_BENCHMARKS = []  # (묶음, 이름, 준비 함수)
+_CHECKS = []  # (묶음, 이름, 점검 함수)
+
+
+def benchmark(group, name):
+    """준비 함수(ctx) -> (잴 함수, 한 번에 처리하는 건수) 를 측정대에 올린다"""
+    def wrap(setup):
+        _BENCHMARKS.append((group, name, setup))
+        return setup
+    return wrap
+
+
+def check(group, name):
+    """점검 함수(ctx) -> 어긋난 곳 설명 목록 (비었으면 통과) 을 점검대에 올린다"""
+    def wrap(fn):
+        _CHECKS.append((group, name, fn))
+        return fn
+    return wrap
+
+
+def measure(fn, items=1, min_rounds=5, max_rounds=1000, min_time=1.0, warmup=1):
+    """min_rounds 번 이상, 합계 min_time 초 이상 반복해 한 번당 걸린 시간(ms) 통계를 낸다"""
+    for _ in range(warmup):
+        fn()
+    times = []
+    total = 0.0
+    while len(times) < max_rounds and (len(times) < min_rounds or total < min_time):
+        started = time.perf_counter()
+        fn()
+        took = time.perf_counter() - started
+        times.append(took)
+        total += took
+    mean = statistics.fmean(times)
+    return {
+        "rounds": len(times),
+        "min_ms": min(times) * 1000,
+        "median_ms": statistics.median(times) * 1000,
+        "mean_ms": mean * 1000,
+        "max_ms": max(times) * 1000,
+        "stddev_ms": (statistics.stdev(times) if len(times) > 1 else 0.0) * 1000,
+        "ops": items / mean if mean > 0 else float("inf"),
+    }
+
+
+# --- [가짜 녹화본] ---
+def synthetic_frames(symbols, days, seed=0):
+    """종목별 무작위 걸음 일봉 (어제까지 영업일 days 개)"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.Timedelta(days=1), periods=days, name="Date")
+    frames = {}
+    for sym in symbols:
+        close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        open_ = close * (1 + rng.normal(0, 0.005, days))
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, days))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, days))
+        volume = rng.integers(50_000, 2_000_000, days).astype(float)
+        frames[sym] = pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index).round(0)
+    return frames
+
+
+def _item_page_html(sym, last):
+    close = f"{last['Close']:,.0f}"
+    info = [last['Open'], last['High'], last['High'] * 1.3, last['Volume'], last['Open'], last['Low'], last['Low'] * 0.7, last['Volume'] * last['Close'] / 1e6]
+    cells = "".join(f'<td><span class="blind">{v:,.0f}</span></td>' for v in info)
+    return (f'<div class="wrap_company"><h2><a href="#">측정{sym}</a></h2></div>'
+            f'<p class="no_today"><em><span class="blind">{close}</span></em></p>'
+            f'<table class="no_info"><tr>{cells}</tr></table>')
+
+
+def make_fixtures(fixture_dir, frames):
+    """frames 를 재생 모드가 읽는 녹화본으로 떠 둔다 (마지막 봉을 오늘 시세로 삼음)"""
+    replay.configure(fixture_dir=fixture_dir)
+    for sym, df in frames.items():
+        last = df.iloc[-1]
+        replay.save_fixture("fdr_history", sym, df, "pkl")
+        basic = {"closePrice": f"{last['Close']:,.0f}", "accumulatedTradingVolume": f"{last['Volume']:,.0f}"}
+        replay.save_fixture("http", NAVER_BASIC_URL.format(sym), {"status_code": 200, "text": json.dumps(basic)})
+        replay.save_fixture("http", NAVER_ITEM_URL.format(sym), {"status_code": 200, "text": _item_page_html(sym, last)})
+
+
+class Context:
+    """측정 재료: 재생 모드 보급선, 일봉, 판, 임시 저장소"""
+
+    def __init__(self, symbols, days, workdir, fixture_dir=None):
+        self.start = (datetime.now() - timedelta(days=int(days * 1.5))).date()
+        self.workdir = workdir
+        self.source = None  # 가짜 녹화본으로 돌 때 원본 일봉 (재생 점검용)
+        if fixture_dir is None:
+            fixture_dir = os.path.join(workdir, "fixtures")
+            self.source = synthetic_frames(symbols, days)
+            make_fixtures(fixture_dir, self.source)
+        replay.configure("replay", fixture_dir)
+        self.frames = {s: df for s, df in ((s, fetch_kr_history(s, self.start)) for s in symbols) if df is not None and not df.empty}
+        if not self.frames:
+            raise SystemExit(f"재생할 일봉 녹화본이 없구먼: {fixture_dir}")
+        self.symbols = list(self.frames)
+        self.store_path = os.path.join(workdir, "bars.sqlite")
+        self.store = BarStore(self.store_path)
+        for sym, df in self.frames.items():
+            self.store.upsert(sym, df)
+            self.store.mark_covered(sym, self.start)
+        _, _, self.arrays = build_panel(self.frames)
+        self.panel = PricePanel.build(self.store, self.symbols, path=os.path.join(workdir, "panel"))
+        self.snapshot = snapshot.Snapshot.build(self.frames, os.path.join(workdir, "snapshot"))
+        self.now = datetime.now(KST).replace(hour=13, minute=0, second=0, microsecond=0)
+
+
+def _session_day(ctx):
+    """시간보정이 걸리게 오늘, 휴장일이면 다음 거래일"""
+    today = ctx.now.date()
+    return today if sessions.is_trading_day("kr", today) else sessions.next_trading_day("kr", today)
+
+
+# --- [측정 항목] ---
+@benchmark("indicators", "panel_all_symbols")
+def _b_panel(ctx):
+    a = ctx.arrays
+    return lambda: compute_indicators(a["High"], a["Low"], a["Close"]), len(ctx.symbols)
+
+
+@benchmark("indicators", "latest_values_one")
+def _b_latest(ctx):
+    df = ctx.frames[ctx.symbols[0]]
+    return lambda: latest_values(df), 1
+
+
+@benchmark("diagnosis", "diagnose_frame")
+def _b_frame(ctx):
+    df = ctx.frames[ctx.symbols[0]]
+    last = df.iloc[-1]
+    return lambda: diagnose_frame(df, float(last['Close']), float(last['Volume']), ctx.now, True), 1
+
+
+@benchmark("diagnosis", "diagnose_live_tick")
+def _b_live(ctx):
+    sym = ctx.symbols[0]
+    df = ctx.frames[sym]
+    last = df.iloc[-1]
+    today = ctx.now.date()
+    return lambda: diagnose_live(state_for(sym, df, today), float(last['Close']), float(last['Volume']), ctx.now, True), 1
+
+
+@benchmark("diagnosis", "avg_price_edit")
+def _b_avg_edit(ctx):
+    """장중에 같은 시세에서 평단가만 바꿔 몇 초 간격으로 다시 진단 (층층 기억: 같은 1분 안이면 신호등 층까지 그대로 꺼냄)"""
+    sym = ctx.symbols[0]
+    df = ctx.frames[sym]
+    last = df.iloc[-1]
+    avgs = itertools.cycle(float(last['Close']) * k for k in (0.9, 0.95, 1.05, 1.1))
+    # 장중 10시부터 (시각을 멈춰 두면 장중 시간보정이 키를 바꾸는 것을 못 잡음)
+    day = _session_day(ctx)
+    clock = itertools.count()
+
+    def run():
+        now = datetime.combine(day, datetime.min.time(), KST) + timedelta(hours=10, seconds=3 * next(clock) % 3600)
+        return diagnose_layered(sym, df, float(last['Close']), float(last['Volume']), now, True,
+                                user_avg_price=next(avgs))
+    return run, 1
+
+
+@benchmark("diagnosis", "morning_rebuild")
+def _b_morning_rebuild(ctx):
+    """그날 처음 보는 종목: 일봉으로 지표 상태를 새로 만들고 시세 얹기"""
+    sym = ctx.symbols[0]
+    df = ctx.frames[sym]
+    last = df.iloc[-1]
+    today = ctx.now.date()
+    return lambda: diagnose_live(IndicatorState.for_today(df, today), float(last['Close']), float(last['Volume']), ctx.now, True), 1
+
+
+@benchmark("diagnosis", "morning_snapshot")
+def _b_morning_snapshot(ctx):
+    """그날 처음 보는 종목: 저녁 스냅샷에서 상태를 되살리고 시세 얹기"""
+    sym = ctx.symbols[0]
+    df = ctx.frames[sym]
+    last = df.iloc[-1]
+    today = ctx.now.date()
+    return lambda: diagnose_live(snapshot.lookup(sym, df, today, ctx.snapshot), float(last['Close']), float(last['Volume']), ctx.now, True), 1
+
+
+@benchmark("diagnosis", "end_to_end_cold")
+def _b_e2e_cold(ctx):
+    """공용 창고를 비운 채: 일봉 경주 + 시세 경주 + 전체 진단 (네트워크 대기 시간은 빠짐)"""
+    syms = itertools.cycle(ctx.symbols)
+
+    def run():
+        sym = next(syms)
+        CACHE.invalidate()
+        df = fetch_kr_history(sym, ctx.start)
+        quote, _ = fetch_kr_quote(sym)
+        return diagnose_frame(df, quote["price"], quote["volume"], ctx.now, True)
+    return run, 1
+
+
+@benchmark("diagnosis", "end_to_end_warm")
+def _b_e2e_warm(ctx):
+    """화면 재실행과 같은 경로: 저장소 일봉 + 창고 시세 + 증분 진단"""
+    sym = ctx.symbols[0]
+    today = ctx.now.date()
+
+    def run():
+        df = ctx.store.history(sym, ctx.start, fetch_kr_history)
+        quote, _ = fetch_kr_quote(sym)
+        return diagnose_live(state_for(sym, df, today), quote["price"], quote["volume"], ctx.now, True)
+    return run, 1
+
+
+@benchmark("scan", "serial")
+def _b_scan_serial(ctx):
+    return lambda: scan(ctx.symbols, workers=1, refresh=False, store_path=ctx.store_path), len(ctx.symbols)
+
+
+@benchmark("scan", "parallel")
+def _b_scan_parallel(ctx):
+    return lambda: scan(ctx.symbols, workers=None, refresh=False, store_path=ctx.store_path), len(ctx.symbols)
+
+
+@benchmark("scan", "panel_serial")
+def _b_scan_panel(ctx):
+    """저장소(SQLite) 대신 메모리 매핑 가격 판에서 일봉을 잘라 봄"""
+    return lambda: scan(ctx.symbols, workers=1, refresh=False, store_path=ctx.store_path, panel_path=ctx.panel.path), len(ctx.symbols)
+
+
+# --- [같은 값 점검: 빠른 경로 vs 기준 경로] ---
+def _diff(label, a, b, rel=1e-9):
+    """두 값(딕셔너리/목록/숫자/문자)을 견줘 어긋난 곳 설명 목록. 실수는 상대오차 rel 까지 같다고 본다."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        out = [f"{label}: 키 {sorted(set(a) ^ set(b))}"] if set(a) != set(b) else []
+        return out + [m for k in a if k in b for m in _diff(f"{label}.{k}", a[k], b[k], rel)]
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        if len(a) != len(b):
+            return [f"{label}: 길이 {len(a)} != {len(b)}"]
+        return [m for i, (x, y) in enumerate(zip(a, b)) for m in _diff(f"{label}[{i}]", x, y, rel)]
+    if isinstance(a, (int, float, np.number)) and isinstance(b, (int, float, np.number)) \
+            and not isinstance(a, (bool, np.bool_)) and not isinstance(b, (bool, np.bool_)):
+        a, b = float(a), float(b)
+        if (np.isnan(a) and np.isnan(b)) or a == b or abs(a - b) <= rel * max(1.0, abs(a), abs(b)):
+            return []
+    elif a == b:
+        return []
+    return [f"{label}: {a!r} != {b!r}"]
+
+
+def _diff_frame(label, a, b, rel=1e-9):
+    if not a.index.equals(b.index):
+        return [f"{label}: 날짜 {len(a)}개 != {len(b)}개 (처음 어긋남: {a.index.symmetric_difference(b.index)[:1].tolist()})"]
+    cols = ["Open", "High", "Low", "Close", "Volume"]
+    x, y = a[cols].to_numpy(dtype=np.float64), b[cols].to_numpy(dtype=np.float64)
+    bad = ~(np.isclose(x, y, rtol=rel, atol=0) | (np.isnan(x) & np.isnan(y)))
+    return [f"{label}: {bad.sum()}칸 다름 (처음 {a.index[bad.any(axis=1)][0].date()})"] if bad.any() else []
+
+
+# 패널 지표 키 → latest_values 키
+_PANEL_KEYS = {"RSI": "rsi_val", "WILL": "will_val", "MACD": "m_l", "SIGNAL": "s_l", "MA5": "ma5", "MA20": "ma20",
+               "MA60": "ma60", "MA120": "ma120", "STD20": "std20", "HIGH250": "high_52w", "LOW250": "low_52w"}
+
+
+def _panel_vs_latest(frames, label, rows=3):
+    """판 연산의 종목별 마지막 rows 봉 지표가 그 종목 일봉만 넣은 latest_values 와 같은가"""
+    index, symbols, a = build_panel(frames)
+    ind = compute_indicators(a["High"], a["Low"], a["Close"])
+    out = []
+    for j, sym in enumerate(symbols):
+        df = frames[sym]
+        for day in df.index[-rows:]:
+            t = index.get_loc(day)
+            lv = latest_values(df.loc[:day])
+            out += _diff(f"{label}:{sym}@{day.date()}", {k: lv[v] for k, v in _PANEL_KEYS.items()},
+                         {k: ind[k][t, j] for k in _PANEL_KEYS})
+    return out
+
+
+@check("indicators", "panel_vs_latest_values")
+def _c_panel(ctx):
+    return _panel_vs_latest({s: ctx.frames[s] for s in ctx.symbols[:10]}, "panel")
+
+
+@check("indicators", "panel_gapped_symbol")
+def _c_panel_gapped(ctx):
+    """거래정지처럼 중간 날짜가 빠진 종목이 섞인 판"""
+    frames = {s: ctx.frames[s] for s in ctx.symbols[:3]}
+    first = ctx.symbols[0]
+    df = frames[first]
+    frames[first] = df.drop(df.index[[len(df) // 2, len(df) // 2 + 1, len(df) - 10]])
+    if len(frames) > 1:
+        frames[ctx.symbols[1]] = frames[ctx.symbols[1]].iloc[:-2]  # 최근 이틀 없음
+    return _panel_vs_latest(frames, "gapped", rows=15)
+
+
+def _diagnose_cases(ctx, n_symbols=5):
+    """(종목, 일봉, 현재가, 누적거래량, 시각, 평단가, 수동 여부, 곡선) 조합 - 장 전/장중(초 단위 포함)/장 마감 뒤,
+    보유/미보유, 수동, 거래량 분포 곡선"""
+    day = _session_day(ctx)
+    curve = default_curve(True)
+    for sym in ctx.symbols[:n_symbols]:
+        df = ctx.frames[sym]
+        last = df.iloc[-1]
+        for k in (0.9, 1.0, 1.1):
+            for hour, sec in ((8, 0), (10, 17), (10, 59), (13, 0), (16, 0)):
+                now = datetime.combine(day, datetime.min.time(), KST) + timedelta(hours=hour, seconds=sec)
+                for avg, manual, crv in ((0.0, False, None), (float(last['Close']) * 0.95, False, None),
+                                         (0.0, True, None), (0.0, False, curve)):
+                    yield sym, df, float(last['Close']) * k, float(last['Volume']) * k, now, avg, manual, crv
+
+
+@check("diagnosis", "live_vs_frame")
+def _c_live(ctx):
+    out = []
+    for sym, df, p, v, now, avg, manual, crv in _diagnose_cases(ctx):
+        want = diagnose_frame(df, p, v, now, True, is_manual_mode=manual, user_avg_price=avg, volume_curve=crv)
+        state = IndicatorState.for_today(df, now.date())
+        got = diagnose_live(state, p, v, now, True, is_manual_mode=manual, user_avg_price=avg, volume_curve=crv)
+        out += _diff(f"live:{sym}@{now:%H:%M:%S} p={p:.0f} avg={avg:.0f} manual={manual} curve={crv is not None}", want, got)
+    return out
+
+
+@check("diagnosis", "layered_vs_frame")
+def _c_layered(ctx):
+    out = []
+    for sym, df, p, v, now, avg, manual, crv in _diagnose_cases(ctx):
+        want = diagnose_frame(df, p, v, now, True, is_manual_mode=manual, user_avg_price=avg, volume_curve=crv)
+        got = diagnose_layered(sym, df, p, v, now, True, is_manual_mode=manual, user_avg_price=avg, volume_curve=crv)
+        out += _diff(f"layered:{sym}@{now:%H:%M:%S} p={p:.0f} avg={avg:.0f} manual={manual} curve={crv is not None}", want, got)
+    return out
+
+
+@check("diagnosis", "snapshot_vs_fresh")
+def _c_snapshot(ctx):
+    """저녁 스냅샷에서 되살린 상태가 일봉으로 새로 만든 상태와 같은 지표를 내는가 (오늘 부분 봉 있는/없는 경우)"""
+    out = []
+    today = ctx.now.date()
+    for sym in ctx.symbols[:10]:
+        df = ctx.frames[sym]
+        last = df.iloc[-1]
+        partial_today = pd.concat([df, last.to_frame(pd.Timestamp(today)).T])
+        for label, frame in (("closed", df), ("partial", partial_today)):
+            restored = snapshot.lookup(sym, frame, today, ctx.snapshot)
+            if restored is None:
+                out.append(f"snapshot:{sym}:{label}: 스냅샷에서 못 찾음")
+                continue
+            fresh = IndicatorState.for_today(frame, today)
+            for k in (0.95, 1.0, 1.05):
+                p, v = float(last['Close']) * k, float(last['Volume']) * k
+                out += _diff(f"snapshot:{sym}:{label} p={p:.0f}", fresh.latest(p, v), restored.latest(p, v))
+    return out
+
+
+@check("store", "panel_frame_vs_load")
+def _c_panel_frame(ctx):
+    return [m for sym in ctx.symbols for m in _diff_frame(f"panel:{sym}", ctx.store.load(sym, ctx.start),
+                                                          ctx.panel.frame(sym, ctx.start))]
+
+
+@check("store", "panel_history_vs_store")
+def _c_panel_history(ctx):
+    """판 몸통 + 저장소 꼬리로 이은 일봉이 저장소만으로 읽은 것과 같은가 (판 뒤에 새 봉이 들어온 경우 포함)"""
+    start = ctx.panel.index()[0].date()  # 가짜 일봉은 start 뒤부터 시작하니 판 첫날부터
+    out = []
+    for sym in ctx.symbols[:5]:
+        got = price_panel.history(sym, start, ctx.store, fetch_kr_history, ctx.panel)
+        if got is None:
+            out.append(f"panel_history:{sym}: 판이 못 덮음")
+            continue
+        out += _diff_frame(f"panel_history:{sym}", ctx.store.load(sym, start), got)
+    store = BarStore(os.path.join(ctx.workdir, "after_panel.sqlite"))
+    sym = ctx.symbols[0]
+    full = ctx.store.load(sym, start)
+    store.upsert(sym, full)
+    store.mark_covered(sym, start)
+    newer = full.iloc[-1:].set_axis([full.index[-1] + pd.Timedelta(days=1)])  # 판을 뜬 뒤 들어온 봉
+    store.upsert(sym, newer)
+    got = price_panel.history(sym, start, store, lambda s, start: None, ctx.panel)
+    return out + _diff_frame(f"panel_history:{sym}:newer", store.load(sym, start), got)
+
+
+@check("store", "history_tail_fetch")
+def _c_tail(ctx):
+    """저장분이 며칠 모자란 저장소: 마지막 저장일부터만 받아 채우고 결과는 통째로 받은 것과 같아야 한다"""
+    store = BarStore(os.path.join(ctx.workdir, "tail.sqlite"))
+    out = []
+    for sym in ctx.symbols[:5]:
+        full = ctx.store.load(sym, ctx.start)
+        store.upsert(sym, full.iloc[:-5])
+        store.mark_covered(sym, ctx.start)
+        calls = []
+
+        def fetcher(symbol, start):
+            calls.append(start)
+            return fetch_kr_history(symbol, start)
+
+        got = store.history(sym, ctx.start, fetcher)
+        want_from = full.index[-6].date()
+        if calls != [want_from]:
+            out.append(f"tail:{sym}: 받은 구간 시작 {calls} (기대 [{want_from}])")
+        out += _diff_frame(f"tail:{sym}", full, got)
+        store.history(sym, ctx.start, fetcher)
+        if len(calls) != 1:
+            out.append(f"tail:{sym}: refresh_sec 안에 다시 받음")
+    return out
+
+
+def _listing(closes, prev_closes):
+    """{종목: 종가} → fdr.StockListing 모양의 하루치 목록"""
+    codes = list(closes)
+    close = np.array([closes[c] for c in codes], dtype=float)
+    return pd.DataFrame({"Code": codes, "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": 1000.0, "Changes": close - np.array([prev_closes[c] for c in codes], dtype=float),
+                         "Marcap": 1e12})
+
+
+@check("ingest", "listing_plan")
+def _c_ingest(ctx):
+    """하루치 적재의 직전 장 판정: 국내·미국이 섞인 저장소 / 달력이 모르는 임시 휴장 / 적재를 빠뜨린 날"""
+    from datetime import date
+
+    from .ingest import ingest
+
+    def no_fetch(symbol, start):
+        raise LookupError("점검 중에는 종목별 일봉을 받지 않음")
+
+    def bars(days, close=10000.0):
+        return pd.DataFrame({c: close for c in ("Open", "High", "Low", "Close", "Volume")},
+                            index=pd.to_datetime([d.isoformat() for d in days]))
+
+    kr = ("005930", "000660")
+    cases = [
+        # (이름, {종목: 저장된 날들}, 적재일, 목록 전일 종가, 기대 written, 기대 gaps)
+        ("mixed_kr_us", {**{s: [date(2026, 10, 7), date(2026, 10, 8)] for s in kr}, "AAPL": [date(2026, 10, 9)]},
+         date(2026, 10, 12), 10000.0, 2, 0),  # 10-09 한글날 (미국은 개장)
+        ("unknown_holiday", {s: [date(2026, 10, 12), date(2026, 10, 13)] for s in kr},
+         date(2026, 10, 15), 10000.0, 2, 0),  # 10-14 를 달력이 모르는 휴장으로 (전일 종가가 이어짐)
+        ("missed_day", {s: [date(2026, 10, 12), date(2026, 10, 13)] for s in kr},
+         date(2026, 10, 15), 10100.0, 0, 2),  # 10-14 적재를 빠뜨림 (전일 종가가 안 이어짐)
+    ]
+    out = []
+    for name, stored, day, prev_close, want_written, want_gaps in cases:
+        store = BarStore(os.path.join(ctx.workdir, f"ingest_{name}.sqlite"))
+        for sym, days in stored.items():
+            store.upsert(sym, bars(days))
+        listing = _listing({s: 10500.0 for s in kr}, {s: prev_close for s in kr})
+        got = ingest(listing, day, store, max_backfill=0, fetcher=no_fetch)
+        out += _diff(f"ingest:{name}", {"written": want_written, "gaps": want_gaps},
+                     {"written": got.get("written"), "gaps": got.get("gaps")})
+    return out
+
+
+@check("replay", "fixtures")
+def _c_replay(ctx):
+    """재생 모드 보급선이 녹화본 그대로 돌려주는가 (가짜 녹화본으로 돌 때만)"""
+    if ctx.source is None:
+        return []
+    out = []
+    for sym in ctx.symbols[:10]:
+        src = ctx.source[sym]
+        out += _diff_frame(f"replay:{sym}:history", src[src.index >= pd.Timestamp(ctx.start)], fetch_kr_history(sym, ctx.start))
+        CACHE.invalidate()
+        quote, _ = fetch_kr_quote(sym)
+        last = src.iloc[-1]
+        out += _diff(f"replay:{sym}:quote", {"price": float(last['Close']), "volume": float(last['Volume'])}, quote)
+    return out
+
+
+def run_checks(ctx, keyword=None):
+    """{항목: 어긋난 곳 목록}"""
+    results = {}
+    for group, name, fn in _CHECKS:
+        full = f"{group}/{name}"
+        if keyword and keyword not in full:
+            continue
+        results[full] = fn(ctx)
+    return results
+
+
+# --- [실행 / 저장 / 비교] ---
+def run(ctx, keyword=None, min_time=1.0):
+    results = {}
+    for group, name, setup in _BENCHMARKS:
+        full = f"{group}/{name}"
+        if keyword and keyword not in full:
+            continue
+        fn, items = setup(ctx)
+        results[full] = measure(fn, items=items, min_time=min_time)
+    return results
+
+
+def table(results, baseline=None):
+    rows = []
+    for full, r in results.items():
+        row = {"benchmark": full, **{k: r[k] for k in ("min_ms", "median_ms", "mean_ms", "max_ms", "stddev_ms", "rounds", "ops")}}
+        if baseline and full in baseline:
+            row["vs_base_%"] = (r["median_ms"] / baseline[full]["median_ms"] - 1) * 100
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def save(name, results, meta):
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**meta, "benchmarks": results}, f, ensure_ascii=False, indent=1)
+    return path
+
+
+def load(name):
+    path = name if name.endswith(".json") else os.path.join(BENCH_DIR, f"{name}.json")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["benchmarks"]
+
+
+def report_checks(results, show=5):
+    failed = 0
+    for full, mismatches in results.items():
+        print(f"{'ok ' if not mismatches else 'FAIL'} {full}" + (f"  ({len(mismatches)}곳 어긋남)" if mismatches else ""))
+        for m in mismatches[:show]:
+            print(f"     {m}")
+        failed += bool(mismatches)
+    if failed:
+        print(f"어긋난 점검 {failed}개")
+        raise SystemExit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="냉정 진단 속도 측정대")
+    parser.add_argument("symbols", nargs="*", help="--fixtures 로 재생할 종목번호 (기본: 가짜 종목)")
+    parser.add_argument("-k", dest="keyword", help="이름에 이 글자가 든 항목만 (예: scan, diagnosis/)")
+    parser.add_argument("--fixtures", help="YISOO_FEED=record 로 떠 둔 녹화 폴더 (기본: 가짜 녹화본)")
+    parser.add_argument("--n-symbols", type=int, default=50, help="가짜 종목 수")
+    parser.add_argument("--days", type=int, default=500, help="가짜 일봉 길이(영업일)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="항목당 최소 측정 시간(초)")
+    parser.add_argument("--save", metavar="NAME", help="결과를 DATA_DIR/bench/NAME.json 으로 저장")
+    parser.add_argument("--compare", metavar="NAME", help="저장해 둔 기준과 중앙값 비교")
+    parser.add_argument("--fail-over", type=float, metavar="PCT", help="--compare 기준보다 PCT%% 넘게 느려진 항목이 있으면 종료코드 1")
+    parser.add_argument("--check", action="store_true", help="재지 않고 빠른 경로가 기준 경로와 같은 값을 내는지만 점검 (어긋나면 종료코드 1)")
+    args = parser.parse_args(argv)
+    if args.fixtures and not args.symbols:
+        parser.error("--fixtures 를 쓰면 종목번호를 지정하시게")
+
+    timing.ENABLED = False  # 측정 중 구간 기록은 파일로 남기지 않음
+    mode, fixture_dir = replay.MODE, replay.FIXTURE_DIR
+    symbols = args.symbols or [f"{900000 + i:06d}" for i in range(args.n_symbols)]
+    try:
+        with tempfile.TemporaryDirectory(prefix="yisoo-bench-") as workdir:
+            ctx = Context(symbols, args.days, workdir, args.fixtures)
+            if args.check:
+                return report_checks(run_checks(ctx, args.keyword))
+            results = run(ctx, args.keyword, args.min_time)
+    finally:
+        replay.configure(mode, fixture_dir)
+
+    baseline = load(args.compare) if args.compare else None
+    out = table(results, baseline)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(out.round(3).to_string(index=False))
+    if args.save:
+        meta = {"saved_at": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                "machine": platform.machine(), "cpus": os.cpu_count(), "symbols": len(ctx.symbols), "days": args.days}
+        print(f"저장: {save(args.save, results, meta)}")
+    if baseline and args.fail_over is not None and "vs_base_%" in out:
+        slower = out[out["vs_base_%"] > args.fail_over]
+        if not slower.empty:
+            print(f"기준보다 {args.fail_over}% 넘게 느려진 항목: {', '.join(slower['benchmark'])}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
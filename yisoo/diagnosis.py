@@ -0,0 +1,327 @@
+"""냉정 진단 엔진 - 일봉 + 현재가만 받아 보조지표와 신호등(final_code)을 계산하는 순수 함수
+
+화면(yisoo-app.py)과 일괄 진단(scanner)이 같은 계산을 쓰도록 한 곳에 모았다.
+여기서는 화면 출력(st.*)이나 네트워크 호출을 하지 않는다.
+"""
+import pandas as pd
+
+from . import sessions
+from .params import DEFAULT_PARAMS
+from .volume_profile import SESSION_MINUTES, expected_fraction
+
+# 신호등 코드 (위에서부터 우선 판정)
+SIGNAL_CODES = [
+    "STOP_LOSS_ALERT", "RED_SELL_WARNING", "RED_SELL_TARGET", "YELLOW_CAUTION", "WAIT_OVER_EXTENDED",
+    "BOTTOM_ENTRY", "ESCAPE_BUY", "PULLBACK_BUY", "WAIT_INDICATOR", "WAIT_MACD", "WAIT_VOLUME",
+    "WAIT_PULLBACK", "WAIT_GENERAL",
+]
+
+
+def day_index(df):
+    """일봉 인덱스를 시각 없는 날짜(datetime64) 로 맞춘다 (date 객체 인덱스는 벡터 연산이 안 돼서 쓰지 않음)"""
+    idx = pd.DatetimeIndex(df.index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    df.index = idx.normalize()
+    return df
+
+
+def merge_live_bar(df, p, v_curr, today_date):
+    """오늘자 봉을 현재가로 덮어쓰거나(장중/마감 후) 새로 붙인다(장 시작 전). 원본은 건드리지 않는다."""
+    df = df.copy()
+    today_date = pd.Timestamp(today_date)
+    if today_date in df.index:
+        df.loc[today_date, 'Close'] = p
+        df.loc[today_date, 'Volume'] = v_curr
+        if p > df.loc[today_date, 'High']: df.loc[today_date, 'High'] = p
+        if p < df.loc[today_date, 'Low']: df.loc[today_date, 'Low'] = p
+    else:
+        new_row = pd.DataFrame({
+            'Open': [p], 'High': [p], 'Low': [p], 'Close': [p], 'Volume': [v_curr]
+        }, index=[today_date])
+        df = pd.concat([df, new_row])
+    return df
+
+
+def session_clock(now_local, is_kr):
+    """정규장 중이면 (경과 분, 그날 장 길이 분), 장외·휴장일이면 None (시간보정 안 함)
+
+    경과 시간은 분 단위로 자른다 - 같은 1분 안의 재실행은 같은 시간보정을 받아 진단 기억(memo)이 그대로 맞는다.
+    """
+    h = sessions.hours("kr" if is_kr else "us", now_local.date())
+    if h is None or not h.open <= now_local <= h.close:
+        return None
+    return (now_local - h.open).seconds // 60, (h.close - h.open).total_seconds() / 60
+
+
+def time_factor(now_local, is_kr, volume_curve=None):
+    """정규장 중이면 지금까지 찼어야 할 하루 거래량 비율, 장외·휴장일이면 None
+
+    volume_curve(장중 누적 거래량 분포 곡선)를 주면 그 곡선으로, 없으면 직선으로 본다.
+    장 시각은 장 달력(sessions)을 따르고, 단축장·시간 변경일은 그날 장 길이에 맞춰 곡선을 늘이고 줄인다.
+    """
+    clock = session_clock(now_local, is_kr)
+    if clock is None:
+        return None
+    elapsed, total_minutes = clock
+    if volume_curve is not None:
+        return expected_fraction(volume_curve, elapsed * SESSION_MINUTES / total_minutes)
+    return max(10, elapsed) / total_minutes
+
+
+def time_adjusted_strength(v_ratio, now_local, is_kr, volume_curve=None):
+    """정규장 중이면 경과 시간만큼 찼어야 할 거래량 비율(time_factor)로 강도를 보정 (장외·휴장일은 그대로)"""
+    factor = time_factor(now_local, is_kr, volume_curve)
+    return v_ratio if factor is None else min(1000, v_ratio / factor)
+
+
+def split_prev_close(df, p, today_date):
+    """일봉에서 전일 종가를 고른다."""
+    if pd.Timestamp(today_date) in df.index:
+        # 이미 오늘자 행이 들어와 있는 장중/마감 후
+        return float(df['Close'].iloc[-2]) if len(df) >= 2 else p
+    # 아직 장 시작 전 (df의 마지막 행이 바로 '어제 종가')
+    return float(df['Close'].iloc[-1]) if len(df) >= 1 else p
+
+
+def latest_values(df):
+    """오늘 봉까지 붙은 일봉에서 판정에 필요한 최신 지표값만 뽑는다 (pandas 기준 공식)."""
+    # 보조지표 연산 (RSI 14/9, Williams %R 14/6, MACD 12/26/9, BB 20/2)
+    delta = df['Close'].diff(); gain = (delta.where(delta > 0, 0)).rolling(14).mean(); loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    rsi_series = 100 - (100 / (1 + (gain / (loss + 1e-10))))
+
+    h14, l14 = df['High'].rolling(14).max(), df['Low'].rolling(14).min()
+    will_series = (h14 - df['Close']) / (h14 - l14 + 1e-10) * -100
+
+    macd = df['Close'].ewm(span=12).mean() - df['Close'].ewm(span=26).mean()
+    sig_line = macd.ewm(span=9).mean()
+
+    close = df['Close']
+    # ATR(14) 변동성 연산
+    tr1 = df['High'] - df['Low']
+    tr2 = (df['High'] - close.shift(1)).abs()
+    tr3 = (df['Low'] - close.shift(1)).abs()
+    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+
+    n = len(df)
+    defense_link_idx = min(21, n)
+    return {
+        "n": n,
+        "rsi_val": rsi_series.iloc[-1], "rsi_prev": rsi_series.iloc[-2],
+        "will_val": will_series.iloc[-1], "will_prev": will_series.iloc[-2],
+        "m_l": macd.iloc[-1], "s_l": sig_line.iloc[-1], "m_p": macd.iloc[-2], "s_p": sig_line.iloc[-2],
+        "ma5": close.rolling(5).mean().iloc[-1], "ma20": close.rolling(20).mean().iloc[-1],
+        "ma60": close.rolling(60).mean().iloc[-1], "ma120": close.rolling(120).mean().iloc[-1],
+        "std20": close.rolling(20).std().iloc[-1],
+        "today_open": float(df['Open'].iloc[-1]), "today_high": float(df['High'].iloc[-1]), "today_low": float(df['Low'].iloc[-1]),
+        "atr_14": float(tr.rolling(14).mean().iloc[-1]) if n >= 14 else float(tr.mean()),
+        "v_avg5": float(df['Volume'].iloc[-6:-1].mean()) if n >= 6 else float(df['Volume'].mean()),
+        "prev_low": float(df['Low'].iloc[-61:-1].min()) if n > 60 else float(df['Low'].min()),
+        "defense_high": float(df['High'].iloc[-defense_link_idx:-1].max()) if n > 1 else None,
+        "high_52w": float(df['High'].rolling(window=250, min_periods=1).max().iloc[-1]),
+        "low_52w": float(df['Low'].rolling(window=250, min_periods=1).min().iloc[-1]),
+        # 2~3일 바닥 기억 장치용 (오늘 포함 최근 3봉)
+        "recent_close": close.iloc[-3:].tolist(), "recent_rsi": rsi_series.iloc[-3:].tolist(),
+        "recent_will": will_series.iloc[-3:].tolist(),
+    }
+
+
+def diagnose_frame(df, p, v_curr, now_local, is_kr, prev_p=None, is_manual_mode=False, user_avg_price=0.0, params=DEFAULT_PARAMS,
+                   volume_curve=None):
+    """일봉(df)과 현재가(p)·누적거래량(v_curr)으로 전체 진단값을 계산해 딕셔너리로 돌려준다.
+
+    prev_p 를 주면(미국 fast_info 전일 종가) 그대로 쓰고, 없으면 일봉에서 전일 종가를 고른다.
+    volume_curve 는 시간보정 거래량 강도에 쓸 장중 분포 곡선 (volume_profile.volume_curve).
+    """
+    df = day_index(df.ffill().dropna())
+    today_date = now_local.date()
+
+    if not prev_p or prev_p <= 0:
+        prev_p = split_prev_close(df, p, today_date)
+
+    df = merge_live_bar(df, p, v_curr, today_date)
+    return decide(latest_values(df), p, v_curr, prev_p, now_local, is_kr, is_manual_mode, user_avg_price, params, volume_curve)
+
+
+def decide(x, p, v_curr, prev_p, now_local, is_kr, is_manual_mode=False, user_avg_price=0.0, params=DEFAULT_PARAMS, volume_curve=None):
+    """최신 지표값(x: latest_values 형식)과 현재가로 캔들·손절·성벽·1·2·3단계·신호등을 판정 (문턱값은 params)"""
+    P = params
+    n = x["n"]
+
+    # --- [거래량 및 시간보정 연산 장치] ---
+    v_avg5 = x["v_avg5"]
+    v_ratio = (v_curr / v_avg5) * 100 if v_avg5 > 0 else 0
+
+    p_diff = p - prev_p
+    p_chg = (p_diff / prev_p) * 100 if prev_p > 0 else 0
+
+    vol_strength_auto = time_adjusted_strength(v_ratio, now_local, is_kr, volume_curve)
+    vol_strength = 100.0 if is_manual_mode else vol_strength_auto
+
+    rsi_val, rsi_prev = x["rsi_val"], x["rsi_prev"]
+    will_val, will_prev = x["will_val"], x["will_prev"]
+    m_l, s_l, m_p, s_p = x["m_l"], x["s_l"], x["m_p"], x["s_p"]
+
+    # ★ [MACD 엔진 4단계 정밀 분기]
+    curr_diff = m_l - s_l
+    prev_diff = m_p - s_p
+    is_macd_bullish = (m_l > s_l)
+
+    is_macd_accelerating = is_macd_bullish and (curr_diff >= prev_diff)           # 🔥 정회전 가속 (화력 폭발)
+    is_macd_decelerating = is_macd_bullish and (curr_diff < prev_diff)            # ⚠️ 정회전 둔화 (탄력 저하)
+    is_macd_recovering = (not is_macd_bullish) and (curr_diff > prev_diff)        # 🌤️ 역회전 감소 (반등 시동)
+    is_macd_reverse_deepening = (not is_macd_bullish) and (curr_diff <= prev_diff)# ⚙️ 역회전 심화 (하락 가속)
+
+    mid_line = x["ma20"]
+    up_b = mid_line + (x["std20"] * 2)
+    low_b = mid_line - (x["std20"] * 2)
+
+    bandwidth = ((up_b - low_b) / mid_line) * 100 if mid_line > 0 else 0
+    is_squeeze = (bandwidth <= P.squeeze_bandwidth)
+
+    ma5_val = x["ma5"] if n >= 5 else mid_line
+    ma60_val = x["ma60"] if n >= 60 else mid_line
+    ma120_val = x["ma120"] if n >= 120 else mid_line
+
+    # ★ 5일선 및 20일선 이격도 정밀 연산
+    bias_ma5 = ((p - ma5_val) / ma5_val) * 100 if ma5_val > 0 else 0
+    bias_ma20 = ((p - mid_line) / mid_line) * 100 if mid_line > 0 else 0
+    is_over_extended_5 = (bias_ma5 >= P.over_extended_bias)
+
+    # ★ [캔들 판독 정밀화: 바닥 전용 밑꼬리와 추세 전용 밑꼬리 분리]
+    today_open, today_high, today_low = x["today_open"], x["today_high"], x["today_low"]
+
+    candle_range = max(0.01, today_high - today_low)
+    lower_tail = min(today_open, p) - today_low
+    body_len = abs(today_open - p)
+
+    # 1) 순수 양봉 여부
+    is_pure_bullish_candle = (p >= today_open)
+
+    # 2) 바닥 전용 밑꼬리 (5일선 무관! 극단 바닥에서 세력이 꼬리 달고 말아올린 봉)
+    is_bottom_lower_tail = (lower_tail >= candle_range * P.tail_range_ratio) or (lower_tail >= body_len * P.tail_body_ratio)
+    is_valid_bottom_candle = is_pure_bullish_candle or is_bottom_lower_tail
+
+    # 3) 2·3단계 추세용 밑꼬리 (5일선 사수 + 전일비 방어 필수)
+    is_trend_lower_tail = is_bottom_lower_tail and (p >= ma5_val) and (p_chg >= P.trend_tail_min_chg)
+    is_valid_buy_candle = is_pure_bullish_candle or is_trend_lower_tail
+
+    # 4) 성벽 위 경계용 음봉
+    is_bearish_candle = (p < today_open) and (not is_trend_lower_tail)
+
+    # ATR(14) 기반 동적 손절폭
+    atr_14 = x["atr_14"]
+    atr_ratio = (atr_14 / ma5_val) if ma5_val > 0 else P.atr_stop_default
+    dynamic_stop_rate = max(P.atr_stop_min, min(P.atr_stop_max, atr_ratio))
+    dynamic_stop_pct = dynamic_stop_rate * 100
+    dynamic_stop_price = ma5_val * (1 - dynamic_stop_rate)
+
+    prev_low = x["prev_low"]
+    is_below_ma5 = (p < ma5_val)
+    stop_loss_price = prev_low if is_below_ma5 else dynamic_stop_price
+
+    defense_line = x["defense_high"] * P.defense_ratio if x["defense_high"] is not None else p * P.defense_ratio
+
+    high_52w, low_52w = x["high_52w"], x["low_52w"]
+
+    is_bullish = (ma5_val > mid_line and mid_line > ma60_val and ma60_val > ma120_val)
+    is_bearish = (ma5_val < mid_line and mid_line < ma60_val and ma60_val < ma120_val)
+    is_ma5_safe = (p >= ma5_val)
+
+    is_down_trend_v = (p < prev_p) and (p_chg < 0)
+
+    # ★ [지표 정밀 연산 및 2~3일 바닥 기억 장치] (볼린저 하단은 오늘 값 기준으로 최근 3봉 비교)
+    bottom_scores = [
+        int(c <= (low_b * P.bottom_bb_margin)) + int(r <= P.rsi_bottom) + int(w <= P.will_bottom)
+        for c, r, w in zip(x["recent_close"], x["recent_rsi"], x["recent_will"])
+    ]
+    bottom_score = bottom_scores[-1]
+    recent_bottom_memory = (max(bottom_scores) >= P.bottom_min_score)
+
+    # 눌림목 동조 연산
+    p_will = 1 if will_val <= P.will_pullback else 0
+    p_bb = 1 if (mid_line * (1 - P.pullback_mid_band) <= p <= mid_line * (1 + P.pullback_mid_band)) else 0
+    p_rsi = 1 if (P.rsi_pullback_low <= rsi_val <= P.rsi_pullback_high) else 0
+    pullback_rebound_score = p_will + p_bb + p_rsi
+
+    # --- [손절 조건 검증] ---
+    is_stop_loss_triggered = False
+    stop_reason = ""
+    if user_avg_price > 0 and p < stop_loss_price:
+        is_stop_loss_triggered = True
+        stop_reason = f"보유 평단가 대비 손절 마지노선 이탈"
+    elif (recent_bottom_memory or bottom_score >= P.bottom_min_score) and p < prev_low:
+        is_stop_loss_triggered = True
+        stop_reason = f"바닥권 전저점 이탈 마지노선"
+
+    # 성벽 & 수확목표선
+    target_price_100 = up_b
+    is_target_reached = p >= (target_price_100 * P.target_ratio)
+    is_on_the_wall = (p >= defense_line) and (p < target_price_100)
+
+    # ★ [1·2·3단계 매수 판정: 1단계는 5일선 무관 바닥캔들 / 2·3단계는 5일선 필수 추세캔들]
+    is_bottom_indicator_ok = (bottom_score >= P.bottom_min_score or recent_bottom_memory)
+    is_macd_not_deepening = not is_macd_reverse_deepening
+    is_bandwidth_ok = (bandwidth >= P.min_bandwidth)
+
+    # 1단계 진바닥 입질 매수 (5일선 무관! 바닥 2개 이상 + 거래량 80점 + MACD 역회전 가속 아님 + 바닥 지지캔들)
+    is_bottom_entry_signal = (bottom_score >= P.bottom_min_score) and (vol_strength >= P.vol_entry) and is_macd_not_deepening and is_valid_bottom_candle
+
+    # 2단계 진바닥 탈출 매수 (5일선 위 + 최근 바닥기억 + 거래량 80점 + MACD 역회전 가속 아님 + 추세 유효캔들)
+    is_escape_buy_signal = is_ma5_safe and is_bottom_indicator_ok and (vol_strength >= P.vol_entry) and is_macd_not_deepening and is_valid_buy_candle
+
+    # 3단계 눌림목 추가 매수 (20일선 위 + 5일선 위 + 눌림목 동조 ≥ 2점 + 밴드폭 ≥ 20% + 거래량 + MACD + 추세 유효캔들)
+    is_pullback_buy_signal = (p >= mid_line) and is_ma5_safe and (pullback_rebound_score >= P.pullback_min_score) and (vol_strength >= P.vol_entry) and is_bandwidth_ok and is_macd_not_deepening and is_valid_buy_candle
+
+    # ★ [신호등 분기]
+    if is_stop_loss_triggered:
+        final_code = "STOP_LOSS_ALERT"
+    elif is_on_the_wall and is_bearish_candle:
+        final_code = "RED_SELL_WARNING"
+    elif is_target_reached:
+        final_code = "RED_SELL_TARGET"
+    elif is_on_the_wall:
+        final_code = "YELLOW_CAUTION"
+    elif (is_escape_buy_signal or is_pullback_buy_signal) and is_over_extended_5:
+        final_code = "WAIT_OVER_EXTENDED"
+    elif is_bottom_entry_signal:
+        final_code = "BOTTOM_ENTRY"
+    elif is_escape_buy_signal:
+        final_code = "ESCAPE_BUY"
+    elif is_pullback_buy_signal:
+        final_code = "PULLBACK_BUY"
+    elif is_ma5_safe and not is_bottom_indicator_ok:
+        final_code = "WAIT_INDICATOR"
+    elif is_ma5_safe and is_macd_reverse_deepening:
+        final_code = "WAIT_MACD"
+    elif (bottom_score >= P.bottom_min_score or recent_bottom_memory) and vol_strength < P.vol_entry:
+        final_code = "WAIT_VOLUME"
+    elif (p >= mid_line * (1 - P.pullback_mid_band) and p <= mid_line * P.wait_pullback_upper) and (pullback_rebound_score >= 1) and (pullback_rebound_score < P.pullback_min_score or not is_bandwidth_ok):
+        final_code = "WAIT_PULLBACK"
+    else:
+        final_code = "WAIT_GENERAL"
+
+    return {
+        "p": p, "prev_p": prev_p, "p_diff": p_diff, "p_chg": p_chg,
+        "v_curr": v_curr, "v_ratio": v_ratio, "vol_strength": vol_strength, "is_down_trend_v": is_down_trend_v,
+        "rsi_val": rsi_val, "rsi_prev": rsi_prev, "will_val": will_val, "will_prev": will_prev,
+        "m_l": m_l, "s_l": s_l, "m_p": m_p, "s_p": s_p,
+        "is_macd_accelerating": is_macd_accelerating, "is_macd_decelerating": is_macd_decelerating,
+        "is_macd_recovering": is_macd_recovering, "is_macd_reverse_deepening": is_macd_reverse_deepening,
+        "mid_line": mid_line, "up_b": up_b, "low_b": low_b, "bandwidth": bandwidth, "is_squeeze": is_squeeze,
+        "ma5_val": ma5_val, "ma60_val": ma60_val, "ma120_val": ma120_val, "bias_ma5": bias_ma5, "bias_ma20": bias_ma20,
+        "is_over_extended_5": is_over_extended_5,
+        "is_valid_bottom_candle": is_valid_bottom_candle, "is_valid_buy_candle": is_valid_buy_candle,
+        "is_bearish_candle": is_bearish_candle,
+        "atr_14": atr_14, "dynamic_stop_pct": dynamic_stop_pct, "dynamic_stop_price": dynamic_stop_price,
+        "prev_low": prev_low, "is_below_ma5": is_below_ma5, "stop_loss_price": stop_loss_price,
+        "defense_line": defense_line, "high_52w": high_52w, "low_52w": low_52w,
+        "is_bullish": is_bullish, "is_bearish": is_bearish, "is_ma5_safe": is_ma5_safe,
+        "bottom_score": int(bottom_score), "recent_bottom_memory": bool(recent_bottom_memory),
+        "pullback_rebound_score": pullback_rebound_score,
+        "is_stop_loss_triggered": is_stop_loss_triggered, "stop_reason": stop_reason,
+        "target_price_100": target_price_100, "is_on_the_wall": is_on_the_wall,
+        "is_bottom_indicator_ok": is_bottom_indicator_ok, "is_bandwidth_ok": is_bandwidth_ok,
+        "is_escape_buy_signal": is_escape_buy_signal, "is_pullback_buy_signal": is_pullback_buy_signal,
+        "final_code": final_code,
+    }
@@ -0,0 +1,144 @@
+"""네이버 보급용 공용 HTTP 손잡이 - 연결을 묶어 두고(keep-alive) 다시 쓰며, 느린 응답은 짧게 끊고 다시 묻는다.
+
+- 프로세스마다 세션 하나, 호스트마다 연결 풀: 시세를 반복해 받아도 TCP/TLS 악수는 처음 한 번뿐
+- 시도마다 제한 시간은 그 호스트의 최근 응답 시간으로 정한다 (평균 + 4×편차, TCP 재전송 타이머와 같은 식)
+- 연결 실패 / 시간 초과 / 429·5xx 는 잠깐 쉬었다가(지수 backoff + 흔들림) 제한 시간을 두 배로 늘려 다시 묻는다
+- 모든 시도는 호출자가 준 전체 예산(budget 초) 안에서만. 마지막 시도는 남은 예산을 다 쓴다
+- provider 를 주면 재시도까지 시도마다 속도 제한 토큰을 하나씩 받는다 (재시도도 보급처 입장에선 한 번 더 나간 것)
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .rate_limit import Throttled, acquire
+
+POOL_SIZE = 32          # 호스트당 열어 둘 연결 수 (시세 작업자 스레드 수 이상)
+MAX_RETRIES = 2
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+MIN_TIMEOUT, MAX_TIMEOUT = 0.3, 5.0
+BACKOFF = 0.05          # 첫 재시도 전 쉬는 시간(초), 시도마다 두 배
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+_latency = {}
+_stats = defaultdict(Counter)
+
+
+class HostLatency:
+    """호스트별 응답 시간 이동 평균/편차 (RFC 6298 의 SRTT/RTTVAR)"""
+
+    def __init__(self, initial):
+        self.initial = initial
+        self.srtt = None
+        self.rttvar = None
+
+    def observe(self, sec):
+        if self.srtt is None:
+            self.srtt, self.rttvar = sec, sec / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - sec)
+            self.srtt = 0.875 * self.srtt + 0.125 * sec
+
+    def timeout(self):
+        if self.srtt is None:
+            return self.initial
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, self.srtt + 4 * self.rttvar))
+
+
+def session():
+    """공용 requests.Session (작업 프로세스로 갈라지면 새로 연다)"""
+    global _session, _session_pid
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=POOL_SIZE, max_retries=0)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session, _session_pid = s, os.getpid()
+        return _session
+
+
+def _host_latency(host, initial):
+    with _lock:
+        lat = _latency.get(host)
+        if lat is None:
+            lat = _latency[host] = HostLatency(initial)
+        return lat
+
+
+def _bump(host, key):
+    with _lock:
+        _stats[host][key] += 1
+
+
+def get(url, headers=None, budget=2.0, retries=MAX_RETRIES, provider=None, purpose="quote"):
+    """GET 한 번 (재시도 포함). 예산 안에 응답을 못 받으면 마지막 예외를, 재시도할 상태코드만 받았으면 그 응답을 돌려준다.
+
+    provider 를 주면 시도마다 rate_limit.acquire(provider, purpose). 첫 시도가 토큰을 못 받으면 Throttled,
+    재시도가 못 받으면 거기서 멈추고 앞 시도의 결과로 끝낸다.
+    """
+    host = urlsplit(url).netloc
+    lat = _host_latency(host, initial=budget / 2)
+    deadline = time.monotonic() + budget
+    per_try = lat.timeout()
+    last = None
+    for attempt in range(retries + 1):
+        left = deadline - time.monotonic()
+        if left <= 0.05:
+            break
+        if provider:
+            try:
+                acquire(provider, purpose)
+            except Throttled:
+                if not attempt:
+                    raise
+                break
+            left = deadline - time.monotonic()
+            if left <= 0.05:
+                break
+        if attempt:
+            _bump(host, "retries")
+        t = left if attempt == retries else min(per_try, left)
+        started = time.monotonic()
+        _bump(host, "requests")
+        try:
+            res = session().get(url, headers=headers, timeout=t)
+        except requests.Timeout as e:
+            _bump(host, "timeouts")
+            last = e
+        except requests.ConnectionError as e:
+            _bump(host, "errors")
+            last = e
+        else:
+            if res.status_code not in RETRY_STATUS:
+                with _lock:
+                    lat.observe(time.monotonic() - started)
+                _bump(host, "ok")
+                return res
+            _bump(host, "retry_status")
+            last = res
+        per_try = min(MAX_TIMEOUT, per_try * 2)
+        pause = BACKOFF * 2 ** attempt * (1 + random.random())
+        time.sleep(max(0.0, min(pause, deadline - time.monotonic() - 0.05)))
+    if isinstance(last, requests.Response):
+        return last
+    raise last or requests.Timeout(f"no time left for {url}")
+
+
+def stats():
+    """{호스트: {requests, ok, retries, timeouts, errors, retry_status, srtt_ms, timeout_ms}}"""
+    with _lock:
+        out = {}
+        for host, c in _stats.items():
+            lat = _latency.get(host)
+            out[host] = {**{k: c[k] for k in ("requests", "ok", "retries", "timeouts", "errors", "retry_status")},
+                         "srtt_ms": round(lat.srtt * 1000, 1) if lat and lat.srtt is not None else None,
+                         "timeout_ms": round(lat.timeout() * 1000) if lat else None}
+        return out
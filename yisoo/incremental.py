@@ -0,0 +1,212 @@
+"""당일 봉만 바뀌는 새로고침용 증분 지표 장치
+
+어제까지 마감된 봉으로 이동합계·EWM 상태·창(window) 꼬리를 한 번 만들어 두고(IndicatorState),
+틱마다 오늘 봉 하나만 얹어 latest_values() 와 같은 값을 O(1) 로 낸다.
+"""
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from . import snapshot
+from .diagnosis import day_index, decide, time_factor
+from .memo import LAYERS
+from .params import DEFAULT_PARAMS
+
+
+def _ewm_step(state, cur, span):
+    """pandas ewm(span, adjust=True) 점화식 한 걸음. state=(weighted, old_wt) → (새 평균, 새 state)"""
+    weighted, old_wt = state
+    if weighted is None:
+        return cur, (cur, 1.0)
+    old_wt *= 1.0 - 2.0 / (span + 1.0)
+    if weighted != cur:
+        weighted = (old_wt * weighted + cur) / (old_wt + 1.0)
+    return weighted, (weighted, old_wt + 1.0)
+
+
+class IndicatorState:
+    """마감 봉까지의 지표 상태 + (있다면) 저장소에 들어온 오늘자 부분 봉의 시가/고가/저가"""
+
+    # 저녁 스냅샷(snapshot)에 떠 두는 창 꼬리 길이 - __init__ 의 deque 길이와 같아야 한다
+    TAILS = {"gains": 13, "losses": 13, "closes": 119, "highs": 249, "lows": 249, "vols": 5, "trs": 13}
+
+    def __init__(self, closed, partial=None):
+        closed = closed.ffill().dropna()
+        self.m = len(closed)
+        self.partial = partial  # (open, high, low) 또는 None
+        close, high, low, vol = (closed[c].to_numpy(dtype=float) for c in ("Close", "High", "Low", "Volume"))
+        self.prev_close = float(close[-1]) if self.m else None
+
+        # RSI: 첫날 차이는 pandas where 처럼 0
+        delta = np.diff(close, prepend=np.nan)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        self.gains, self.losses = deque(gains[-13:], 13), deque(losses[-13:], 13)
+
+        # 창 꼬리 (오늘 봉과 합쳐 창을 채울 만큼만)
+        self.closes = deque(close[-119:], 119)
+        self.highs, self.lows = deque(high[-249:], 249), deque(low[-249:], 249)
+        self.vols = deque(vol[-5:], 5)
+        self.vol_sum_all, self.low_min_all = float(vol.sum()), float(low.min()) if self.m else np.inf
+        prev_close = np.concatenate([[np.nan], close[:-1]])
+        tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+        self.trs, self.tr_sum_all = deque(tr[-13:], 13), float(tr.sum())
+
+        # EWM 상태 (MACD 12/26, 신호선 9)
+        self.ew12 = self.ew26 = self.ew9 = (None, 1.0)
+        macd_hist = []
+        for c in close:
+            e12, self.ew12 = _ewm_step(self.ew12, c, 12)
+            e26, self.ew26 = _ewm_step(self.ew26, c, 26)
+            sig, self.ew9 = _ewm_step(self.ew9, e12 - e26, 9)
+            macd_hist.append((e12 - e26, sig))
+        self.last_macd = macd_hist[-1] if macd_hist else (np.nan, np.nan)
+
+        # 어제까지의 RSI / Williams (전일값·바닥 기억용 최근 2봉)
+        self.recent = {"close": list(close[-2:]), "rsi": [], "will": []}
+        if self.m:
+            # 마지막 2봉의 14일 창만 필요하니 꼬리 16봉으로 계산
+            hist = closed.iloc[-min(self.m, 16):]
+            d = hist['Close'].diff()
+            g = d.where(d > 0, 0).rolling(14).mean()
+            lo = (-d.where(d < 0, 0)).rolling(14).mean()
+            rsi = 100 - (100 / (1 + (g / (lo + 1e-10))))
+            h14, l14 = hist['High'].rolling(14).max(), hist['Low'].rolling(14).min()
+            will = (h14 - hist['Close']) / (h14 - l14 + 1e-10) * -100
+            self.recent["rsi"] = rsi.iloc[-2:].tolist()
+            self.recent["will"] = will.iloc[-2:].tolist()
+
+    @classmethod
+    def for_today(cls, df, today_date):
+        """일봉(오늘자 부분 봉이 섞여 있을 수 있음)을 마감 봉/오늘 봉으로 나눠 상태를 만든다."""
+        df = day_index(df.ffill().dropna())
+        today = pd.Timestamp(today_date)
+        if today in df.index:
+            row = df.loc[today]
+            return cls(df[df.index < today], (float(row['Open']), float(row['High']), float(row['Low'])))
+        return cls(df)
+
+    @classmethod
+    def restore(cls, m, scalars, tails, recent, partial=None):
+        """스냅샷 한 줄로 상태를 되살린다 (일봉 없이). tails/recent 는 오른쪽 정렬 배열, 앞쪽 빈칸은 버린다."""
+        self = cls.__new__(cls)
+        self.m, self.partial = m, partial
+        self.prev_close, self.vol_sum_all, self.low_min_all, self.tr_sum_all = (
+            scalars["prev_close"], scalars["vol_sum_all"], scalars["low_min_all"], scalars["tr_sum_all"])
+        for name, size in cls.TAILS.items():
+            setattr(self, name, deque(tails[name][size - min(m, size):].tolist(), size))
+        self.ew12 = (scalars["ew12_w"], scalars["ew12_o"])
+        self.ew26 = (scalars["ew26_w"], scalars["ew26_o"])
+        self.ew9 = (scalars["ew9_w"], scalars["ew9_o"])
+        self.last_macd = (scalars["macd"], scalars["signal"])
+        k = min(m, 2)
+        self.recent = {key: recent[key][2 - k:].tolist() for key in ("close", "rsi", "will")}
+        return self
+
+    def latest(self, p, v_curr):
+        """오늘 현재가·누적거래량을 얹은 최신 지표값 (latest_values 와 같은 형식)"""
+        m, n = self.m, self.m + 1
+        if self.partial:
+            o, h, lo = self.partial
+            h, lo = max(h, p), min(lo, p)
+        else:
+            o = h = lo = p
+        pc = self.prev_close
+
+        # RSI 14
+        d = p - pc if pc is not None else np.nan
+        g_sum = sum(self.gains) + (d if d > 0 else 0.0)
+        l_sum = sum(self.losses) + (-d if d < 0 else 0.0)
+        rsi_val = 100 - (100 / (1 + ((g_sum / 14) / ((l_sum / 14) + 1e-10)))) if n >= 14 else np.nan
+
+        # Williams %R 14
+        if n >= 14:
+            h14 = max(max(list(self.highs)[-13:]), h)
+            l14 = min(min(list(self.lows)[-13:]), lo)
+            will_val = (h14 - p) / (h14 - l14 + 1e-10) * -100
+        else:
+            will_val = np.nan
+
+        # MACD
+        e12, _ = _ewm_step(self.ew12, p, 12)
+        e26, _ = _ewm_step(self.ew26, p, 26)
+        m_l = e12 - e26
+        s_l, _ = _ewm_step(self.ew9, m_l, 9)
+
+        # 이평 / 볼린저 표준편차
+        closes = list(self.closes)
+        ma = {}
+        for w in (5, 20, 60, 120):
+            ma[w] = (sum(closes[-(w - 1):]) + p) / w if n >= w else np.nan
+        if n >= 20:
+            win = closes[-19:] + [p]
+            std20 = (sum((c - ma[20]) ** 2 for c in win) / 19) ** 0.5
+        else:
+            std20 = np.nan
+
+        # ATR 14
+        tr = h - lo if pc is None else max(h - lo, abs(h - pc), abs(lo - pc))
+        atr_14 = (sum(self.trs) + tr) / 14 if n >= 14 else (self.tr_sum_all + tr) / n
+
+        highs, lows, vols = list(self.highs), list(self.lows), list(self.vols)
+        defense_high = max(highs[-min(20, m):]) if n > 1 else None
+        return {
+            "n": n,
+            "rsi_val": rsi_val, "rsi_prev": self.recent["rsi"][-1] if self.recent["rsi"] else np.nan,
+            "will_val": will_val, "will_prev": self.recent["will"][-1] if self.recent["will"] else np.nan,
+            "m_l": m_l, "s_l": s_l, "m_p": self.last_macd[0], "s_p": self.last_macd[1],
+            "ma5": ma[5], "ma20": ma[20], "ma60": ma[60], "ma120": ma[120], "std20": std20,
+            "today_open": o, "today_high": h, "today_low": lo,
+            "atr_14": atr_14,
+            "v_avg5": sum(vols) / 5 if n >= 6 else (self.vol_sum_all + v_curr) / n,
+            "prev_low": min(lows[-60:]) if n > 60 else min(self.low_min_all, lo),
+            "defense_high": defense_high,
+            "high_52w": max(max(highs) if highs else h, h), "low_52w": min(min(lows) if lows else lo, lo),
+            "recent_close": self.recent["close"] + [p], "recent_rsi": self.recent["rsi"] + [rsi_val],
+            "recent_will": self.recent["will"] + [will_val],
+        }
+
+
+def diagnose_live(state, p, v_curr, now_local, is_kr, prev_p=None, is_manual_mode=False, user_avg_price=0.0, params=DEFAULT_PARAMS,
+                  volume_curve=None):
+    """diagnose_frame 과 같은 결과를 증분 상태로 계산"""
+    if not prev_p or prev_p <= 0:
+        prev_p = state.prev_close if state.prev_close is not None else p
+    return decide(state.latest(p, v_curr), p, v_curr, prev_p, now_local, is_kr, is_manual_mode, user_avg_price, params, volume_curve)
+
+
+# --- [종목별 상태 보관: 마감 봉이 바뀌지 않는 한 재사용 (memo 의 state 층)] ---
+def _state_key(symbol, df, today_date):
+    last = df.iloc[-1] if len(df) else None
+    return (symbol, today_date, len(df), None if last is None else (df.index[-1], float(last['Close']), float(last['High']), float(last['Low'])))
+
+
+def state_for(symbol, df, today_date):
+    """(종목, 오늘, 마지막 봉 날짜·값, 봉 개수)가 같으면 만들어 둔 상태를 그대로 쓴다.
+
+    처음 보는 조합이면 저녁 스냅샷을 먼저 보고, 없거나 마감 봉이 다르면 일봉으로 새로 만든다.
+    """
+    # 저녁에 떠 둔 스냅샷이 같은 마감 봉이면 일봉 연산 없이 되살린다
+    return LAYERS["state"].get(_state_key(symbol, df, today_date),
+                               lambda: snapshot.lookup(symbol, df, today_date) or IndicatorState.for_today(df, today_date))
+
+
+def diagnose_layered(symbol, df, p, v_curr, now_local, is_kr, prev_p=None, is_manual_mode=False, user_avg_price=0.0,
+                     params=DEFAULT_PARAMS, volume_curve=None):
+    """diagnose_live(state_for(...)) 와 같은 결과를 층마다 기억해 둔 값으로 (memo 참고).
+
+    평단가는 판정에 '보유 여부(> 0)'로만 쓰이니 값만 바꾸면 signal 층도 그대로 꺼낸다.
+    시각·곡선은 decide 가 실제로 쓰는 시간보정 비율(time_factor, 분 단위)로만 키에 들어가니 같은 1분 안의
+    재실행은 그대로 꺼내고, 장외·수동 모드는 비율이 없다. 돌려준 dict 는 복사본이라 고쳐 써도 된다.
+    """
+    skey = _state_key(symbol, df, now_local.date())
+    state = state_for(symbol, df, now_local.date())
+    ikey = (skey, p, v_curr)
+    x = LAYERS["indicators"].get(ikey, lambda: state.latest(p, v_curr))
+    if not prev_p or prev_p <= 0:
+        prev_p = state.prev_close if state.prev_close is not None else p
+    factor = None if is_manual_mode else time_factor(now_local, is_kr, volume_curve)
+    key = (ikey, prev_p, is_kr, is_manual_mode, user_avg_price > 0, factor, params)
+    return dict(LAYERS["signal"].get(key, lambda: decide(x, p, v_curr, prev_p, now_local, is_kr, is_manual_mode,
+                                                        user_avg_price, params, volume_curve)))
@@ -0,0 +1,192 @@
+"""보조지표 일괄 연산 엔진 - (날짜 × 종목) 2차원 NumPy 판 위에서 전 종목 지표를 한 번에 계산
+
+diagnose_frame 의 pandas 공식(RSI 14, Williams %R 14, MACD 12/26/9, 볼린저 20/2,
+MA 5/20/60/120, ATR 14, 250일 고저)과 같은 값을 낸다. 1e-10 보정값도 그대로 쓴다.
+상장 전 구간처럼 종목별 앞쪽이 NaN 인 판도 받는다. 거래정지처럼 중간이 빈 종목은
+그 종목의 유효 행만 모아(압축) 계산한 뒤 제자리로 돌려놓으므로, 종목 하나만 diagnose_frame 에
+넣은 것과 같은 값이 나오고 빈 날짜 칸은 NaN 이 된다.
+(backtest/sweep 은 판을 미리 ffill_panel 로 채워 정지일을 보합 봉으로 보는 쪽이니 여기 해당 없음)
+"""
+import numpy as np
+import pandas as pd
+
+PANEL_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+MA_WINDOWS = (5, 20, 60, 120)
+
+
+def build_panel(frames):
+    """{종목: 일봉 DataFrame} → (날짜 인덱스, 종목 목록, {필드: (T, N) float64 배열})
+
+    날짜는 모든 종목의 합집합으로 맞추고, 종목별 빈 날짜는 NaN 으로 둔다.
+    (지표는 compute_indicators 가 종목별 유효 행만 모아 계산하니 빈 날짜가 창을 깎아 먹지 않는다)
+    """
+    symbols = list(frames)
+    aligned = pd.concat({s: frames[s][PANEL_FIELDS] for s in symbols}, axis=1).sort_index()
+    arrays = {f: aligned.xs(f, axis=1, level=1)[symbols].to_numpy(dtype=np.float64) for f in PANEL_FIELDS}
+    return aligned.index, symbols, arrays
+
+
+# --- [공용 창(window) 연산: 시간축(axis 0) 기준] ---
+def _shift(x, k):
+    """k 칸 아래로 밀고 위는 NaN"""
+    out = np.full_like(x, np.nan)
+    if k < len(x):
+        out[k:] = x[:len(x) - k]
+    return out
+
+
+def _window_count(valid, w, cc=None):
+    """창 안 유효값 개수 (T, N) int - 유효개수 누적합(cc)을 주면 재사용"""
+    cc = np.cumsum(valid, axis=0, dtype=np.int32) if cc is None else cc
+    n = cc.copy()
+    n[w:] -= cc[:-w]
+    return n
+
+
+class _Windows:
+    """한 배열에 대해 누적합/유효개수를 한 번만 만들어 여러 창 길이의 이동평균에 같이 쓴다."""
+
+    def __init__(self, x):
+        self.valid = ~np.isnan(x)
+        # 누적 오차를 줄이려고 종목별 첫 값을 빼고 더한다
+        first = x[self.valid.argmax(axis=0), np.arange(x.shape[1])]
+        self.anchor = np.where(np.isnan(first), 0.0, first)
+        self.csum = np.cumsum(np.where(self.valid, x - self.anchor, 0.0), axis=0)
+        self.ccnt = np.cumsum(self.valid, axis=0, dtype=np.int32)
+
+    def mean(self, w):
+        s = self.csum.copy()
+        s[w:] -= self.csum[:-w]
+        out = s / w + self.anchor
+        out[_window_count(self.valid, w, self.ccnt) < w] = np.nan
+        return out
+
+
+def rolling_mean(x, w):
+    return _Windows(x).mean(w)
+
+
+def rolling_std(x, w, mean=None):
+    """표본 표준편차(ddof=1). 창 안 편차 제곱합을 직접 더해 큰 가격대에서도 상쇄 오차가 없다."""
+    mean = rolling_mean(x, w) if mean is None else mean
+    t = len(x)
+    acc = np.zeros_like(x)
+    for k in range(w):
+        d = x[:t - k] - mean[k:]
+        np.multiply(d, d, out=d)
+        acc[k:] += d
+    acc[:w - 1] = np.nan
+    return np.sqrt(acc / (w - 1))
+
+
+def _rolling_extreme(x, w, min_periods, op):
+    """2의 거듭제곱 창을 두 배씩 키워(O(log w)) 이동 최댓값/최솟값. op 는 np.fmax / np.fmin (NaN 무시)."""
+    span, m = 1, x
+    while span * 2 <= w:
+        nxt = m.copy()
+        op(m[span:], m[:-span], out=nxt[span:])
+        m, span = nxt, span * 2
+    out = m.copy()
+    if w > span:
+        k = w - span
+        op(m[k:], m[:-k], out=out[k:])
+    out[_window_count(~np.isnan(x), w) < min_periods] = np.nan
+    return out
+
+
+def rolling_max(x, w, min_periods=None):
+    return _rolling_extreme(x, w, w if min_periods is None else min_periods, np.fmax)
+
+
+def rolling_min(x, w, min_periods=None):
+    return _rolling_extreme(x, w, w if min_periods is None else min_periods, np.fmin)
+
+
+def ewm_mean(x, span):
+    """pandas ewm(span).mean() (adjust=True, ignore_na=False) 의 가중평균 점화식을 그대로 옮김.
+
+    값이 직전 평균과 같으면 갱신하지 않는 것까지 같아서, 거래정지처럼 가격이 멈춘 종목도 MACD 가 정확히 0 이 된다.
+    """
+    factor = 1.0 - 2.0 / (span + 1.0)
+    weighted = x[0].copy()
+    old_wt = np.ones(x.shape[1])
+    out = np.empty_like(x)
+    out[0] = weighted
+    for t in range(1, len(x)):
+        cur = x[t]
+        is_obs = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+        old_wt = np.where(started, old_wt * factor, old_wt)
+        upd = started & is_obs
+        mixed = (old_wt * weighted + cur) / (old_wt + 1.0)
+        weighted = np.where(upd & (weighted != cur), mixed, weighted)
+        old_wt = np.where(upd, old_wt + 1.0, old_wt)
+        weighted = np.where(~started & is_obs, cur, weighted)
+        out[t] = weighted
+    return out
+
+
+# --- [중간이 빈 종목 압축: 유효 행을 아래(최근)쪽으로 모았다가 제자리로] ---
+def _compact_order(close):
+    """종목별로 빈 행을 위로, 유효 행을 날짜순 그대로 아래로 보내는 행 번호표 (T, N). 중간 빈칸이 없으면 None."""
+    valid = ~np.isnan(close)
+    if not (valid[:-1] & ~valid[1:]).any():
+        return None  # 앞쪽 NaN 뿐이면 이미 압축된 모양
+    return np.argsort(valid, axis=0, kind="stable")
+
+
+def compute_indicators(high, low, close):
+    """(T, N) 고가/저가/종가 판 → 지표 판 딕셔너리
+
+    키: RSI, WILL, MACD, SIGNAL, MA5, MA20, MA60, MA120, STD20, BB_UP, BB_LOW, ATR14, HIGH250, LOW250, TR
+    중간이 빈 종목(종가 NaN 인 날)은 유효 행만으로 계산하고, 빈 날짜 칸은 NaN 으로 돌려준다.
+    """
+    order = _compact_order(close)
+    if order is None:
+        return _compute_indicators(high, low, close)
+    gather = lambda x: np.take_along_axis(x, order, axis=0)
+    out = {}
+    for key, val in _compute_indicators(gather(high), gather(low), gather(close)).items():
+        back = np.empty_like(val)
+        np.put_along_axis(back, order, val, axis=0)
+        out[key] = back
+    return out
+
+
+def _compute_indicators(high, low, close):
+    out = {}
+    prev_close = _shift(close, 1)
+
+    # RSI(14): pandas 의 where 는 첫날 NaN 차이를 0 으로 바꾸므로 똑같이 처리
+    delta = close - prev_close
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[np.isnan(close)] = np.nan
+    loss[np.isnan(close)] = np.nan
+    out["RSI"] = 100 - (100 / (1 + (rolling_mean(gain, 14) / (rolling_mean(loss, 14) + 1e-10))))
+
+    # Williams %R(14)
+    h14, l14 = rolling_max(high, 14), rolling_min(low, 14)
+    out["WILL"] = (h14 - close) / (h14 - l14 + 1e-10) * -100
+
+    # MACD 12/26/9
+    out["MACD"] = ewm_mean(close, 12) - ewm_mean(close, 26)
+    out["SIGNAL"] = ewm_mean(out["MACD"], 9)
+
+    # 이동평균 + 볼린저 20/2 (종가 누적합 하나로 모든 이평 공유)
+    cw = _Windows(close)
+    for w in MA_WINDOWS:
+        out[f"MA{w}"] = cw.mean(w)
+    out["STD20"] = rolling_std(close, 20, mean=out["MA20"])
+    out["BB_UP"] = out["MA20"] + out["STD20"] * 2
+    out["BB_LOW"] = out["MA20"] - out["STD20"] * 2
+
+    # ATR(14): 첫날은 전일 종가가 없으니 고가-저가만
+    tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    out["TR"] = tr
+    out["ATR14"] = rolling_mean(tr, 14)
+
+    # 250일 고저 (min_periods=1)
+    out["HIGH250"] = rolling_max(high, 250, 1)
+    out["LOW250"] = rolling_min(low, 250, 1)
+    return out
@@ -0,0 +1,128 @@
+"""KRX 하루치 일괄 적재 - 장 마감 뒤 상장 목록 한 번으로 전 종목 일봉을 한 줄씩 저장소에 붙인다.
+
+KRX 상장 목록(fdr.StockListing('KRX'))에는 종목마다 그날 시가·고가·저가·종가·거래량·전일비가 실려 있어,
+종목마다 일봉을 따로 받을(수천 번) 필요 없이 요청 한 번이면 하루치가 찬다.
+
+- 적재일: 장 달력(sessions) 기준 종가가 확정된 가장 최근 거래일. 마감 10분(15:40) 뒤면 오늘,
+  개장 전이나 휴장일이면 전 거래일 (장중에는 거부)
+- 휴장일 거르기: 달력이 모르는 임시 휴장까지 막으려고, 목록 값이 저장소의 직전 봉과 같은 종목이 대부분이면 새 장이 아니라 보고 쓰지 않는다
+- 직전 장: 달력의 전 거래일 (저장소에 같이 든 미국 종목 날짜는 보지 않음). 목록 종목 대부분이 그날 봉이 없는데
+  목록의 전일 종가가 저장소 마지막 종가와 이어지면, 그날은 달력이 모르는 임시 휴장으로 보고 저장소 마지막 날을 직전 장으로 삼는다
+- 거래정지(시가/종가 0)는 건너뛴다
+- 빈 구간: 직전 장 봉이 없는 종목(빈 날이 있거나 처음 보는 종목)은 목록 한 줄을 붙이지 않고
+  종목별 일봉으로 메운다 (--max-backfill 개까지, 시가총액 순). 한 줄만 붙이면 저장소가 그 앞 빈칸을 못 알아채기 때문
+- 처음 보는 종목이 한도를 넘으면 목록 한 줄만 붙인다 (나중에 화면에서 열면 저장소가 통째로 받아 채움)
+
+    python -m yisoo.ingest                       # 매일 18:00 cron → 이어서 price_panel build → snapshot build
+    python -m yisoo.ingest --day 2026-10-16 --max-backfill 0
+"""
+import argparse
+import time as clock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from . import sessions
+from .bar_store import COLUMNS, BarStore
+from .timing import span
+
+MAX_BACKFILL = 200
+BACKFILL_DAYS = 500
+STALE_SHARE = 0.5
+
+
+def listing_bars(listing):
+    """상장 목록 → 종목번호 인덱스의 (OHLCV, prev_close, Marcap) 표. 거래정지·빈값 종목은 뺀다."""
+    if listing is None or listing.empty:
+        return pd.DataFrame(columns=COLUMNS + ["prev_close"])
+    df = listing.set_index(listing["Code"].astype(str))
+    out = pd.DataFrame({c: pd.to_numeric(df[c], errors="coerce") for c in COLUMNS})
+    changes = pd.to_numeric(df["Changes"], errors="coerce") if "Changes" in df else np.nan
+    out["prev_close"] = out["Close"] - changes
+    out["Marcap"] = pd.to_numeric(df["Marcap"], errors="coerce") if "Marcap" in df else 0.0
+    ok = out[["Open", "High", "Low", "Close"]].gt(0).all(axis=1) & out["Volume"].notna()
+    return out[ok & ~out.index.duplicated()].sort_values("Marcap", ascending=False)
+
+
+def plan(bars, last, day):
+    """목록 표와 저장소 직전 봉(last_bars)으로 day 적재 종목을 나눈다: append / gap / new, 그리고 휴장 판정 수치"""
+    known = bars.index.intersection(last.index)
+    prev_session = sessions.previous_trading_day("kr", day).isoformat()
+    last_day = last.loc[known, "day"]
+    same = (bars.loc[known, COLUMNS].to_numpy() == last.loc[known, COLUMNS].to_numpy()).all(axis=1)
+    continued = np.isclose(bars.loc[known, "prev_close"].to_numpy(dtype=float), last.loc[known, "Close"].to_numpy(dtype=float))
+    if len(known) and (last_day == prev_session).mean() < STALE_SHARE and continued.mean() > STALE_SHARE:
+        prev_session = last_day.max()  # 달력이 모르는 임시 휴장 (목록의 전일 종가가 저장소 마지막 봉과 이어짐)
+    up_to_date = (last_day == prev_session).to_numpy()
+    return {
+        "append": known[up_to_date],
+        "gap": known[~up_to_date],
+        "new": bars.index.difference(last.index, sort=False),
+        "prev_session": prev_session,
+        "stale_share": float(same.mean()) if len(known) else 0.0,
+        "continued_share": float(continued.mean()) if len(known) else None,
+    }
+
+
+def ingest(listing, day, store=None, max_backfill=MAX_BACKFILL, backfill_days=BACKFILL_DAYS, fetcher=None, workers=4):
+    """하루치 상장 목록을 day 의 일봉으로 적재. 반환: 요약 dict (휴장으로 보이면 written=0, skipped='stale')"""
+    store = store or BarStore()
+    bars = listing_bars(listing)
+    last = store.last_bars(day)
+    p = plan(bars, last, day)
+    summary = {"day": day, "listed": len(listing), "tradable": len(bars), "prev_session": p["prev_session"],
+               "continued_share": p["continued_share"], "stale_share": round(p["stale_share"], 3)}
+    if p["stale_share"] > STALE_SHARE:
+        return {**summary, "written": 0, "skipped": "stale"}
+
+    # 빈 구간 종목(시가총액 순)부터 한도만큼 종목별로 메우고, 넘친 처음 보는 종목은 목록 한 줄만
+    backfill = list(p["gap"]) + list(p["new"])
+    backfill, overflow = backfill[:max_backfill], backfill[max_backfill:]
+    new = set(p["new"])
+    overflow_new = [s for s in overflow if s in new]
+    write = list(p["append"]) + overflow_new
+    written = store.upsert_day(day, bars.loc[write]) if write else 0
+
+    filled = 0
+    if backfill:
+        if fetcher is None:
+            from .market_feed import fetch_kr_history as fetcher
+        start = day - timedelta(days=backfill_days)
+
+        def one(sym):
+            df = store.history(sym, start, fetcher)
+            return not df.empty and df.index[-1].date() >= day
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            filled = sum(pool.map(one, backfill))
+    return {**summary, "written": written, "gaps": len(p["gap"]), "new": len(p["new"]),
+            "backfilled": filled, "backfill_requested": len(backfill), "deferred": len(overflow) - len(overflow_new)}
+
+
+def main(argv=None):
+    from .rate_limit import purpose
+    from .replay import fdr_listing
+
+    parser = argparse.ArgumentParser(description="KRX 하루치 일괄 적재 (상장 목록 한 번 → 전 종목 일봉 한 줄씩)")
+    parser.add_argument("--day", type=date.fromisoformat, default=None,
+                        help="적재일 (기본: 한국 시각으로 가장 최근 마감된 장)")
+    parser.add_argument("--max-backfill", type=int, default=MAX_BACKFILL, help="종목별 일봉으로 메울 최대 종목 수")
+    args = parser.parse_args(argv)
+
+    day = args.day or sessions.settled_day("kr")
+    if day is None:
+        raise SystemExit("장중이구먼. 목록 값이 아직 하루치가 아니니 15:40 뒤에 돌리시게.")
+    started = clock.perf_counter()
+    with span("ingest_listing", source="krx"), purpose("history"):
+        listing = fdr_listing('KRX')
+    summary = ingest(listing, day, max_backfill=args.max_backfill)
+    summary["sec"] = round(clock.perf_counter() - started, 1)
+    if summary.get("skipped") == "stale":
+        print(f"{day}: 목록이 직전 봉과 같구먼 (휴장일로 보고 건너뜀).")
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
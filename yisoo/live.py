@@ -0,0 +1,69 @@
+"""실시간 시세 상주 보급병 - 종목별 백그라운드 스레드가 시세를 계속 받아 두고, 화면은 최신값만 꺼내 간다.
+
+같은 종목을 여러 화면(세션)이 보더라도 스레드는 하나만 돌고, 아무도 안 보는 종목은 스스로 철수한다.
+주기(interval)에 함수를 주면 매번 물어보고, None 이 오면(장이 닫힘) 받지 않고 쉰다.
+"""
+import threading
+import time
+
+IDLE_SLEEP = 30.0  # 장이 닫혀 있을 때 다시 물어보는 주기
+_POLLERS = {}
+_LOCK = threading.Lock()
+
+
+class QuotePoller:
+    """fetch() → (values, winners) 를 interval 초마다 불러 마지막 유효 시세를 보관 (values 에 'price' 가 있어야 유효)"""
+
+    def __init__(self, key, fetch, interval=2.0, idle_timeout=60.0):
+        self.key, self.fetch = key, fetch
+        self.interval, self.idle_timeout = interval, idle_timeout
+        self.values, self.winners = {}, {}
+        self.updated_at = 0.0
+        self.version = 0  # 값이 실제로 바뀔 때만 증가
+        self.errors = 0
+        self._last_read = time.monotonic()
+        self._fresh = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"quote-{key}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            # 철수 판단과 poller_for 의 재사용을 같은 자물쇠로 묶어, 막 철수하는 보급병을 넘겨주지 않는다
+            with _LOCK:
+                if time.monotonic() - self._last_read >= self.idle_timeout:
+                    if _POLLERS.get(self.key) is self:
+                        del _POLLERS[self.key]
+                    return
+            started = time.monotonic()
+            interval = self.interval() if callable(self.interval) else self.interval
+            if interval is None:
+                time.sleep(IDLE_SLEEP)
+                continue
+            try:
+                values, winners = self.fetch()
+                if values.get("price"):
+                    if values != self.values:
+                        self.values, self.winners = values, winners
+                        self.version += 1
+                    self.updated_at = time.time()
+                    self._fresh.set()
+            except Exception:
+                self.errors += 1
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def latest(self, wait=0.0):
+        """(values, winners) - 첫 시세가 아직이면 wait 초까지 기다리고, 그래도 없으면 ({}, {})"""
+        self._last_read = time.monotonic()
+        if wait and not self._fresh.is_set():
+            self._fresh.wait(wait)
+        return self.values, self.winners
+
+
+def poller_for(key, fetch, interval=2.0):
+    """key(예: 'kr:005930') 하나당 보급병 하나. 철수한 보급병은 새로 띄운다."""
+    with _LOCK:
+        poller = _POLLERS.get(key)
+        if poller is None:
+            poller = _POLLERS[key] = QuotePoller(key, fetch, interval)
+        poller._last_read = time.monotonic()
+        return poller
@@ -0,0 +1,255 @@
+"""시세 보급선 - 여러 종목 호가를 동시에 띄워 받아오고, 보급처끼리 경주시키는 장치"""
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .replay import fdr_history, http_get, yf_fast_info, yf_history
+from .shared_cache import CACHE
+from .timing import in_context, span
+
+# 상단 전황판의 5대 지표 (키 접두어 -> 야후 티커)
+GLOBAL_SYMBOLS = {"n": "^IXIC", "s": "^GSPC", "d": "^DJI", "t": "^TNX", "u": "USDKRW=X"}
+
+_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="yisoo-quote")
+
+
+def fetch_yf_quote(symbol):
+    """(현재가, 전일 종가) - fast_info 는 속성을 읽을 때마다 호출이 나가니 작업자 안에서 한 번에 읽어 둔다."""
+    with span("yf_quote", source="yf", symbol=symbol):
+        info = yf_fast_info(symbol)
+        return float(info.last_price), float(info.previous_close)
+
+
+def fetch_quotes(symbols, timeout=3.0, fetch=fetch_yf_quote):
+    """종목들을 동시에 조회해 {symbol: (현재가, 전일 종가)} 로 돌려준다.
+
+    timeout 안에 못 온 종목이나 실패한 종목은 빠진 채로(부분 결과) 반환된다.
+    """
+    with span("quotes", source="yf") as rec:
+        futures = {_POOL.submit(in_context(fetch), s): s for s in symbols}
+        done, pending = wait(futures, timeout=timeout)
+        for f in pending:
+            f.cancel()
+        quotes = {}
+        for f in done:
+            if f.exception() is None:
+                quotes[futures[f]] = f.result()
+        missing = [s for s in futures.values() if s not in quotes]
+        if missing:
+            rec.update(outcome="timeout" if pending else "partial", missing=missing)
+    return quotes
+
+
+def fetch_global_quotes(timeout=3.0):
+    """전황판용 {n_last, n_prev, ...} - 못 받은 지표는 None. 공용 창고에서 모든 세션이 함께 쓴다 (하나도 못 받으면 보관 안 함)."""
+    def load():
+        quotes = fetch_quotes(GLOBAL_SYMBOLS.values(), timeout=timeout)
+        if not quotes:
+            raise LookupError("global quotes unavailable")
+        return quotes
+
+    try:
+        quotes = CACHE.get("global", "indices", load, timeout=timeout)
+    except Exception:
+        quotes = {}
+    data = {}
+    for key, sym in GLOBAL_SYMBOLS.items():
+        data[f"{key}_last"], data[f"{key}_prev"] = quotes.get(sym, (None, None))
+    return data
+
+
+# ==============================================================================
+# ★ [보급처 경주: 같은 값을 주는 여러 곳에 동시에 요청하고 먼저 온 유효값 채택]
+# ==============================================================================
+SOURCE_WINS = Counter()  # (경주 이름, 필드, 보급처) -> 승리 횟수
+_wins_lock = threading.Lock()
+
+
+def race(label, sources, fields, timeout=3.0):
+    """sources = {보급처 이름: 호출 함수} 를 동시에 띄워 필드별로 먼저 도착한 유효값을 채택한다.
+
+    각 함수는 {필드: 값} 딕셔너리를 돌려주며, None 이거나 빈 값인 필드는 무효로 본다.
+    모든 필드가 채워지면 아직 출발 전인 요청만 취소된다. 이미 나간 요청은 멈출 수 없어 끝까지 돌고
+    (속도 제한 몫도 그대로 쓴다) 결과만 버려지니, 비싼 요청은 경주에 올리지 말고 차례로 부르시게.
+    반환: ({필드: 값}, {필드: 승리 보급처})
+    """
+    started = time.monotonic()
+    with span(label, source="race") as rec:
+        values, winners = _race(label, sources, fields, timeout)
+        rec["winners"] = winners
+        if len(values) < len(fields):
+            # 한도까지 기다렸으면 시간 초과, 아니면 모든 보급처가 빈손으로 돌아온 것
+            rec["outcome"] = "timeout" if time.monotonic() - started >= timeout else "partial"
+    return values, winners
+
+
+def _timed_source(label, name, fn, fields):
+    with span(label, source=name) as rec:
+        out = fn()
+        if not any(_valid(v) for k, v in (out or {}).items() if k in fields):
+            rec["outcome"] = "invalid"
+        return out
+
+
+def _race(label, sources, fields, timeout):
+    futures = {_POOL.submit(in_context(_timed_source), label, name, fn, fields): name for name, fn in sources.items()}
+    values, winners = {}, {}
+    pending = set(futures)
+    deadline = time.monotonic() + timeout
+    while pending and len(values) < len(fields):
+        left = deadline - time.monotonic()
+        done, pending = wait(pending, timeout=max(0, left), return_when=FIRST_COMPLETED)
+        if not done:
+            break  # 한도 초과 - 받은 것만 들고 간다
+        for f in done:
+            if f.exception() is not None:
+                continue
+            for field, val in (f.result() or {}).items():
+                if field in fields and field not in values and _valid(val):
+                    values[field], winners[field] = val, futures[f]
+    for f in pending:
+        f.cancel()  # 출발 전인 것만 빠진다 - 이미 도는 것은 끝나고 버려짐
+    with _wins_lock:
+        for field, name in winners.items():
+            SOURCE_WINS[(label, field, name)] += 1
+    return values, winners
+
+
+def _valid(val):
+    if val is None:
+        return False
+    if hasattr(val, "empty"):
+        return not val.empty
+    return val > 0
+
+
+# --- [국내 일봉 보급처] ---
+def fetch_kr_history(symbol, start):
+    """국내 일봉: FDR 먼저, 실패하거나 비었을 때만 야후 .KS / .KQ (수정주가 아닌 원 가격으로)
+
+    FDR 은 수정 전 가격이고 야후 기본값(auto_adjust)은 수정주가라, 경주로 섞이면 저장소 꼬리 갱신마다
+    가격 기준이 바뀔 수 있다. 그래서 경주하지 않고 차례로 부르며, 야후도 auto_adjust=False 로 받아 기준을 맞춘다.
+    """
+    with span("kr_history", source="fdr", symbol=symbol) as rec:
+        try:
+            df = fdr_history(symbol, start)
+            if _valid(df):
+                return df
+            rec["outcome"] = "invalid"
+        except Exception as e:
+            rec.update(outcome="fallback", error=f"{type(e).__name__}: {e}"[:200])
+    # .KS / .KQ 는 둘 중 하나만 값이 있으니 이쪽만 경주
+    sources = {
+        "yf_ks": lambda: {"history": yf_history(f"{symbol}.KS", start=start, auto_adjust=False)},
+        "yf_kq": lambda: {"history": yf_history(f"{symbol}.KQ", start=start, auto_adjust=False)},
+    }
+    values, _ = race("kr_history", sources, ("history",), timeout=5.0)
+    return values.get("history")
+
+
+# --- [미국 일봉 보급처] ---
+def fetch_us_history(symbol, start):
+    with span("us_history", source="yf", symbol=symbol) as rec:
+        try:
+            return yf_history(symbol, start=start)
+        except Exception as e:
+            rec.update(outcome="fallback", error=f"{type(e).__name__}: {e}"[:200])
+            return yf_history(symbol, period="1y")
+
+
+# --- [국내 실시간 시세 보급처] ---
+NAVER_MOBILE_HEADERS = {'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X)'}
+NAVER_PC_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+NAVER_BASIC_URL = "https://m.stock.naver.com/api/stock/{}/basic"
+NAVER_ITEM_URL = "https://finance.naver.com/item/main.naver?code={}"
+
+
+def naver_api_quote(symbol):
+    res = http_get(NAVER_BASIC_URL.format(symbol), headers=NAVER_MOBILE_HEADERS, timeout=1.5)
+    if res.status_code != 200:
+        return {}
+    data = res.json()
+    return {
+        "price": float(data['closePrice'].replace(",", "")),
+        "volume": float(data['accumulatedTradingVolume'].replace(",", "")),
+    }
+
+
+# --- [네이버 종목 화면: 한 번 받아 한 번 파싱하고 잠깐 보관] ---
+# 화면 전체를 트리로 만들지 않고 필요한 구역만 잘라 정규식으로 뽑는다.
+_NO_INFO_FIELDS = ["prev_close", "high", "upper_limit", "volume", "open", "low", "lower_limit", "trade_value"]
+_BLIND_RE = re.compile(r'<span class="blind">\s*([^<]+?)\s*</span>')
+_NAME_RE = re.compile(r'<div class="wrap_company">.*?<h2>\s*<a[^>]*>\s*([^<]+?)\s*</a>', re.S)
+
+
+def _section(html, marker, end_marker):
+    start = html.find(marker)
+    if start < 0:
+        return ""
+    end = html.find(end_marker, start)
+    return html[start:end if end > 0 else None]
+
+
+def _num(text):
+    return float(text.replace(",", ""))
+
+
+def parse_naver_item_page(html):
+    """종목명/현재가/전일/고가/상한가/거래량/시가/저가/하한가/거래대금을 한 번에 뽑는다. 못 찾은 필드는 빠진다."""
+    page = {}
+    m = _NAME_RE.search(html)
+    if m:
+        page["name"] = m.group(1)
+    today = _BLIND_RE.search(_section(html, 'class="no_today"', "</p>"))
+    if today:
+        page["price"] = _num(today.group(1))
+    for field, raw in zip(_NO_INFO_FIELDS, _BLIND_RE.findall(_section(html, 'class="no_info"', "</table>"))):
+        try:
+            page[field] = _num(raw)
+        except ValueError:
+            pass
+    return page
+
+
+def naver_item_page(symbol, timeout=2):
+    """finance.naver.com 종목 화면 파싱 결과. 공용 창고 'page' 수명 안의 재요청과 동시 요청은 한 번의 다운로드를 함께 쓴다."""
+    def load():
+        with span("naver_page", source="naver_html", symbol=symbol):
+            res = http_get(NAVER_ITEM_URL.format(symbol), headers=NAVER_PC_HEADERS, timeout=timeout)
+            return parse_naver_item_page(res.text)
+
+    return CACHE.get("page", symbol, load, timeout=timeout)
+
+
+def naver_html_quote(symbol):
+    page = naver_item_page(symbol)
+    return {"price": page.get("price"), "volume": page.get("volume")}
+
+
+def fetch_kr_quote(symbol, timeout=2.0):
+    """국내 현재가/누적거래량: 네이버 모바일 API 와 PC 화면 경주. 반환: ({price, volume}, 승리 보급처)"""
+    sources = {"naver_api": lambda: naver_api_quote(symbol), "naver_html": lambda: naver_html_quote(symbol)}
+
+    def load():
+        values, winners = race("kr_quote", sources, ("price", "volume"), timeout=timeout)
+        if "price" not in values:
+            raise LookupError(f"no quote for {symbol}")
+        return values, winners
+
+    try:
+        return CACHE.get("quote", f"kr:{symbol}", load, timeout=timeout)
+    except Exception:
+        return {}, {}
+
+
+def fetch_us_quote(symbol):
+    """미국 현재가/누적거래량/전일 종가 (yfinance fast_info). 반환 형식은 fetch_kr_quote 와 같음"""
+    def load():
+        info = yf_fast_info(symbol)
+        values = {"price": float(info.last_price), "volume": float(info.last_volume or 0.0),
+                  "prev_close": float(info.previous_close)}
+        return values, {k: "yf" for k in values}
+
+    return CACHE.get("quote", f"us:{symbol}", load)
@@ -0,0 +1,61 @@
+"""층층 기억 - 진단을 층으로 나눠 기억하고, 입력이 바뀌면 그 아래층만 다시 계산한다.
+
+화면에서 평단가·수동 입력가만 고쳐도 전체 스크립트가 다시 도니, 층마다 키를 따로 잡아 위층은 그대로 꺼내 쓴다.
+위층의 키가 아래층 키에 들어가므로, 위층이 바뀌면 아래층도 자연히 새로 계산된다.
+
+    history     (종목, 시작일) → 일봉                       공용 창고(SharedCache) 'history', 저장소 꼬리 갱신 주기
+    state       (종목, 오늘, 봉 개수, 마지막 봉) → 어제까지의 지표 상태(IndicatorState)
+    indicators  (state 키, 현재가, 누적거래량) → 오늘 봉을 얹은 최신 지표값
+    signal      (indicators 키, 전일 종가, 수동 여부, 보유 여부, 시간보정 비율, 문턱값) → 신호등·대응선
+
+층마다 LRU 한도가 있어 오래 안 쓴 것부터 버린다. 값은 여러 세션이 같이 쓰니 고쳐 쓰지 말 것.
+"""
+import threading
+from collections import Counter, OrderedDict
+
+
+class Layer:
+    """키 → 값 LRU 한 층 (max_entries 넘으면 가장 오래 안 쓴 것부터 버림)"""
+
+    def __init__(self, name, max_entries):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def get(self, key, compute):
+        """key 로 기억해 둔 값, 없으면 compute() 를 불러 기억한다 (계산은 자물쇠 밖에서)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key]
+            self._stats["misses"] += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {**{k: self._stats[k] for k in ("hits", "misses", "evictions")}, "entries": len(self._entries)}
+
+
+LAYERS = {
+    "state": Layer("state", 256),
+    "indicators": Layer("indicators", 1024),
+    "signal": Layer("signal", 1024),
+}
+
+
+def stats():
+    """{층: {hits, misses, evictions, entries}}"""
+    return {name: layer.stats() for name, layer in LAYERS.items()}
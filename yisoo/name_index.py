@@ -0,0 +1,139 @@
+"""종목명 색인 - 종목번호/티커 → 이름을 네트워크나 표 검색 없이 바로 찾고, 한글 이름으로도 종목을 찾는다."""
+import difflib
+import json
+import os
+import threading
+import time
+
+from . import DATA_DIR
+
+US_MARKETS = ("NASDAQ", "NYSE", "AMEX")
+RETRY_SEC = 300  # 다시 짓기가 실패(목록 못 받음)하면 이만큼 쉬었다가 다시
+
+
+def _norm(text):
+    return "".join(str(text).split()).lower()
+
+
+class NameIndex:
+    """KRX 종목번호와 미국 티커의 이름 사전 (JSON 한 파일로 보관)
+
+    - name(symbol): O(1) 이름 조회
+    - search(query): 번호/티커 → 정확한 이름 → 앞글자 → 포함 → 비슷한 이름 순으로 후보 반환
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DATA_DIR, "names.json")
+        self.kr, self.us = {}, {}
+        self.built_at = 0.0
+        self._by_name = {}
+        self._rebuilding = threading.Lock()
+        self._next_try = 0.0
+
+    # --- [적재/보관] ---
+    @classmethod
+    def load(cls, path=None):
+        idx = cls(path)
+        try:
+            with open(idx.path, encoding="utf-8") as f:
+                raw = json.load(f)
+            idx.kr, idx.us, idx.built_at = raw["kr"], raw["us"], raw["built_at"]
+            idx._reindex()
+        except (OSError, ValueError, KeyError):
+            pass
+        return idx
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"kr": self.kr, "us": self.us, "built_at": self.built_at}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def is_stale(self, max_age=86400):
+        return not self.kr or time.time() - self.built_at > max_age
+
+    def rebuild(self, krx_listing=None, us_listings=None):
+        """krx_listing: Code/Name 열이 있는 표, us_listings: Symbol/Name 열이 있는 표 목록. 빈 표는 기존 값을 유지한다.
+
+        국내·미국 목록을 다 받았을 때만 지은 시각을 찍는다 (하나라도 못 받았으면 계속 묵은 색인으로 남아 다시 짓게)
+        """
+        got_kr = krx_listing is not None and not krx_listing.empty
+        if got_kr:
+            self.kr = dict(zip(krx_listing["Code"].astype(str), krx_listing["Name"].astype(str)))
+        us = {}
+        for listing in us_listings or []:
+            if listing is not None and not listing.empty:
+                us.update(zip(listing["Symbol"].astype(str).str.upper(), listing["Name"].astype(str)))
+        if us:
+            self.us = us
+        if got_kr and us:
+            self.built_at = time.time()
+        self._reindex()
+        self.save()
+        return self
+
+    def refresh(self, krx_loader, us_loader):
+        """묵었으면(비었거나 하루 지남) 목록을 받아 다시 짓는다. 한 번에 하나만, 실패하면 RETRY_SEC 동안은 그냥 넘어감.
+
+        목록 받기가 느리니 화면에서는 뒤 스레드로 부르시게. 반환: 새로 지어 묵은 티를 벗었는가
+        """
+        if not self.is_stale() or time.time() < self._next_try or not self._rebuilding.acquire(blocking=False):
+            return False
+        try:
+            self._next_try = time.time() + RETRY_SEC
+            self.rebuild(krx_loader(), us_loader())
+            return not self.is_stale()
+        finally:
+            self._rebuilding.release()
+
+    def _reindex(self):
+        # 이름 → 번호 역색인 (같은 이름이면 국내 우선)
+        self._by_name = {_norm(n): t for t, n in self.us.items()}
+        self._by_name.update({_norm(n): c for c, n in self.kr.items()})
+
+    # --- [조회] ---
+    def name(self, symbol):
+        return self.kr.get(symbol) or self.us.get(symbol.upper())
+
+    def resolve(self, query):
+        """입력값 하나를 종목번호/티커로 확정 (정확히 맞는 것만, 없으면 None)"""
+        q = query.strip()
+        if q in self.kr or q.upper() in self.us:
+            return q if q in self.kr else q.upper()
+        return self._by_name.get(_norm(q))
+
+    def search(self, query, limit=10):
+        """[(번호/티커, 이름)] 후보 목록"""
+        q = _norm(query)
+        if not q:
+            return []
+        hits = []
+        exact = self.resolve(query)
+        if exact:
+            hits.append(exact)
+        names = self._by_name
+        hits += [names[n] for n in names if n.startswith(q)]
+        if len(hits) < limit:
+            hits += [names[n] for n in names if q in n]
+        if len(hits) < limit:
+            hits += [names[n] for n in difflib.get_close_matches(q, names.keys(), n=limit, cutoff=0.6)]
+        seen, out = set(), []
+        for sym in hits:
+            if sym not in seen:
+                seen.add(sym)
+                out.append((sym, self.name(sym)))
+        return out[:limit]
+
+
+def load_us_listings():
+    """FDR 로 미국 3대 거래소 상장 목록 (실패한 시장은 건너뜀)"""
+    from .replay import fdr_listing
+
+    listings = []
+    for market in US_MARKETS:
+        try:
+            listings.append(fdr_listing(market))
+        except Exception:
+            pass
+    return listings
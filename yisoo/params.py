@@ -0,0 +1,73 @@
+"""냉정 진단 문턱값 모음 - 화면/일괄 진단/과거 복기/문턱값 탐색이 같은 값을 쓰도록 한 곳에 모았다.
+
+기본값은 지금까지 화면에 박혀 있던 숫자 그대로다. 바꿔 보려면 dataclasses.replace(DEFAULT_PARAMS, rsi_bottom=30) 처럼 새로 만든다.
+"""
+from dataclasses import dataclass, fields
+
+
+@dataclass(frozen=True)
+class SignalParams:
+    """신호등(decide / backtest) 문턱값"""
+    # 바닥 지표 (볼린저 하단 근접 / RSI / Williams %R) 와 바닥 인정 점수
+    bottom_bb_margin: float = 1.02
+    rsi_bottom: float = 35.0
+    will_bottom: float = -80.0
+    bottom_min_score: int = 2
+
+    # 눌림목 동조 (Williams / 20일선 ±밴드 / RSI 구간) 와 3단계 인정 점수
+    will_pullback: float = -50.0
+    pullback_mid_band: float = 0.02
+    rsi_pullback_low: float = 40.0
+    rsi_pullback_high: float = 55.0
+    pullback_min_score: int = 2
+    wait_pullback_upper: float = 1.03
+
+    # 시간보정 거래량 강도 (진입 / 매집 / 과열)
+    vol_entry: float = 80.0
+    vol_accumulate: float = 100.0
+    vol_overheat: float = 150.0
+
+    # 볼린저 밴드폭 (극초축소 / 눌림목 활주로)
+    squeeze_bandwidth: float = 10.0
+    min_bandwidth: float = 20.0
+
+    # 5일선 과이격
+    over_extended_bias: float = 5.0
+
+    # 캔들 밑꼬리 (봉 길이 비율 / 몸통 배수) 와 추세 밑꼬리의 전일비 하한
+    tail_range_ratio: float = 0.45
+    tail_body_ratio: float = 1.3
+    trend_tail_min_chg: float = -1.5
+
+    # ATR 동적 손절폭 (하한 / 상한 / 5일선 없을 때)
+    atr_stop_min: float = 0.02
+    atr_stop_max: float = 0.05
+    atr_stop_default: float = 0.03
+
+    # 성벽(20일 고점 대비) / 수확 목표선(볼린저 상단 대비)
+    defense_ratio: float = 0.93
+    target_ratio: float = 0.97
+
+
+@dataclass(frozen=True)
+class MacroParams:
+    """글로벌 전황판 금리·환율·미 증시 경보 문턱값"""
+    tnx_spike: float = 4.5
+    tnx_calm: float = 3.8
+    tnx_friendly: float = 4.2
+    fx_extreme: float = 1450.0
+    fx_alert: float = 1400.0
+    fx_pivot: float = 1380.0
+    fx_friendly: float = 1330.0
+    fx_strategy_friendly: float = 1350.0
+    fx_move_pct: float = 0.3
+    us_big_move_pct: float = 1.0
+    us_friendly_pct: float = 0.5
+
+
+DEFAULT_PARAMS = SignalParams()
+DEFAULT_MACRO = MacroParams()
+
+
+def param_names():
+    return [f.name for f in fields(SignalParams)]
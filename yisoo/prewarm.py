@@ -0,0 +1,145 @@
+"""빠른 첫 화면 - 자물쇠 화면은 streamlit 만으로 바로 띄우고, 무거운 부품은 로그인 뒤 뒤에서 데운다.
+
+- 화면(yisoo-app.py)은 자물쇠 통과 전에는 이 모듈과 timing 만 부른다 (pandas·보급선·지표 엔진은 통과 뒤)
+- 로그인 뒤 첫 화면을 다 그리면 start() 가 한 번만 뒤에서: 안 쓴 시장의 무거운 모듈(FDR / yfinance),
+  KRX 상장 목록(공용 창고), 종목명 색인(화면이 넘겨준 캐시 손잡이로)을 미리 받아 둔다. 코어 하나에서 첫 그리기와 GIL 을 다투지 않게 그린 뒤에 돈다
+- 화면은 구간 계측에 startup 구간(gate: 자물쇠까지, inputs: 로그인 뒤 입력창까지)을 남긴다
+
+    python -m yisoo.prewarm                       # 새 프로세스로 자물쇠/첫 입력창까지 시간을 재고 예산(1초)과 비교
+    YISOO_FEED=replay python -m yisoo.prewarm --rounds 5 --budget-ms 800
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .timing import in_context, record, span
+
+STARTUP_BUDGET_MS = 1000.0
+# 시장별로 보급선이 쓰는 무거운 모듈 (국내는 FDR 일봉, 미국은 야후)
+MODULES = {"kr": ("FinanceDataReader",), "us": ("yfinance",)}
+
+_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="yisoo-prewarm")
+_lock = threading.Lock()
+_job = None
+_seen = set()
+STATUS = {}  # 예열 단계 -> {"ms", "outcome"}
+
+
+def submit(fn, *args):
+    """뒤에서 한 번 돌린다 (지금 화면의 계측 목록도 같이 실어 보냄)"""
+    return _POOL.submit(in_context(fn), *args)
+
+
+def mark(phase, started):
+    """화면 첫 그리기 구간 기록. 프로세스에서 그 구간을 처음 그린 것이면 cold=True"""
+    with _lock:
+        cold = phase not in _seen
+        _seen.add(phase)
+    record({"stage": "startup", "source": phase, "outcome": "ok", "cold": cold,
+            "ms": round((time.perf_counter() - started) * 1000, 2)})
+
+
+def _step(name, fn):
+    with span("prewarm", source=name) as rec:
+        try:
+            fn()
+        except Exception as e:
+            rec.update(outcome="error", error=f"{type(e).__name__}: {e}"[:200])
+    STATUS[name] = {"ms": rec["ms"], "outcome": rec["outcome"]}
+
+
+def _load_listing():
+    from .replay import fdr_listing
+    from .shared_cache import CACHE
+
+    CACHE.get("listing", "KRX", lambda: fdr_listing('KRX'))
+
+
+def _run(first, names=None):
+    from . import replay
+
+    if replay.MODE != "replay":  # 재생 모드에서는 FDR/야후를 부르지 않는다
+        for market in (first, *(m for m in MODULES if m != first)):
+            for mod in MODULES[market]:
+                _step(f"import:{mod}", partial(importlib.import_module, mod))
+    _step("listing:KRX", _load_listing)
+    if names is not None:
+        _step("name_index", names)
+
+
+def start(first="kr", names=None):
+    """프로세스당 한 번만 예열을 건다 (first 시장의 모듈부터). 이미 걸려 있으면 그 작업을 돌려준다.
+
+    names 는 화면이 쓰는 캐시된 종목명 색인을 (묵었으면) 제자리에서 다시 짓는 함수를 준다.
+    따로 색인을 만들어 버리면 데운 보람이 없으니, 없으면 색인 단계는 건너뛴다.
+    """
+    global _job
+    with _lock:
+        if _job is None:
+            _job = _POOL.submit(_run, first, names)
+        return _job
+
+
+# --- [첫 화면 시간 재기] ---
+_CHILD = r"""
+import json, os, sys, tempfile, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import yisoo.timing as timing
+timing.ENABLED, timing.LOG_DIR = True, tempfile.mkdtemp()
+st_ms = (time.perf_counter() - started) * 1000
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t = time.perf_counter(); at.run(); gate_wall = (time.perf_counter() - t) * 1000
+at.text_input(key="password").input(sys.argv[2])
+t = time.perf_counter(); at.run(); login_wall = (time.perf_counter() - t) * 1000
+spans = [json.loads(line) for name in os.listdir(timing.LOG_DIR)
+         for line in open(os.path.join(timing.LOG_DIR, name), encoding="utf-8")]
+startup = {s["source"]: s["ms"] for s in spans if s["stage"] == "startup" and s.get("cold")}
+print(json.dumps({"streamlit_import": st_ms, "gate_run": gate_wall, "login_run": login_wall,
+                  **{f"app:{k}": v for k, v in startup.items()}, "errors": [e.value for e in at.exception][:3]}))
+"""
+
+
+def measure_startup(app, password="1210", rounds=3):
+    """매번 새 파이썬으로 화면을 띄워 (streamlit import / 자물쇠 / 로그인 첫 그리기) ms 를 잰다"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    results = []
+    for _ in range(rounds):
+        out = subprocess.run([sys.executable, "-c", _CHILD, app, password], env=env, capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="화면 첫 그리기 시간 재기 (새 프로세스 기준)")
+    parser.add_argument("--app", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "yisoo-app.py"))
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="자물쇠·첫 입력창 각각의 예산")
+    args = parser.parse_args(argv)
+
+    results = measure_startup(args.app, rounds=args.rounds)
+    errors = [e for r in results for e in r.pop("errors")]
+    table = pd.DataFrame(results).describe().loc[["50%", "max"]].T.round(1)
+    print(table.to_string())
+    for e in errors[:3]:
+        print(f"화면 예외: {e}")
+    checked = [k for k in ("app:gate", "app:inputs") if k in table.index]
+    over = [k for k in checked if table.loc[k, "50%"] > args.budget_ms]
+    if over or errors or len(checked) < 2:
+        print(f"⚠️ 첫 화면 예산 {args.budget_ms:.0f}ms 초과 또는 계측 누락: {over or checked}")
+        sys.exit(1)
+    print(f"첫 화면 예산 {args.budget_ms:.0f}ms 안쪽이구먼.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""KRX 전 종목 가격 판 - 일봉 저장소를 (날짜 × 종목) 열 단위 파일로 떠 두고, 메모리 매핑으로 여러 프로세스가 복사 없이 같이 읽는다.
+
+- 날짜 int32 (1970-01-01 부터 일수), 시가·고가·저가·종가 float32, 거래량 int64. 모든 종목이 같은 날짜 축에 맞춰진다
+- 파일: DATA_DIR/panel/{days,open,high,low,close,volume}.npy + symbols.json (종목당 하루 24바이트, 2,700종목 × 500일 ≈ 32MB)
+- 판은 Fortran 순서라 종목 하나가 디스크에 이어져 있다: 종목 하나 읽기는 열 하나를 잘라 보는 것
+- 빈 날(상장 전·거래 정지)은 가격 NaN, 거래량 0
+- 국내 가격은 2^24 미만 정수라 float32 에 그대로 담기고, float64 로 되돌려도 저장소 값과 같다
+- 다시 만들 때는 새 폴더에 다 쓴 뒤 바꿔 끼우므로, 이미 열어 둔 프로세스는 옛 판을 끝까지 읽는다
+- 화면은 history() 로 몸통은 판에서, 판 마지막 날부터의 꼬리는 일봉 저장소에서 받아 잇는다 (판은 밤에 떠 둔 것이라 오늘 봉이 없음)
+
+    python -m yisoo.price_panel build --market KRX --days 500   # 저장소 → 판 (네트워크 없음)
+    python -m yisoo.price_panel info
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import DATA_DIR, sessions
+
+PANEL_DIR = os.path.join(DATA_DIR, "panel")
+RELOAD_SEC = 60.0  # 판이 새로 만들어졌는지 이 주기로만 확인
+PRICE_FIELDS = ("Open", "High", "Low", "Close")
+FIELDS = PRICE_FIELDS + ("Volume",)
+DTYPES = {"Open": np.float32, "High": np.float32, "Low": np.float32, "Close": np.float32, "Volume": np.int64}
+
+
+def _file(path, field):
+    return os.path.join(path, f"{field.lower()}.npy")
+
+
+class PricePanel:
+    """메모리 매핑된 (날짜 × 종목) 가격 판. 배열은 읽기 전용 - 고쳐 쓰지 말 것"""
+
+    def __init__(self, path, days, symbols, fields, built=None):
+        self.path = path
+        self.days = days          # (T,) int32
+        self.symbols = symbols    # [N]
+        self.fields = fields      # {필드: (T, N)}
+        self.built = built
+        self.col = {s: i for i, s in enumerate(symbols)}
+
+    def __contains__(self, symbol):
+        return symbol in self.col
+
+    def __len__(self):
+        return len(self.symbols)
+
+    # --- [만들기 / 열기] ---
+    @classmethod
+    def build(cls, store, symbols=None, start=None, path=None):
+        """일봉 저장소(BarStore)에서 판을 만들어 path 에 쓰고 연다. symbols 가 없으면 저장소의 국내 종목 전부."""
+        path = path or PANEL_DIR
+        long = store.load_many(symbols, start)
+        if symbols is None:
+            long = long[long["symbol"].str.isdigit()]
+        syms = sorted(long["symbol"].unique())
+        day = pd.to_datetime(long["day"]).to_numpy().astype("datetime64[D]").astype(np.int32)
+        days = np.unique(day)
+        rows = np.searchsorted(days, day)
+        cols = pd.Index(syms).get_indexer(long["symbol"])
+
+        tmp = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "days.npy"), days)
+        for field in FIELDS:
+            out = np.lib.format.open_memmap(_file(tmp, field), mode="w+", dtype=DTYPES[field],
+                                            shape=(len(days), len(syms)), fortran_order=True)
+            out[...] = 0 if field == "Volume" else np.nan
+            values = long[field].to_numpy()
+            out[rows, cols] = np.rint(values) if field == "Volume" else values
+            out.flush()
+            del out
+        with open(os.path.join(tmp, "symbols.json"), "w", encoding="utf-8") as f:
+            json.dump({"symbols": syms, "built": time.time()}, f)
+
+        # 다 쓴 뒤 바꿔 끼움 (열어 둔 매핑은 지워진 옛 파일을 계속 본다)
+        old = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path=None):
+        """판을 읽기 전용 메모리 매핑으로 연다 (없으면 FileNotFoundError)"""
+        path = path or PANEL_DIR
+        with open(os.path.join(path, "symbols.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        days = np.load(os.path.join(path, "days.npy"))
+        fields = {field: np.load(_file(path, field), mmap_mode="r") for field in FIELDS}
+        return cls(path, days, meta["symbols"], fields, meta.get("built"))
+
+    # --- [읽기] ---
+    def _start_row(self, start):
+        if start is None:
+            return 0
+        return int(np.searchsorted(self.days, np.datetime64(pd.Timestamp(start).date(), "D").astype(np.int32)))
+
+    def index(self, start=None):
+        return pd.DatetimeIndex(self.days[self._start_row(start):].astype("datetime64[D]"))
+
+    def covers(self, start):
+        """판이 start (그날 또는 그 뒤 첫 거래일) 부터 떠 있는가"""
+        if not len(self.days):
+            return False
+        start = pd.Timestamp(start).date()
+        first = start if sessions.is_trading_day("kr", start) else sessions.next_trading_day("kr", start)
+        return pd.Timestamp(self.days[0], unit="D").date() <= first
+
+    def column(self, symbol, start=None):
+        """종목 하나의 {필드: 1차원 배열} - 판을 잘라 본 것(복사 없음)"""
+        c, r = self.col[symbol], self._start_row(start)
+        return {field: arr[r:, c] for field, arr in self.fields.items()}
+
+    def frame(self, symbol, start=None):
+        """BarStore.load 와 같은 모양의 일봉 (float64, 날짜 DatetimeIndex, 데이터 있는 날만)"""
+        cols = self.column(symbol, start)
+        have = ~np.isnan(cols["Close"])
+        index = self.index(start)[have]
+        return pd.DataFrame({f: cols[f][have].astype(np.float64) for f in FIELDS}, index=index)
+
+    def arrays(self, symbols=None, start=None):
+        """indicators.build_panel 과 같은 (날짜 인덱스, 종목 목록, {필드: (T, N) float64}). 판에 없는 종목은 뺀다."""
+        symbols = list(self.symbols) if symbols is None else [s for s in dict.fromkeys(symbols) if s in self.col]
+        cols, r = [self.col[s] for s in symbols], self._start_row(start)
+        arrays = {}
+        for field, arr in self.fields.items():
+            sub = arr[r:][:, cols].astype(np.float64)
+            if field == "Volume":  # 빈 날은 가격과 같이 NaN
+                sub[np.isnan(arrays["Close"])] = np.nan
+            arrays[field] = sub
+        index = self.index(start)
+        keep = ~np.all(np.isnan(arrays["Close"]), axis=1) if symbols else np.ones(len(index), bool)
+        return index[keep], symbols, {f: a[keep] for f, a in arrays.items()}
+
+    def info(self):
+        first = pd.Timestamp(self.days[0], unit="D").date() if len(self.days) else None
+        last = pd.Timestamp(self.days[-1], unit="D").date() if len(self.days) else None
+        size = sum(os.path.getsize(_file(self.path, f)) for f in FIELDS)
+        return {"symbols": len(self.symbols), "days": len(self.days), "first": first, "last": last,
+                "mb": round(size / 2**20, 1), "built": self.built and time.strftime("%Y-%m-%d %H:%M", time.localtime(self.built))}
+
+
+# --- [화면에서 읽기] ---
+_current = None
+_checked = 0.0
+_stamp = None
+_lock = threading.Lock()
+
+
+def current(path=None):
+    """기본 판 (RELOAD_SEC 마다 판이 새로 만들어졌는지 보고 다시 연다). 없으면 None."""
+    global _current, _checked, _stamp
+    path = path or PANEL_DIR
+    now = time.monotonic()
+    if now - _checked < RELOAD_SEC and (_current is None or _current.path == path):
+        return _current
+    with _lock:
+        _checked = now
+        try:
+            stamp = os.stat(os.path.join(path, "symbols.json")).st_mtime_ns
+        except OSError:
+            _current = _stamp = None
+            return None
+        if stamp != _stamp or _current is None or _current.path != path:
+            try:
+                _current, _stamp = PricePanel.open(path), stamp
+            except (OSError, ValueError, KeyError):
+                _current = _stamp = None
+        return _current
+
+
+def history(symbol, start, store, fetcher, panel=None):
+    """BarStore.history 와 같은 일봉을, 몸통은 판에서 꼬리(판 마지막 날부터)는 store.history 로 이어 붙여서.
+
+    판에 없는 종목이거나 판이 start 부터 덮지 못하면 None (부르는 쪽이 저장소로 통째로 읽는다).
+    """
+    panel = panel or current()
+    if panel is None or symbol not in panel or not panel.covers(start):
+        return None
+    body = panel.frame(symbol, start)
+    if body.empty:
+        return None
+    tail = store.history(symbol, body.index[-1].date(), fetcher)
+    if tail.empty:
+        return body
+    return pd.concat([body[body.index < tail.index[0]], tail])
+
+
+def main(argv=None):
+    from datetime import datetime, timedelta
+
+    parser = argparse.ArgumentParser(description="KRX 전 종목 가격 판 (메모리 매핑)")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--market", choices=["KOSPI", "KOSDAQ", "KRX"], help="상장 목록의 종목만 (기본: 저장소의 국내 종목 전부)")
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--path", default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from .bar_store import BarStore
+
+        symbols = None
+        if args.market:
+            from .replay import fdr_listing
+            from .scanner import krx_universe
+            symbols = krx_universe(fdr_listing('KRX'), None if args.market == "KRX" else args.market)
+        started = time.perf_counter()
+        panel = PricePanel.build(BarStore(), symbols, (datetime.now() - timedelta(days=args.days)).date(), args.path)
+        print(f"판을 만들었구먼 ({time.perf_counter() - started:.1f}초).")
+    else:
+        panel = PricePanel.open(args.path)
+    print(panel.info())
+
+
+if __name__ == "__main__":
+    main()
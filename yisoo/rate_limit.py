@@ -0,0 +1,168 @@
+"""보급처별 호출 속도 제한 - 야후/네이버/KRX(FDR)에 초당 몇 번까지만 나가도록 토큰 양동이로 막는다.
+
+- 보급처마다 양동이 하나 (초당 rate 개씩 차고 burst 개까지 쌓임). 프로세스 단위라서, 작업 프로세스 n 개로
+  나눠 돌릴 땐 각 프로세스가 split(n) 으로 한도를 n 분의 1씩 나눠 가진다 (scanner 의 작업 프로세스 초기화)
+- 재시도도 한 번 나가는 것이니 시도마다 토큰 하나 (http_pool.get 의 provider)
+- 토큰이 없으면 줄을 서되, 실시간 시세 > 일봉 보충 > 종목명 찾기 순으로 먼저 통과
+- 용도별 최대 대기 시간을 넘기면 Throttled 로 포기 (시세는 오래 기다려 봐야 소용없으니 짧게)
+- 용도는 부르는 쪽이 with purpose("name"): 로 덮어쓸 수 있다 (스레드 풀로 넘길 땐 timing.in_context 와 함께)
+- 보급처별 통과/대기/포기 횟수와 대기 시간은 stats()
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from .timing import record
+
+# 보급처: (초당 토큰, 최대 적립)
+LIMITS = {
+    "naver": (10.0, 20),
+    "yahoo": (5.0, 10),
+    "krx": (3.0, 6),
+}
+# 용도: (우선순위 - 작을수록 먼저, 최대 대기 초)
+PURPOSES = {
+    "quote": (0, 1.0),
+    "history": (1, 10.0),
+    "name": (2, 3.0),
+}
+
+_purpose = contextvars.ContextVar("yisoo_rate_purpose", default=None)
+
+
+class Throttled(RuntimeError):
+    """최대 대기 시간 안에 토큰을 못 받은 호출"""
+
+
+class TokenBucket:
+    """우선순위 줄서기가 붙은 토큰 양동이"""
+
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._cond = threading.Condition()
+        self._queue = []  # (우선순위, 순번) - 맨 앞 차례만 토큰을 가져간다
+        self._seq = itertools.count()
+        self.stats = Counter()
+        self.wait_ms = defaultdict(float)
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self, purpose="history"):
+        """토큰 하나를 받을 때까지 기다린다. 반환: 기다린 초. 한도를 넘기면 Throttled."""
+        rank, max_wait = PURPOSES[purpose]
+        started = time.monotonic()
+        deadline = started + max_wait
+        with self._cond:
+            self._refill(started)
+            if not self._queue and self.tokens >= 1:
+                self.tokens -= 1
+                self.stats[f"{purpose}:ok"] += 1
+                return 0.0
+            ticket = (rank, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            self.stats[f"{purpose}:queued"] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._queue[0] == ticket and self.tokens >= 1:
+                        self.tokens -= 1
+                        waited = now - started
+                        self.stats[f"{purpose}:ok"] += 1
+                        self.wait_ms[purpose] += waited * 1000
+                        return waited
+                    if now >= deadline:
+                        self.stats[f"{purpose}:throttled"] += 1
+                        raise Throttled(f"{self.name}: no token within {max_wait}s ({purpose})")
+                    need = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.01
+                    self._cond.wait(min(max(need, 0.001), deadline - now))
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            self._refill(time.monotonic())
+            out = {"tokens": round(self.tokens, 2), "waiting": len(self._queue)}
+            for purpose in PURPOSES:
+                ok, queued, throttled = (self.stats[f"{purpose}:{k}"] for k in ("ok", "queued", "throttled"))
+                out.update({f"{purpose}_ok": ok, f"{purpose}_queued": queued, f"{purpose}_throttled": throttled,
+                            f"{purpose}_wait_ms": round(self.wait_ms[purpose] / queued, 1) if queued else 0.0})
+            return out
+
+
+_buckets = {}
+_lock = threading.Lock()
+
+
+def bucket(provider):
+    with _lock:
+        b = _buckets.get(provider)
+        if b is None:
+            rate, burst = LIMITS[provider]
+            b = _buckets[provider] = TokenBucket(provider, rate, burst)
+        return b
+
+
+def configure(provider, rate, burst):
+    """보급처 한도를 바꾼다 (이미 쌓인 통계는 새로 시작)"""
+    with _lock:
+        LIMITS[provider] = (rate, burst)
+        _buckets.pop(provider, None)
+
+
+def split(n):
+    """이 프로세스의 보급처 한도를 모두 n 분의 1로 (작업 프로세스 n 개가 한도 하나를 나눠 쓸 때, 초기화에서 한 번)"""
+    if n <= 1:
+        return
+    with _lock:
+        for provider, (rate, burst) in list(LIMITS.items()):
+            LIMITS[provider] = (rate / n, max(1.0, burst / n))
+            _buckets.pop(provider, None)
+
+
+@contextmanager
+def purpose(name):
+    """이 구간의 호출 용도를 지정 (예: 종목명 찾기용 화면 다운로드는 'name')"""
+    if name not in PURPOSES:
+        raise ValueError(f"unknown purpose: {name}")
+    token = _purpose.set(name)
+    try:
+        yield
+    finally:
+        _purpose.reset(token)
+
+
+def acquire(provider, default="history"):
+    """provider 로 한 번 나가기 전에 부른다. 용도는 purpose() 로 지정된 것이 있으면 그걸, 없으면 default.
+
+    줄을 섰던 호출만 구간 계측에 rate_wait 로 남긴다.
+    """
+    use = _purpose.get() or default
+    try:
+        waited = bucket(provider).acquire(use)
+    except Throttled as e:
+        record({"stage": "rate_wait", "source": provider, "purpose": use, "outcome": "throttled",
+                "ms": PURPOSES[use][1] * 1000, "error": str(e)})
+        raise
+    if waited:
+        record({"stage": "rate_wait", "source": provider, "purpose": use, "outcome": "ok", "ms": round(waited * 1000, 2)})
+    return waited
+
+
+def stats():
+    """{보급처: {tokens, waiting, <용도>_ok/_queued/_throttled/_wait_ms}}"""
+    with _lock:
+        buckets = list(_buckets.values())
+    return {b.name: b.snapshot() for b in buckets}
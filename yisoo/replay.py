@@ -0,0 +1,196 @@
+"""보급 녹화/재생 - 실제 응답을 한 번 받아 디스크에 떠 두고, 그 뒤로는 네트워크 없이 그대로 돌려준다.
+
+    YISOO_FEED=record python -m yisoo.scanner 005930 AAPL   # 평소처럼 받아 오면서 녹화
+    YISOO_FEED=replay streamlit run yisoo-app.py            # 녹화분만으로 재생 (녹화 안 된 건 FixtureMissing)
+
+- 대상: 네이버 basic JSON / 종목 화면 HTML (http_get), 야후 일봉 / 분봉 / fast_info, FDR 일봉 / 상장 목록
+- 녹화본: YISOO_FIXTURES (기본 DATA_DIR/fixtures) 아래 종류별 폴더. 응답은 JSON, 표는 pickle
+- 기본(live)은 녹화 없이 그대로 통과
+- 일봉 녹화본은 종목당 하나만 두고, 재생할 때 요청한 시작일/기간만큼 잘라 준다
+- 실제로 나가는 호출(live/record)만 보급처별 속도 제한(rate_limit)을 거친다
+"""
+import json
+import os
+import re
+from types import SimpleNamespace
+
+import pandas as pd
+
+from . import DATA_DIR
+from .rate_limit import acquire
+
+MODES = ("live", "record", "replay")
+MODE = os.environ.get("YISOO_FEED", "live")
+FIXTURE_DIR = os.environ.get("YISOO_FIXTURES") or os.path.join(DATA_DIR, "fixtures")
+
+
+class FixtureMissing(LookupError):
+    """재생 모드에서 녹화본이 없는 요청"""
+
+
+def configure(mode=None, fixture_dir=None):
+    """모드/녹화 폴더를 코드에서 바꾼다 (벤치마크·점검용)"""
+    global MODE, FIXTURE_DIR
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"unknown feed mode: {mode} (live / record / replay)")
+        MODE = mode
+    if fixture_dir is not None:
+        FIXTURE_DIR = fixture_dir
+
+
+def fixture_path(kind, key, ext):
+    safe = re.sub(r"[^0-9A-Za-z._=-]+", "_", re.sub(r"^https?://", "", str(key))).strip("_")[:150]
+    return os.path.join(FIXTURE_DIR, kind, f"{safe}.{ext}")
+
+
+# --- [녹화본 읽고 쓰기] ---
+def _write_json(path, value):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_frame(path, df):
+    tmp = path + ".tmp"
+    df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+_FORMATS = {"json": (_write_json, _read_json), "pkl": (_write_frame, pd.read_pickle)}
+
+
+def save_fixture(kind, key, value, ext="json"):
+    """녹화본 한 건 저장 (record 모드 또는 가짜 녹화본 만들 때)"""
+    path = fixture_path(kind, key, ext)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _FORMATS[ext][0](path, value)
+    return path
+
+
+def _through(kind, key, ext, fetch):
+    """모드에 따라: live 는 fetch() 그대로, record 는 fetch() 후 저장, replay 는 저장본만"""
+    if MODE == "replay":
+        path = fixture_path(kind, key, ext)
+        if not os.path.exists(path):
+            raise FixtureMissing(f"{kind}/{key}")
+        return _FORMATS[ext][1](path)
+    value = fetch()
+    if MODE == "record":
+        save_fixture(kind, key, value, ext)
+    return value
+
+
+# --- [보급처 원본 호출] ---
+class RecordedResponse:
+    """requests.Response 중 보급선이 쓰는 부분만 (status_code / text / json())"""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def http_get(url, headers=None, timeout=2.0):
+    """requests.get 대신 - 네이버 basic JSON / 종목 화면 HTML. timeout 은 재시도까지 포함한 전체 예산(초)"""
+    def fetch():
+        from . import http_pool
+
+        res = http_pool.get(url, headers=headers, budget=timeout, provider="naver")  # 토큰은 시도마다
+        return {"status_code": res.status_code, "text": res.text}
+
+    rec = _through("http", url, "json", fetch)
+    return RecordedResponse(rec["status_code"], rec["text"])
+
+
+def yf_fast_info(symbol):
+    """야후 fast_info 중 쓰는 세 값만 한 번에 읽어 둔다 (속성마다 호출이 나가므로)"""
+    def fetch():
+        import yfinance as yf
+
+        acquire("yahoo", "quote")
+        info = yf.Ticker(symbol).fast_info
+        return {"last_price": info.last_price, "previous_close": info.previous_close, "last_volume": info.last_volume}
+
+    return SimpleNamespace(**_through("fast_info", symbol, "json", fetch))
+
+
+def yf_history(symbol, start=None, period=None, auto_adjust=True):
+    """야후 일봉 (start 또는 period='1y'). auto_adjust=False 면 수정 전 원 가격 (녹화본도 따로 둔다)"""
+    def fetch():
+        import yfinance as yf
+
+        acquire("yahoo", "history")
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, auto_adjust=auto_adjust)
+        return ticker.history(period=period or "1mo", auto_adjust=auto_adjust)
+
+    key = symbol if auto_adjust else f"{symbol}_raw"
+    return _since(_through("yf_history", key, "pkl", fetch), start, period)
+
+
+def yf_intraday(symbol, period="5d", interval="1m"):
+    """야후 분봉 (거래량 분포 곡선용)"""
+    def fetch():
+        import yfinance as yf
+
+        acquire("yahoo", "history")
+        return yf.Ticker(symbol).history(period=period, interval=interval)
+
+    return _through("yf_intraday", f"{symbol}_{interval}", "pkl", fetch)
+
+
+def fdr_history(symbol, start):
+    def fetch():
+        import FinanceDataReader as fdr
+
+        acquire("krx", "history")
+        return fdr.DataReader(symbol, start=start.strftime('%Y-%m-%d'))
+
+    return _since(_through("fdr_history", symbol, "pkl", fetch), start)
+
+
+def fdr_listing(market):
+    def fetch():
+        import FinanceDataReader as fdr
+
+        acquire("krx", "name")
+        return fdr.StockListing(market)
+
+    return _through("listing", market, "pkl", fetch)
+
+
+def yf_name(symbol):
+    """야후 종목 정보의 영문 이름 (longName, 없으면 shortName)"""
+    def fetch():
+        import yfinance as yf
+
+        acquire("yahoo", "name")
+        info = yf.Ticker(symbol).info
+        return {"name": info.get('longName', info.get('shortName'))}
+
+    return _through("yf_name", symbol, "json", fetch)["name"]
+
+
+def _since(df, start=None, period=None):
+    """재생분을 요청 구간만큼 자른다 (live/record 에서는 이미 그 구간이라 그대로)"""
+    if MODE != "replay" or df is None or df.empty:
+        return df
+    if start is not None:
+        cut = pd.Timestamp(start)
+    elif period == "1y":
+        cut = df.index[-1] - pd.DateOffset(years=1)
+    else:
+        return df
+    if df.index.tz is not None and cut.tz is None:
+        cut = cut.tz_localize(df.index.tz)
+    return df[df.index >= cut]
@@ -0,0 +1,137 @@
+"""관심종목 / 전체 시장 일괄 냉정 진단 - 종목마다 diagnose_frame 을 돌리되 CPU 코어에 나눠 돌린다.
+
+    python -m yisoo.scanner 005930 000660 AAPL
+    python -m yisoo.scanner --market KOSPI --offline
+    python -m yisoo.scanner --market KRX --panel       # 가격 판을 작업 프로세스마다 매핑해 읽음
+"""
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+from functools import partial
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from .bar_store import BarStore
+from .diagnosis import SIGNAL_CODES, diagnose_frame
+
+SCAN_COLUMNS = [
+    "symbol", "final_code", "p", "p_chg", "vol_strength", "bandwidth", "defense_line",
+    "rsi_val", "will_val", "bottom_score", "pullback_rebound_score", "last_date",
+]
+
+_store = None  # 작업 프로세스마다 하나씩 여는 저장소
+_panel = None  # 작업 프로세스마다 매핑하는 가격 판 (파일은 OS 가 프로세스끼리 나눠 씀)
+
+
+def _worker_store(path=None):
+    global _store
+    if _store is None or (path and _store.path != path):
+        _store = BarStore(path)
+    return _store
+
+
+def _worker_panel(path):
+    global _panel
+    if _panel is None or _panel.path != path:
+        from .price_panel import PricePanel
+        _panel = PricePanel.open(path)
+    return _panel
+
+
+def _init_worker(workers):
+    """작업 프로세스마다 보급처 한도를 작업 수만큼 나눠 가진다 (양동이가 프로세스 단위라 안 나누면 workers 배로 나감)"""
+    from .rate_limit import split
+    split(workers)
+
+
+def scan_symbol(symbol, start, refresh=True, store_path=None, panel_path=None):
+    """종목 하나 진단 (마지막 일봉 종가를 현재가로 보고 장 마감 기준으로 판정). 실패 시 final_code 는 None.
+
+    panel_path 를 주면 저장소 대신 가격 판에서 꺼내 본다 (판에 없는 종목은 저장소에서).
+    """
+    is_kr = symbol.isdigit()
+    store = _worker_store(store_path)
+    try:
+        if refresh:
+            from .market_feed import fetch_kr_history, fetch_us_history  # 보급선은 네트워크 모드에서만 적재
+            df = store.history(symbol, start, fetch_kr_history if is_kr else fetch_us_history)
+        elif panel_path and symbol in _worker_panel(panel_path):
+            df = _panel.frame(symbol, start)
+        else:
+            df = store.load(symbol, start)
+        df = df.ffill().dropna()
+        if len(df) < 2:
+            raise ValueError("not enough bars")
+        last_day = df.index[-1].date()
+        # 장 마감 뒤 시각으로 판정해야 시간보정 없이 그날 거래량을 그대로 쓴다
+        tz = ZoneInfo('Asia/Seoul') if is_kr else ZoneInfo('America/New_York')
+        now_local = datetime.combine(last_day, time(17, 0), tzinfo=tz)
+        r = diagnose_frame(df, float(df['Close'].iloc[-1]), float(df['Volume'].iloc[-1]), now_local, is_kr)
+    except Exception:
+        return {"symbol": symbol, "final_code": None}
+    row = {k: r[k] for k in SCAN_COLUMNS if k in r}
+    row.update(symbol=symbol, last_date=last_day)
+    return row
+
+
+def scan(symbols, workers=None, refresh=True, days=500, store_path=None, panel_path=None):
+    """종목 목록 전체를 진단해 SCAN_COLUMNS 표로 돌려준다 (신호등 우선순위 → 거래량 강도 순 정렬).
+
+    store_path 를 주면 기본 저장소(DATA_DIR/bars.sqlite) 대신 그 파일을 쓴다.
+    panel_path 를 주면 (refresh=False 일 때) 가격 판을 작업 프로세스마다 매핑해 읽는다.
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    if not symbols:
+        return pd.DataFrame(columns=SCAN_COLUMNS)
+    start = (datetime.now() - timedelta(days=days)).date()
+    workers = min(workers or os.cpu_count() or 1, len(symbols))
+    job = partial(scan_symbol, start=start, refresh=refresh, store_path=store_path, panel_path=panel_path)
+    if workers == 1 or len(symbols) == 1:
+        rows = list(map(job, symbols))
+    else:
+        chunk = max(1, len(symbols) // (workers * 4))
+        # fork 는 화면 서버처럼 스레드가 도는 프로세스에서 남이 쥔 자물쇠(공용 창고·속도 제한·logging)까지 복사해
+        # 작업 프로세스가 멈출 수 있다 - 새 파이썬으로 띄운다 (대신 작업마다 import 비용이 한 번 든다)
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(workers,)) as pool:
+            rows = list(pool.map(job, symbols, chunksize=chunk))
+    out = pd.DataFrame(rows, columns=SCAN_COLUMNS)
+    rank = out["final_code"].map({c: i for i, c in enumerate(SIGNAL_CODES)}).fillna(len(SIGNAL_CODES))
+    return out.assign(_rank=rank).sort_values(["_rank", "vol_strength"], ascending=[True, False]).drop(columns="_rank")
+
+
+def krx_universe(listing, market=None):
+    """KRX 상장 목록에서 종목번호 추출 (market: 'KOSPI' / 'KOSDAQ' / None=전체)"""
+    if listing is None or listing.empty:
+        return []
+    if market and "Market" in listing.columns:
+        listing = listing[listing["Market"] == market]
+    return listing["Code"].astype(str).tolist()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="관심종목 일괄 냉정 진단")
+    parser.add_argument("symbols", nargs="*", help="종목번호 또는 티커")
+    parser.add_argument("--market", choices=["KOSPI", "KOSDAQ", "KRX"], help="KRX 시장 전체를 진단")
+    parser.add_argument("--offline", action="store_true", help="저장된 일봉만 사용 (네트워크 호출 없음)")
+    parser.add_argument("--panel", action="store_true", help="가격 판(python -m yisoo.price_panel build)에서 읽음 (--offline 포함)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    symbols = list(args.symbols)
+    if args.market:
+        from .replay import fdr_listing
+        symbols += krx_universe(fdr_listing('KRX'), None if args.market == "KRX" else args.market)
+    if args.panel:
+        from .price_panel import PANEL_DIR
+    result = scan(symbols, workers=args.workers, refresh=not (args.offline or args.panel),
+                  panel_path=PANEL_DIR if args.panel else None)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""화면 없는 냉정 진단 - 종목 하나를 받아 일봉·시세를 모으고 신호등과 대응 가이드를 dict 로 돌려준다.
+
+봇이나 예약 작업이 Streamlit 재실행·웹소켓 없이 바로 부르는 창구. 화면과 같은 부품
+(공용 창고 / 일봉 저장소 / 증분 지표)을 쓰니 같은 종목을 자주 물어도 보급은 창고 수명마다 한 번이다.
+
+    python -m yisoo.service 005930 AAPL --avg 70000          # 진단 결과 JSON 한 줄씩
+    python -m yisoo.service --serve --port 8765               # HTTP 창구
+        GET /diagnose?symbol=005930&price=71000&avg=70000
+        GET /diagnose?symbols=005930,000660,AAPL
+        GET /health
+"""
+import argparse
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo
+
+from .bar_store import BarStore
+from .incremental import diagnose_layered
+from .market_feed import fetch_kr_history, fetch_kr_quote, fetch_us_history, fetch_us_quote
+from .name_index import NameIndex
+from .params import DEFAULT_PARAMS
+from .shared_cache import CACHE
+from .timing import span
+from .volume_profile import volume_curve
+
+HISTORY_DAYS = 500
+MAX_BATCH = 200
+
+# 신호등 코드 → 한 줄 요약 (화면 신호등 제목과 같은 뜻)
+SIGNAL_LABELS = {
+    "STOP_LOSS_ALERT": "🚨 [비상 손절] 바닥권 전저점 붕괴",
+    "RED_SELL_WARNING": "🟡 [경계] 성벽 위 음봉 출현 / 분할 익절 준비",
+    "RED_SELL_TARGET": "🔴 [매도] 수확 목표선 도달",
+    "YELLOW_CAUTION": "🟡 [경계] 성벽 위 공방 / 매도 준비",
+    "WAIT_OVER_EXTENDED": "🟡 [관망/경계] 5일선 과다이격 / 추격 매수 금지",
+    "BOTTOM_ENTRY": "🟢 [매입] 1단계 진바닥 입질 매수 (소량)",
+    "ESCAPE_BUY": "🟢 [매수] 2단계 진바닥 탈출 추가 매수",
+    "PULLBACK_BUY": "🔵 [매수] 3단계 눌림목 추가 매수",
+    "WAIT_INDICATOR": "🟡 [관망/보류] 5일선 회복 시도 중이나 지표 미흡",
+    "WAIT_MACD": "🟡 [관망/보류] 엔진 역회전 심화",
+    "WAIT_VOLUME": "🟡 [입질 대기] 거래량 수반 대기",
+    "WAIT_PULLBACK": "🟡 [관망/보류] 눌림목 지표 동조 미흡",
+    "WAIT_GENERAL": "🟡 [관망] 조건 미충족 / 뇌동매매 금지",
+}
+
+_store = None
+_names = None
+_init_lock = threading.Lock()
+
+
+def _bar_store():
+    global _store
+    with _init_lock:
+        if _store is None:
+            _store = BarStore()
+        return _store
+
+
+def _name_index():
+    # 디스크 색인만 읽는다 (다시 짓는 건 화면 쪽 몫)
+    global _names
+    with _init_lock:
+        if _names is None:
+            _names = NameIndex.load()
+        return _names
+
+
+def resolve_symbol(query):
+    """종목번호/티커는 그대로, 종목명(예: 삼성전자)은 색인으로 찾아 바꾼다"""
+    symbol = (query or "").strip().upper()
+    if not symbol:
+        raise ValueError("symbol is required")
+    if not symbol.isdigit():
+        symbol = _name_index().resolve(query.strip()) or symbol
+    return symbol
+
+
+def _history(symbol, start):
+    key = (symbol, start.date())
+    fetcher = fetch_kr_history if symbol.isdigit() else fetch_us_history
+    df = CACHE.get("history", key, lambda: _bar_store().history(symbol, start, fetcher))
+    if df.empty:
+        CACHE.invalidate("history", key)
+    return df
+
+
+def _quote(symbol, df):
+    """(현재가, 누적거래량, 전일 종가 또는 None, 보급처) - 못 받으면 마지막 일봉으로"""
+    is_kr = symbol.isdigit()
+    try:
+        values, winners = fetch_kr_quote(symbol) if is_kr else fetch_us_quote(symbol)
+    except Exception:
+        values, winners = {}, {}
+    if values.get("price"):
+        return values["price"], values.get("volume") or 0.0, values.get("prev_close"), winners
+    return float(df['Close'].iloc[-1]), float(df['Volume'].iloc[-1]), None, {"price": "history", "volume": "history"}
+
+
+def _plain(val):
+    """JSON 으로 내보낼 수 있게 numpy 값·NaN 정리"""
+    if isinstance(val, (list, tuple)):
+        return [_plain(v) for v in val]
+    if hasattr(val, "item"):
+        val = val.item()
+    if isinstance(val, float) and not math.isfinite(val):
+        return None
+    return val
+
+
+def holder_guide(d, p, avg_price):
+    """보유 평단가 맞춤 대응선 (평단가 0 이면 미보유 기준)"""
+    guide = {"defense_line": d["defense_line"], "stop_loss_price": d["stop_loss_price"],
+             "dynamic_stop_pct": d["dynamic_stop_pct"], "dynamic_stop_price": d["dynamic_stop_price"],
+             "target_price": d["target_price_100"]}
+    if avg_price and avg_price > 0:
+        guide.update(avg_price=avg_price, profit_rate=(p - avg_price) / avg_price * 100, in_profit=p >= avg_price)
+    return {k: _plain(v) for k, v in guide.items()}
+
+
+def diagnose(symbol, manual_price=None, avg_price=0, now=None, params=DEFAULT_PARAMS):
+    """종목 하나 냉정 진단. manual_price 를 주면 자동 시세 대신 그 값으로 판정한다 (화면의 수동 입력과 같음).
+
+    반환: {symbol, name, market, currency, as_of, price, prev_close, change_pct, manual, quote_source,
+           signal, signal_label, guide, indicators}
+    일봉을 못 받으면 LookupError.
+    """
+    symbol = resolve_symbol(symbol)
+    is_kr = symbol.isdigit()
+    tz = ZoneInfo('Asia/Seoul') if is_kr else ZoneInfo('America/New_York')
+    now_local = now.astimezone(tz) if now else datetime.now(tz)
+
+    with span("service_diagnose", source="service", symbol=symbol):
+        df = _history(symbol, datetime.now() - timedelta(days=HISTORY_DAYS))
+        if df.empty:
+            raise LookupError(f"no history for {symbol}")
+        p, v_curr, prev_p, quote_src = _quote(symbol, df)
+        is_manual = bool(manual_price and manual_price > 0)
+        if is_manual:
+            p, quote_src = float(manual_price), {"price": "manual"}
+        d = diagnose_layered(symbol, df, p, v_curr, now_local, is_kr,
+                             prev_p=prev_p if not is_kr else None, is_manual_mode=is_manual,
+                             user_avg_price=avg_price or 0.0, params=params, volume_curve=volume_curve(symbol))
+
+    return {
+        "symbol": symbol,
+        "name": _name_index().name(symbol),
+        "market": "KR" if is_kr else "US",
+        "currency": "KRW" if is_kr else "USD",
+        "as_of": now_local.isoformat(timespec="seconds"),
+        "price": _plain(p),
+        "prev_close": _plain(d["prev_p"]),
+        "change_pct": _plain(d["p_chg"]),
+        "manual": is_manual,
+        "quote_source": quote_src,
+        "signal": d["final_code"],
+        "signal_label": SIGNAL_LABELS.get(d["final_code"], d["final_code"]),
+        "guide": holder_guide(d, p, avg_price),
+        "indicators": {k: _plain(v) for k, v in d.items() if k != "final_code"},
+    }
+
+
+def diagnose_many(symbols, avg_price=0, workers=16):
+    """여러 종목을 동시에 진단. 실패한 종목은 {symbol, error} 로 채운다."""
+    def one(sym):
+        try:
+            return diagnose(sym, avg_price=avg_price)
+        except Exception as e:
+            return {"symbol": sym, "error": f"{type(e).__name__}: {e}"}
+
+    symbols = list(dict.fromkeys(s.strip() for s in symbols if s and s.strip()))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(symbols)))) as pool:
+        return list(pool.map(one, symbols))
+
+
+# --- [HTTP 창구] ---
+class DiagnosisHandler(BaseHTTPRequestHandler):
+    server_version = "yisoo/1"
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == "/health":
+                return self._send(200, {"ok": True, "cache": CACHE.stats()})
+            if url.path != "/diagnose":
+                return self._send(404, {"error": "not found"})
+            avg = float(q.get("avg") or 0)
+            if "symbols" in q:
+                symbols = q["symbols"].split(",")
+                if len(symbols) > MAX_BATCH:
+                    return self._send(400, {"error": f"too many symbols (max {MAX_BATCH})"})
+                return self._send(200, diagnose_many(symbols, avg_price=avg))
+            price = float(q["price"].replace(",", "")) if q.get("price") else None
+            return self._send(200, diagnose(q.get("symbol", ""), manual_price=price, avg_price=avg))
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+        except LookupError as e:
+            self._send(404, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 찍지 않음 (구간 계측 로그에 service_diagnose 로 남는다)
+
+
+def serve(host="127.0.0.1", port=8765):
+    httpd = ThreadingHTTPServer((host, port), DiagnosisHandler)
+    httpd.daemon_threads = True
+    print(f"냉정 진단 창구: http://{host}:{port}/diagnose?symbol=005930")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="화면 없는 냉정 진단 (CLI / HTTP)")
+    parser.add_argument("symbols", nargs="*", help="종목번호, 티커 또는 종목명")
+    parser.add_argument("--price", type=float, default=None, help="수동 현재가 (종목 하나일 때)")
+    parser.add_argument("--avg", type=float, default=0.0, help="보유 평단가")
+    parser.add_argument("--serve", action="store_true", help="HTTP 창구로 띄움")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        return serve(args.host, args.port)
+    if not args.symbols:
+        parser.error("종목을 하나 이상 적으시게 (또는 --serve)")
+    if args.price is not None and len(args.symbols) == 1:
+        try:
+            results = [diagnose(args.symbols[0], manual_price=args.price, avg_price=args.avg)]
+        except Exception as e:
+            results = [{"symbol": args.symbols[0], "error": f"{type(e).__name__}: {e}"}]
+    else:
+        results = diagnose_many(args.symbols, avg_price=args.avg)
+    for r in results:
+        print(json.dumps(r, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""장 달력 - KRX/NYSE 휴장일·단축장·장 전/장 후 시간을 알고, 장 상태에 맞춰 시세 수명과 새로고침 주기를 정한다.
+
+- 장 상태: pre(장 전) / regular(정규장) / after(장 후 시간외) / closed(그 밖, 주말·휴장일 포함)
+  국내: 08:30 장 전 동시호가 · 09:00~15:30 정규장 · 18:00 시간외 단일가 끝
+  미국: 04:00 프리마켓 · 09:30~16:00 정규장 · 20:00 애프터마켓 끝 (현지 시각)
+- 휴장일: 미국은 NYSE 규칙(대체 휴일·성금요일 포함)으로 계산하고, 국내는 음력 명절·대체·임시공휴일이 섞여 연도별 표로 둔다
+  (표에 없는 해는 양력 공휴일·연말 휴장만 거름). 새로 지정된 임시공휴일은 DATA_DIR/holidays.json 에
+  {"kr": ["2026-06-03"], "us": []} 처럼 적으면 된다
+- 단축장: 미국 독립기념일 전날·추수감사절 다음 날·성탄 전날 13:00 마감, 국내 새해 첫 거래일 10:00 개장·수능일 10:00~16:30
+- 장 상태별 수명(REFRESH)과 실시간 주기(POLL): 정규장엔 촘촘히, 장 전/후엔 느슨히, 닫혀 있으면 실시간 보급을 멈춘다.
+  수명은 다음에 장 상태가 바뀌는 시각을 넘지 않는다 (개장 직후 첫 시세가 밤새 묵은 값이 되지 않게)
+
+    python -m yisoo.sessions                        # 지금 두 시장 상태·다음 전환·수명
+    python -m yisoo.sessions --year 2026 --market kr  # 그해 휴장일·단축장
+"""
+import argparse
+import functools
+import json
+import os
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from . import DATA_DIR
+
+MARKETS = {
+    "kr": {"tz": ZoneInfo('Asia/Seoul'), "open": time(9, 0), "close": time(15, 30),
+           "pre": timedelta(minutes=30), "after": timedelta(hours=2, minutes=30), "settle": timedelta(minutes=10)},
+    "us": {"tz": ZoneInfo('America/New_York'), "open": time(9, 30), "close": time(16, 0),
+           "pre": timedelta(hours=5, minutes=30), "after": timedelta(hours=4), "settle": timedelta(minutes=30)},
+}
+STATES = ("pre", "regular", "after", "closed")
+# 장 상태별 보관 수명(초) - 종류별. 닫힌 장의 값은 다음 장 전까지 안 바뀐다
+REFRESH = {
+    "quote": {"regular": 3.0, "pre": 15.0, "after": 15.0, "closed": 1800.0},
+    "global": {"regular": 10.0, "pre": 30.0, "after": 30.0, "closed": 1800.0},
+}
+# 장 상태별 실시간 주기(초) - 닫힌 장은 None (실시간 보급 멈춤)
+POLL = {"regular": 3.0, "pre": 15.0, "after": 15.0, "closed": None}
+HOLIDAYS_FILE = os.path.join(DATA_DIR, "holidays.json")
+
+# KRX 휴장일 (주말 제외, 거래소 공지 기준). 새해 첫날·연말 휴장 포함
+KR_HOLIDAYS = {
+    2025: ("01-01", "01-27", "01-28", "01-29", "01-30", "03-03", "05-01", "05-05", "05-06", "06-03", "06-06",
+           "08-15", "10-03", "10-06", "10-07", "10-08", "10-09", "12-25", "12-31"),
+    2026: ("01-01", "02-16", "02-17", "02-18", "03-02", "05-01", "05-05", "05-25", "06-03", "08-17",
+           "09-24", "09-25", "10-05", "10-09", "12-25", "12-31"),
+    2027: ("01-01", "02-08", "02-09", "03-01", "05-05", "05-13", "08-16", "09-14", "09-15", "09-16",
+           "10-04", "10-11", "12-27", "12-31"),
+}
+# 표에 없는 해: 양력 공휴일만 (대체 휴일·명절은 모름)
+KR_FIXED = ("01-01", "03-01", "05-01", "05-05", "06-06", "08-15", "10-03", "10-09", "12-25")
+# 개장·마감 시각이 바뀌는 날 (새해 첫 거래일 10:00 개장, 수능일 10:00~16:30)
+KR_SHIFTED = {
+    "2025-01-02": (time(10, 0), time(15, 30)), "2025-11-13": (time(10, 0), time(16, 30)),
+    "2026-01-02": (time(10, 0), time(15, 30)), "2026-11-19": (time(10, 0), time(16, 30)),
+    "2027-01-04": (time(10, 0), time(15, 30)), "2027-11-18": (time(10, 0), time(16, 30)),
+}
+US_EARLY_CLOSE = time(13, 0)
+
+Hours = namedtuple("Hours", "pre open close after")  # 그날 장 시각 (시장 현지 시각, tz 포함)
+
+
+def market_of(symbol):
+    """종목번호(숫자)면 국내, 아니면 미국"""
+    return "kr" if str(symbol).isdigit() else "us"
+
+
+# --- [휴장일] ---
+@functools.lru_cache(maxsize=1)
+def _extra():
+    """DATA_DIR/holidays.json 의 추가 휴장일 {시장: {date}}"""
+    try:
+        with open(HOLIDAYS_FILE, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {m: {date.fromisoformat(d) for d in days} for m, days in raw.items()}
+
+
+def _observed(day):
+    """토요일 휴일은 금요일, 일요일 휴일은 월요일에 쉰다 (NYSE)"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _nth_weekday(year, month, weekday, n):
+    """그달 n 번째(음수면 뒤에서) weekday"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-n - 1))
+
+
+def _easter(year):
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l_ = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l_) // 433
+    month = (h + l_ - 7 * m + 90) // 25
+    return date(year, month, (h + l_ - 7 * m + 33 * month + 19) % 32)
+
+
+@functools.lru_cache(maxsize=32)
+def holidays(market, year):
+    """그해 평일 휴장일 집합"""
+    if market == "kr":
+        days = {date.fromisoformat(f"{year}-{md}") for md in KR_HOLIDAYS.get(year, KR_FIXED)}
+        if year not in KR_HOLIDAYS:  # 연말 휴장: 12/31 이 주말이면 그 앞 평일
+            last = date(year, 12, 31)
+            while last.weekday() >= 5:
+                last -= timedelta(days=1)
+            days.add(last)
+    else:
+        new_year = date(year, 1, 1)
+        days = {
+            _nth_weekday(year, 1, 0, 3), _nth_weekday(year, 2, 0, 3),   # 마틴 루서 킹, 대통령의 날
+            _easter(year) - timedelta(days=2),                          # 성금요일
+            _nth_weekday(year, 5, 0, -1), _observed(date(year, 7, 4)),  # 현충일, 독립기념일
+            _nth_weekday(year, 9, 0, 1), _nth_weekday(year, 11, 3, 4),  # 노동절, 추수감사절
+            _observed(date(year, 12, 25)),
+        }
+        if new_year.weekday() != 5:  # 새해가 토요일이면 전날(작년 12/31)에 쉬지 않는다
+            days.add(_observed(new_year))
+        if year >= 2022:
+            days.add(_observed(date(year, 6, 19)))
+    days |= {d for d in _extra().get(market, ()) if d.year == year}
+    return frozenset(d for d in days if d.weekday() < 5)
+
+
+def is_trading_day(market, day):
+    return day.weekday() < 5 and day not in holidays(market, day.year)
+
+
+def next_trading_day(market, day):
+    """day 다음 거래일"""
+    day += timedelta(days=1)
+    while not is_trading_day(market, day):
+        day += timedelta(days=1)
+    return day
+
+
+def previous_trading_day(market, day):
+    """day 전 거래일"""
+    day -= timedelta(days=1)
+    while not is_trading_day(market, day):
+        day -= timedelta(days=1)
+    return day
+
+
+# --- [장 시각 / 상태] ---
+@functools.lru_cache(maxsize=64)
+def hours(market, day):
+    """그날 장 시각 Hours(pre, open, close, after). 휴장일이면 None."""
+    if not is_trading_day(market, day):
+        return None
+    cfg = MARKETS[market]
+    opens, closes = cfg["open"], cfg["close"]
+    if market == "kr":
+        opens, closes = KR_SHIFTED.get(day.isoformat(), (opens, closes))
+    elif _us_early_close(day):
+        closes = US_EARLY_CLOSE
+    o = datetime.combine(day, opens, tzinfo=cfg["tz"])
+    c = datetime.combine(day, closes, tzinfo=cfg["tz"])
+    pre = datetime.combine(day, time(4, 0), tzinfo=cfg["tz"]) if market == "us" else o - cfg["pre"]
+    return Hours(pre, o, c, c + cfg["after"])
+
+
+def _us_early_close(day):
+    """독립기념일 전날·추수감사절 다음 날·성탄 전날 (평일이고 그날 휴장이 아닐 때)"""
+    y = day.year
+    candidates = (date(y, 7, 3), _nth_weekday(y, 11, 3, 4) + timedelta(days=1), date(y, 12, 24))
+    return day in candidates and is_trading_day("us", day)
+
+
+def _local(market, now):
+    tz = MARKETS[market]["tz"]
+    return now.astimezone(tz) if now else datetime.now(tz)
+
+
+def state(market, now=None):
+    """지금 장 상태: pre / regular / after / closed"""
+    now = _local(market, now)
+    h = hours(market, now.date())
+    if h is None or now < h.pre or now >= h.after:
+        return "closed"
+    if now < h.open:
+        return "pre"
+    return "regular" if now < h.close else "after"
+
+
+def next_change(market, now=None):
+    """다음에 장 상태가 바뀌는 시각 (시장 현지 시각)"""
+    now = _local(market, now)
+    day = now.date()
+    for _ in range(15):
+        h = hours(market, day)
+        if h is not None:
+            for t in h:
+                if t > now:
+                    return t
+        day += timedelta(days=1)
+    return now + timedelta(days=1)
+
+
+def settled_day(market, now=None):
+    """종가가 확정된 가장 최근 거래일 (오늘 장이 열려 있고 아직 마감 정산 전이면 None)"""
+    now = _local(market, now)
+    h = hours(market, now.date())
+    if h is not None and now >= h.open:
+        return now.date() if now >= h.close + MARKETS[market]["settle"] else None
+    return previous_trading_day(market, now.date())
+
+
+# --- [수명 / 실시간 주기] ---
+def refresh_sec(market=None, kind="quote", now=None):
+    """장 상태에 맞는 보관 수명(초). market 이 None 이면 두 시장 중 짧은 쪽 (글로벌 지표처럼 양쪽을 다 볼 때)"""
+    if market is None:
+        return min(refresh_sec(m, kind, now) for m in MARKETS)
+    now = _local(market, now)
+    until = (next_change(market, now) - now).total_seconds()
+    return max(1.0, min(REFRESH[kind][state(market, now)], until))
+
+
+def poll_interval(market=None, now=None, regular=POLL["regular"]):
+    """실시간 주기(초). 정규장은 regular, 장 전/후는 그보다 느슨히, 닫혀 있으면 None.
+    market 이 None 이면 열린 시장 중 가장 촘촘한 쪽."""
+    if market is None:
+        return min(filter(None, (poll_interval(m, now, regular) for m in MARKETS)), default=None)
+    st = state(market, now)
+    if st == "closed":
+        return None
+    return regular if st == "regular" else max(regular, POLL[st])
+
+
+def quote_ttl(key):
+    """공용 창고 'quote' 수명 - 키 'kr:005930' / 'us:AAPL' 의 시장 상태를 따른다"""
+    market = key.split(":", 1)[0]
+    return refresh_sec(market if market in MARKETS else None, "quote")
+
+
+def global_ttl(key):
+    """공용 창고 'global' 수명 - 미국 지수·국채와 원달러를 같이 보니 두 시장 중 짧은 쪽"""
+    return refresh_sec(None, "global")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="장 달력 (휴장일·단축장·장 상태별 수명)")
+    parser.add_argument("--year", type=int, help="그해 휴장일·단축장 출력")
+    parser.add_argument("--market", choices=list(MARKETS), default=None)
+    args = parser.parse_args(argv)
+
+    markets = [args.market] if args.market else list(MARKETS)
+    if args.year:
+        for m in markets:
+            print(f"[{m}] 휴장일: {', '.join(d.strftime('%m-%d(%a)') for d in sorted(holidays(m, args.year)))}")
+            day, end = date(args.year, 1, 1), date(args.year, 12, 31)
+            normal = (MARKETS[m]["open"], MARKETS[m]["close"])
+            while day <= end:
+                h = hours(m, day)
+                if h is not None and (h.open.time(), h.close.time()) != normal:
+                    print(f"[{m}] 단축·변경: {day} {h.open:%H:%M}~{h.close:%H:%M}")
+                day += timedelta(days=1)
+        return
+    for m in markets:
+        now = _local(m, None)
+        print(f"[{m}] {now:%Y-%m-%d %H:%M %a} {state(m, now)} → 다음 전환 {next_change(m, now):%m-%d %H:%M}, "
+              f"시세 수명 {refresh_sec(m, 'quote', now):.0f}초, 실시간 {poll_interval(m, now) or '멈춤'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""프로세스 공용 보급 창고 - 모든 화면(세션)이 같은 시세/일봉/상장목록을 함께 쓴다.
+
+- 종류별 수명(TTL): 장중 시세는 짧게, 일봉은 길게, 상장목록은 하루.
+  시세·글로벌 지표는 장 달력(sessions)을 따라 정규장엔 짧게, 장이 닫혀 있으면 다음 장 전까지 길게
+- 단일 출격(single-flight): 같은 키를 동시에 찾으면 한 번만 받아 오고 나머지는 그 결과를 기다린다
+- 실패는 보관하지 않는다 (다음 요청이 다시 받아 옴)
+- 종류별 적중/헛걸음/합류/실패 계수
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Future
+
+from . import sessions
+
+# 종류 -> 수명(초) 또는 키를 받아 수명을 돌려주는 함수
+TTLS = {
+    "quote": sessions.quote_ttl,    # 국내/미국 현재가·거래량 (정규장 3초)
+    "page": 10.0,        # 네이버 종목 화면 파싱 결과
+    "global": sessions.global_ttl,  # 글로벌 5대 지표 (정규장 10초)
+    "history": 600.0,    # 일봉 (저장소 꼬리 갱신 주기와 같음)
+    "listing": 86400.0,  # KRX/미국 상장 목록
+    "profile": 3600.0,   # 장중 거래량 분포 곡선 (실패 시 기본 곡선을 한 시간 쓰고 다시 시도)
+}
+
+
+class LoaderAborted(RuntimeError):
+    """받아 오던 쪽이 예외 아닌 중단(KeyboardInterrupt·SystemExit·streamlit 재실행/정지)으로 빠져나감 - 기다리던 쪽은 다시 부르면 된다"""
+
+
+class SharedCache:
+    """{(종류, 키): (만료 시각, Future)} - 반환값은 여러 세션이 같이 쓰니 고쳐 쓰지 말 것"""
+
+    def __init__(self, ttls=None, max_entries=4096):
+        self.ttls = dict(TTLS, **(ttls or {}))
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(Counter)
+
+    def get(self, kind, key, loader, timeout=None):
+        """loader() 결과를 kind 의 수명 동안 보관해 돌려준다. 다른 세션이 받아 오는 중이면 timeout 초까지 기다린다."""
+        now = time.monotonic()
+        ck = (kind, key)
+        with self._lock:
+            hit = self._entries.get(ck)
+            if hit and hit[0] > now:
+                fut, owner = hit[1], False
+                self._stats[kind]["hits" if fut.done() else "coalesced"] += 1
+            else:
+                fut, owner = Future(), True
+                self._stats[kind]["misses"] += 1
+                if len(self._entries) >= self.max_entries:
+                    self._evict(now)
+                ttl = self.ttls.get(kind, 10.0)
+                self._entries[ck] = (now + (ttl(key) if callable(ttl) else ttl), fut)
+        if not owner:
+            return fut.result(timeout=timeout)
+        try:
+            fut.set_result(loader())
+        except BaseException as e:
+            # 어떤 식으로 빠져나가든 자리를 비우고 기다리는 쪽을 풀어 줘야 한다 (안 그러면 수명 내내 매달림)
+            with self._lock:
+                if self._entries.get(ck, (None, None))[1] is fut:
+                    del self._entries[ck]
+                self._stats[kind]["errors"] += 1
+            if isinstance(e, Exception):
+                fut.set_exception(e)
+            else:
+                # 중단 신호는 받아 오던 세션 것이니, 기다리던 다른 세션에는 보통 예외로 넘기고 여기서는 그대로 다시 던짐
+                aborted = LoaderAborted(f"{kind}/{key}: loader aborted ({type(e).__name__})")
+                aborted.__cause__ = e
+                fut.set_exception(aborted)
+                raise
+        return fut.result()
+
+    def _evict(self, now):
+        # 만료분부터 치우고, 그래도 넘치면 곧 만료될 순서로 절반 정리
+        for ck in [ck for ck, (exp, _) in self._entries.items() if exp <= now]:
+            del self._entries[ck]
+        if len(self._entries) >= self.max_entries:
+            for ck, _ in sorted(self._entries.items(), key=lambda kv: kv[1][0])[:self.max_entries // 2]:
+                del self._entries[ck]
+
+    def invalidate(self, kind=None, key=None):
+        with self._lock:
+            for ck in [ck for ck in self._entries if (kind is None or ck[0] == kind) and (key is None or ck[1] == key)]:
+                del self._entries[ck]
+
+    def stats(self):
+        """{종류: {hits, coalesced, misses, errors, entries}}"""
+        with self._lock:
+            entries = Counter(ck[0] for ck in self._entries)
+            return {kind: {**{k: c[k] for k in ("hits", "coalesced", "misses", "errors")}, "entries": entries[kind]}
+                    for kind, c in self._stats.items()}
+
+
+CACHE = SharedCache()
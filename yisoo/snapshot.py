@@ -0,0 +1,238 @@
+"""저녁 지표 스냅샷 - 장 마감 뒤 종목마다 '마감 봉까지의 지표 상태(IndicatorState)'를 한 판에 떠 두고,
+아침 화면은 그 상태에 오늘 시세만 얹는다 (09:00 몰릴 때 일봉 pandas 연산을 거의 안 함).
+
+- 담는 것: 이평·볼린저용 종가 꼬리(119봉), 250일 고저·성벽·전저점용 고가/저가 꼬리(249봉), 거래량·ATR·RSI 꼬리,
+  MACD/신호선 EWM 상태, 전일 RSI·Williams·종가 (바닥 기억용 2봉)
+- 파일: DATA_DIR/snapshot/{필드}.npy (종목 × 칸 float64, 오른쪽 정렬) + meta.json. 메모리 매핑으로 열어 종목 한 줄만 읽는다
+  (종목당 약 5KB, 2,700종목 ≈ 15MB)
+- 맞는지 확인: 스냅샷의 마감 봉 개수·마지막 날짜·종가가 지금 일봉의 '오늘 전까지' 부분과 같을 때만 쓴다.
+  다르면(밤사이 봉이 더 들어왔거나 고쳐졌거나 스냅샷이 없으면) 예전처럼 일봉으로 새로 만든다
+- 화면은 '오늘 - 500일'부터의 일봉으로 상태를 만드니 스냅샷도 다음 거래일(기본: 장 달력의 국내 다음 거래일)의 구간으로 뜬다
+  (달력이 모르는 임시 휴장이 끼면 그날은 맞지 않아 예전처럼 만든다)
+- 장중에 만들면 오늘 부분 봉까지 마감 봉으로 들어가 그날은 맞지 않으니, 장 마감 뒤(예: 매일 18:00 cron)에 돌린다
+
+    python -m yisoo.snapshot build                  # 가격 판(있으면) 또는 저장소의 국내 종목 전부
+    python -m yisoo.snapshot build 005930 AAPL
+    python -m yisoo.snapshot info
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from . import DATA_DIR
+
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshot")
+SCALARS = ("prev_close", "vol_sum_all", "low_min_all", "tr_sum_all",
+           "ew12_w", "ew12_o", "ew26_w", "ew26_o", "ew9_w", "ew9_o", "macd", "signal", "last_close")
+MIN_BARS = 2
+RELOAD_SEC = 60.0  # 파일이 바뀌었는지 이 주기로만 확인
+
+
+def _tail_width():
+    from .incremental import IndicatorState
+
+    return dict(IndicatorState.TAILS, recent_close=2, recent_rsi=2, recent_will=2)
+
+
+class Snapshot:
+    """메모리 매핑된 지표 스냅샷. 배열은 읽기 전용"""
+
+    def __init__(self, path, symbols, m, last_day, arrays, built=None):
+        self.path = path
+        self.symbols = symbols
+        self.row = {s: i for i, s in enumerate(symbols)}
+        self.m = m                # (N,) int32 마감 봉 개수
+        self.last_day = last_day  # (N,) int32 마지막 마감 봉 날짜 (1970-01-01 부터 일수)
+        self.arrays = arrays      # {"scalars": (N, len(SCALARS)), 꼬리 이름: (N, 칸)}
+        self.built = built
+
+    def __contains__(self, symbol):
+        return symbol in self.row
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @classmethod
+    def build(cls, frames, path=None):
+        """{종목: 마감 봉 일봉} → 스냅샷 파일을 쓰고 연다 (봉이 MIN_BARS 미만인 종목은 뺀다)"""
+        from .diagnosis import day_index
+        from .incremental import IndicatorState
+
+        path = path or SNAPSHOT_DIR
+        widths = _tail_width()
+        symbols, m, last_day, rows = [], [], [], []
+        for sym, df in frames.items():
+            if df is None or len(df) < MIN_BARS:
+                continue
+            closed = day_index(df.ffill().dropna())
+            if len(closed) < MIN_BARS:
+                continue
+            st = IndicatorState(closed)
+            rows.append((st, float(closed['Close'].iloc[-1])))
+            symbols.append(sym)
+            m.append(st.m)
+            last_day.append(closed.index[-1].to_datetime64().astype("datetime64[D]").astype(np.int32))
+
+        n = len(symbols)
+        arrays = {"scalars": np.full((n, len(SCALARS)), np.nan)}
+        arrays.update({name: np.full((n, w), np.nan) for name, w in widths.items()})
+        for i, (st, last_close) in enumerate(rows):
+            arrays["scalars"][i] = [st.prev_close, st.vol_sum_all, st.low_min_all, st.tr_sum_all,
+                                    st.ew12[0], st.ew12[1], st.ew26[0], st.ew26[1], st.ew9[0], st.ew9[1],
+                                    st.last_macd[0], st.last_macd[1], last_close]
+            for name, w in widths.items():
+                tail = st.recent[name[7:]] if name.startswith("recent_") else getattr(st, name)
+                if len(tail):
+                    arrays[name][i, w - len(tail):] = list(tail)
+
+        tmp = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "m.npy"), np.asarray(m, np.int32))
+        np.save(os.path.join(tmp, "last_day.npy"), np.asarray(last_day, np.int32))
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), arr)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"symbols": symbols, "scalars": SCALARS, "built": time.time()}, f)
+        old = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path=None):
+        """스냅샷을 읽기 전용 메모리 매핑으로 연다 (없으면 FileNotFoundError)"""
+        path = path or SNAPSHOT_DIR
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if tuple(meta.get("scalars", ())) != SCALARS:
+            raise ValueError(f"snapshot layout changed, rebuild: {path}")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ("scalars", *_tail_width())}
+        return cls(path, meta["symbols"], np.load(os.path.join(path, "m.npy")),
+                   np.load(os.path.join(path, "last_day.npy")), arrays, meta.get("built"))
+
+    def state(self, symbol, partial=None):
+        """종목 한 줄을 IndicatorState 로 (없으면 None)"""
+        from .incremental import IndicatorState
+
+        i = self.row.get(symbol)
+        if i is None:
+            return None
+        scalars = dict(zip(SCALARS, self.arrays["scalars"][i].tolist()))
+        tails = {name: self.arrays[name][i] for name in IndicatorState.TAILS}
+        recent = {key: self.arrays[f"recent_{key}"][i] for key in ("close", "rsi", "will")}
+        return IndicatorState.restore(int(self.m[i]), scalars, tails, recent, partial)
+
+    def matches(self, symbol, n_closed, last_day, last_close):
+        """지금 일봉의 마감 부분(개수·마지막 날짜·종가)이 스냅샷과 같은가"""
+        i = self.row.get(symbol)
+        return (i is not None and int(self.m[i]) == n_closed and int(self.last_day[i]) == last_day
+                and self.arrays["scalars"][i, -1] == last_close)
+
+    def info(self):
+        days = pd.to_datetime(np.asarray(self.last_day, "datetime64[D]")) if len(self) else pd.DatetimeIndex([])
+        return {"symbols": len(self), "last_day": days.max().date() if len(days) else None,
+                "mb": round(sum(a.nbytes for a in self.arrays.values()) / 2**20, 1),
+                "built": self.built and time.strftime("%Y-%m-%d %H:%M", time.localtime(self.built))}
+
+
+# --- [화면/창구에서 찾기] ---
+_current = None
+_checked = 0.0
+_stamp = None
+_lock = threading.Lock()
+
+
+def current(path=None):
+    """기본 스냅샷 (RELOAD_SEC 마다 파일이 새로 만들어졌는지 보고 다시 연다). 없으면 None."""
+    global _current, _checked, _stamp
+    path = path or SNAPSHOT_DIR
+    now = time.monotonic()
+    if now - _checked < RELOAD_SEC and (_current is None or _current.path == path):
+        return _current
+    with _lock:
+        _checked = now
+        try:
+            stamp = os.stat(os.path.join(path, "meta.json")).st_mtime_ns
+        except OSError:
+            _current = _stamp = None
+            return None
+        if stamp != _stamp or _current is None or _current.path != path:
+            try:
+                _current, _stamp = Snapshot.open(path), stamp
+            except (OSError, ValueError, KeyError):
+                _current = _stamp = None
+        return _current
+
+
+def lookup(symbol, df, today_date, snap=None):
+    """일봉(df)의 오늘 전 부분이 스냅샷과 같으면 그 상태에 오늘 부분 봉(있으면)을 붙여 돌려준다. 아니면 None."""
+    snap = snap or current()
+    if snap is None or symbol not in snap or df is None or df.empty:
+        return None
+    index = df.index
+    if not isinstance(index, pd.DatetimeIndex) or index.tz is not None:
+        return None
+    today = pd.Timestamp(today_date)
+    k = int(index.searchsorted(today))
+    if k < MIN_BARS or k < len(index) - 1:  # 오늘 뒤 봉이 있으면 보지 않음
+        return None
+    values = df.to_numpy(dtype=np.float64)
+    close = df.columns.get_loc('Close')
+    last_day = int(index[k - 1].to_datetime64().astype("datetime64[D]").astype(np.int32))
+    if np.isnan(values[:k]).any() or not snap.matches(symbol, k, last_day, float(values[k - 1, close])):
+        return None
+    partial = None
+    if k < len(index):
+        if index[k] != today:
+            return None
+        if np.isnan(values[k]).any():
+            return None
+        o, h, lo = (float(values[k, df.columns.get_loc(c)]) for c in ('Open', 'High', 'Low'))
+        partial = (o, h, lo)
+    return snap.state(symbol, partial)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="저녁 지표 스냅샷 (아침 화면은 오늘 시세만 얹음)")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("symbols", nargs="*", help="종목번호 또는 티커 (없으면 가격 판 또는 저장소의 국내 종목 전부)")
+    parser.add_argument("--days", type=int, default=500, help="화면과 같은 일봉 구간(일)")
+    parser.add_argument("--for-day", type=date.fromisoformat, default=None, help="이 날 아침 화면용 (기본: 국내 다음 거래일)")
+    parser.add_argument("--path", default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        print(Snapshot.open(args.path).info())
+        return
+    from .bar_store import BarStore
+    from .price_panel import PricePanel
+    from .sessions import next_trading_day
+
+    start = (args.for_day or next_trading_day("kr", date.today())) - timedelta(days=args.days)
+    store = BarStore()
+    try:
+        panel = PricePanel.open()
+    except (OSError, ValueError):
+        panel = None
+    symbols = [s.strip().upper() for s in args.symbols] or (
+        list(panel.symbols) if panel is not None else sorted(store.load_many(start=start)["symbol"].loc[lambda s: s.str.isdigit()].unique()))
+    started = time.perf_counter()
+    # 화면(load_history)과 같은 구간을 잘라야 이평·EWM 값이 같다
+    frames = {s: panel.frame(s, start) if panel is not None and s in panel else store.load(s, start) for s in symbols}
+    snap = Snapshot.build(frames, args.path)
+    print(f"스냅샷을 떴구먼 ({time.perf_counter() - started:.1f}초).")
+    print(snap.info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""문턱값 탐색기 - SignalParams 조합 수천 개를 CPU 코어에 나눠 과거 복기로 채점한다.
+
+가격 판(OHLCV)과 지표 판은 부모 프로세스에서 한 번만 계산해 공유 메모리에 올리고,
+작업 프로세스는 그것을 복사 없이 붙여 문턱값과 무관한 중간 판(signal_base)을 한 번 만든 뒤
+조합마다 문턱값 비교와 매매 복기만 다시 한다.
+
+    python -m yisoo.sweep 005930 000660 --grid rsi_bottom=30,35,40 vol_entry=60,80,100
+    python -m yisoo.sweep --market KOSPI --offline --grid min_bandwidth=10,15,20 over_extended_bias=3,5,7
+    python -m yisoo.sweep --panel --grid rsi_bottom=30,35,40
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .backtest import codes_from_base, ffill_panel, load_frames, signal_base, trade_stats
+from .indicators import build_panel, compute_indicators
+from .params import DEFAULT_PARAMS, SignalParams
+
+_PRICE_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+_worker = {}  # 작업 프로세스마다: 공유 메모리 손잡이, 종가 판, signal_base 결과
+
+
+def grid(base=DEFAULT_PARAMS, **ranges):
+    """grid(rsi_bottom=[30, 35], vol_entry=[60, 80]) → 모든 조합의 SignalParams 목록"""
+    names = [f.name for f in fields(SignalParams)]
+    unknown = set(ranges) - set(names)
+    if unknown:
+        raise ValueError(f"unknown params: {sorted(unknown)}")
+    keys = list(ranges)
+    return [replace(base, **dict(zip(keys, combo))) for combo in itertools.product(*(ranges[k] for k in keys))]
+
+
+# --- [공유 메모리 판] ---
+def _share(arrays):
+    """{이름: 배열} → (공유 메모리 목록, {이름: (블록 이름, shape, dtype)})"""
+    blocks, meta = [], {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        meta[name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, meta
+
+
+def _attach(meta):
+    arrays = {}
+    for name, (block, shape, dtype) in meta.items():
+        shm = shared_memory.SharedMemory(name=block)  # 정리(unlink)는 만든 쪽(부모)이 한다
+        _worker.setdefault("blocks", []).append(shm)
+        arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+    return arrays
+
+
+def _init_worker(meta):
+    arrays = _attach(meta)
+    ind = {k[4:]: v for k, v in arrays.items() if k.startswith("ind:")}
+    o, h, lo, c, v = (arrays[f] for f in _PRICE_FIELDS)
+    _worker["close"] = c
+    _worker["base"] = signal_base(o, h, lo, c, v, ind)
+
+
+def _score(params):
+    flat, held = codes_from_base(_worker["base"], params)
+    return trade_stats(_worker["close"], flat, held)
+
+
+# --- [탐색] ---
+def sweep(arrays, combos, workers=None, ind=None):
+    """가격 판 {Open/High/Low/Close/Volume: (T, N)} 과 SignalParams 목록 → 조합별 성적표 (평균 수익률 순)"""
+    combos = list(combos)
+    prices = {f: ffill_panel(arrays[f]) for f in _PRICE_FIELDS}
+    ind = compute_indicators(prices["High"], prices["Low"], prices["Close"]) if ind is None else ind
+    workers = min(workers or os.cpu_count() or 1, max(1, len(combos)))
+
+    if workers == 1:
+        _worker.update(close=prices["Close"], base=signal_base(*(prices[f] for f in _PRICE_FIELDS), ind))
+        rows = list(map(_score, combos))
+    else:
+        blocks, meta = _share({**prices, **{f"ind:{k}": v for k, v in ind.items()}})
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(meta,)) as pool:
+                rows = list(pool.map(_score, combos, chunksize=max(1, len(combos) // (workers * 4))))
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    defaults = asdict(DEFAULT_PARAMS)
+    changed = sorted({k for c in combos for k, v in asdict(c).items() if v != defaults[k]})
+    table = pd.DataFrame([{**{k: getattr(c, k) for k in changed}, **r} for c, r in zip(combos, rows)])
+    return table.sort_values("avg_ret", ascending=False, ignore_index=True)
+
+
+def _parse_grid(items):
+    types = {f.name: f.type for f in fields(SignalParams)}
+    ranges = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if name not in types or not values:
+            raise SystemExit(f"잘못된 --grid 항목: {item} (예: rsi_bottom=30,35,40)")
+        cast = int if types[name] in (int, "int") else float
+        ranges[name] = [cast(v) for v in values.split(",")]
+    return ranges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="신호등 문턱값 탐색 (과거 복기 채점)")
+    parser.add_argument("symbols", nargs="*", help="종목번호 또는 티커")
+    parser.add_argument("--market", choices=["KOSPI", "KOSDAQ", "KRX"], help="KRX 시장 전체로 채점")
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--offline", action="store_true", help="저장된 일봉만 사용 (네트워크 호출 없음)")
+    parser.add_argument("--panel", action="store_true", help="가격 판(python -m yisoo.price_panel build)에서 읽음 (네트워크 호출 없음)")
+    parser.add_argument("--grid", nargs="+", default=[], metavar="NAME=V1,V2", help="SignalParams 필드별 후보값")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    symbols = [s.strip().upper() for s in args.symbols]
+    if args.market:
+        from .replay import fdr_listing
+        from .scanner import krx_universe
+        symbols += krx_universe(fdr_listing('KRX'), None if args.market == "KRX" else args.market)
+    start = (datetime.now() - timedelta(days=int(args.years * 365))).date()
+    if args.panel:
+        from .price_panel import PricePanel
+        _, found, arrays = PricePanel.open().arrays(symbols or None, start)
+    else:
+        frames = {s: df for s, df in load_frames(symbols, start, refresh=not args.offline).items() if not df.empty}
+        found = list(frames)
+        if frames:
+            _, _, arrays = build_panel(frames)
+    if not found:
+        raise SystemExit("일봉이 없구먼.")
+    combos = grid(**_parse_grid(args.grid))
+    result = sweep(arrays, combos, workers=args.workers)
+    with pd.option_context("display.max_rows", args.top, "display.width", 200):
+        print(result.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""구간별 속도 계측 - 보급(네트워크)·연산·화면 구간마다 걸린 시간과 결과를 남긴다.
+
+    with span("kr_quote", source="naver_api") as rec:
+        ...
+        rec["outcome"] = "fallback"   # 기본은 ok, 예외는 error / timeout 으로 자동 기록
+
+- 모든 구간은 DATA_DIR/timing/YYYY-MM-DD.jsonl 에 한 줄씩 쌓인다 (YISOO_TIMING=0 이면 끔)
+- start_trace() 를 부른 흐름(화면 한 번 그리기)에서는 구간 목록을 따로 모아 디버그 사이드바에 보여 준다
+- 하루치 p50/p95 집계: python -m yisoo.timing [--day 2026-10-16]
+"""
+import argparse
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from . import DATA_DIR
+
+LOG_DIR = os.path.join(DATA_DIR, "timing")
+ENABLED = os.environ.get("YISOO_TIMING", "1") != "0"
+
+_trace = contextvars.ContextVar("yisoo_trace", default=None)
+_write_lock = threading.Lock()
+
+
+def _outcome_of(exc):
+    if isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__:
+        return "timeout"
+    return "error"
+
+
+@contextmanager
+def span(stage, source=None, **extra):
+    """stage 구간 계측. 예외는 기록만 하고 그대로 올려 보낸다."""
+    rec = {"stage": stage, "source": source, "outcome": "ok", **extra}
+    started = time.perf_counter()
+    try:
+        yield rec
+    except BaseException as e:
+        rec["outcome"] = _outcome_of(e)
+        rec["error"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        rec["ms"] = round((time.perf_counter() - started) * 1000, 2)
+        record(rec)
+
+
+def timed(stage, source=None):
+    """함수 전체를 span 으로 감싸는 장식자"""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(stage, source):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def record(rec):
+    rec.setdefault("ts", time.time())
+    spans = _trace.get()
+    if spans is not None:
+        spans.append(rec)
+    if ENABLED:
+        line = json.dumps(rec, ensure_ascii=False, default=str)
+        try:
+            with _write_lock:
+                os.makedirs(LOG_DIR, exist_ok=True)
+                with open(os.path.join(LOG_DIR, f"{date.today():%Y-%m-%d}.jsonl"), "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError:
+            pass
+
+
+def start_trace():
+    """지금 흐름에서 생기는 구간을 모을 목록을 새로 건다 (화면 한 번 그릴 때마다)"""
+    spans = []
+    _trace.set(spans)
+    return spans
+
+
+def in_context(fn):
+    """스레드 풀로 넘길 함수에 지금의 trace 를 같이 실어 보낸다"""
+    ctx = contextvars.copy_context()
+    return lambda *a, **kw: ctx.run(fn, *a, **kw)
+
+
+# --- [하루치 집계] ---
+def load_log(day=None):
+    import pandas as pd
+
+    path = os.path.join(LOG_DIR, f"{day or date.today():%Y-%m-%d}.jsonl")
+    rows = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    pass
+    except OSError:
+        pass
+    return pd.DataFrame(rows)
+
+
+def summarize(log):
+    """구간·보급처별 호출 수, p50/p95/최대(ms), 결과 비율"""
+    import pandas as pd
+
+    if log.empty:
+        return pd.DataFrame()
+    log = log.assign(source=log["source"].fillna("-"))
+    g = log.groupby(["stage", "source"])
+    out = g["ms"].describe(percentiles=[0.5, 0.95])[["count", "50%", "95%", "max"]]
+    out.columns = ["count", "p50_ms", "p95_ms", "max_ms"]
+    share = pd.crosstab([log["stage"], log["source"]], log["outcome"], normalize="index")
+    return out.join(share).sort_values("p95_ms", ascending=False)
+
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="구간별 속도 계측 집계 (p50/p95)")
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="YYYY-MM-DD (기본: 오늘)")
+    args = parser.parse_args(argv)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(summarize(load_log(args.day)).round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
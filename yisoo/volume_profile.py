@@ -0,0 +1,214 @@
+"""장중 거래량 분포 곡선 - 종목마다 '장 시작 후 m분까지 하루 거래량의 몇 %가 찼나'를 분봉으로 재 두고,
+시간보정 거래량 강도를 직선(경과분/390) 대신 이 곡선으로 나눈다.
+
+- 곡선: 391칸 float32 (0분 ~ 390분, 0 → 1 단조 증가). 최근 며칠 분봉의 날별 누적 비율 중앙값
+- 보관: 모든 종목 곡선을 (종목 수 × 391) 한 판에 모아 DATA_DIR/volume_profile.npz 로 (종목당 1.5KB), 7일 지나면 다시 만듦
+- 조회: 분 단위 선형 보간 한 번이라 새로고침마다 O(1)
+- 분봉이 없거나 모자라면 시장별 기본 U자 곡선 (장 초반·막판 몰림, 국내는 종가 단일가 포함)
+
+    python -m yisoo.volume_profile 005930 AAPL     # 곡선을 만들어 저장하고 구간별 누적 비율 출력
+"""
+import argparse
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import DATA_DIR
+from .shared_cache import CACHE
+
+SESSION_MINUTES = 390
+CURVE_LEN = SESSION_MINUTES + 1
+SESSION_OPEN = {True: (9, 0), False: (9, 30)}  # is_kr -> (시, 분) 현지 시각
+MIN_FRACTION = 0.005  # 장 시작 직후 나눗셈 폭주 방지용 바닥
+MIN_DAY_MINUTES = 300  # 이보다 분봉이 적은 날(반일장·당일 진행 중)은 곡선에서 뺀다
+
+
+# --- [곡선 만들기] ---
+@functools.lru_cache(maxsize=2)
+def default_curve(is_kr):
+    """분봉이 없을 때 쓰는 시장 기본 곡선: 장 초반과 막판에 몰리는 U자 분포 (국내는 15:30 종가 단일가 몫 포함)"""
+    t = np.arange(SESSION_MINUTES, dtype=np.float64) + 0.5
+    if is_kr:
+        per_min = 1 + 5 * np.exp(-t / 12) + 1.5 * np.exp(-(SESSION_MINUTES - t) / 15)
+        per_min[-1] += 0.06 * per_min.sum()
+    else:
+        per_min = 1 + 3 * np.exp(-t / 15) + 4 * np.exp(-(SESSION_MINUTES - t) / 20)
+    curve = _normalize(np.concatenate([[0.0], np.cumsum(per_min)]))
+    curve.flags.writeable = False  # 여러 종목이 같이 쓰는 값
+    return curve
+
+
+def _normalize(cum):
+    cum = np.maximum.accumulate(np.asarray(cum, dtype=np.float64))
+    return (cum / cum[-1]).astype(np.float32) if cum[-1] > 0 else None
+
+
+def curve_from_minutes(bars, is_kr):
+    """분봉(DatetimeIndex 현지 시각, Volume) → 곡선. 장 마감까지 온전한 날의 누적 비율 중앙값. 쓸 날이 없으면 None."""
+    if bars is None or bars.empty:
+        return None
+    idx = pd.DatetimeIndex(bars.index)
+    h, m = SESSION_OPEN[is_kr]
+    offset = (idx.hour * 60 + idx.minute - (h * 60 + m)).to_numpy()
+    # 마감 시각 봉(국내 15:30 단일가)은 마지막 칸에 넣는다
+    keep = (offset >= 0) & (offset <= SESSION_MINUTES)
+    offset = np.minimum(offset, SESSION_MINUTES - 1)
+    vol = bars['Volume'].to_numpy(dtype=np.float64)
+    day = idx.normalize().to_numpy()
+
+    days = []
+    for d in np.unique(day[keep]):
+        sel = keep & (day == d)
+        if np.count_nonzero(sel) < MIN_DAY_MINUTES:
+            continue
+        per_min = np.bincount(offset[sel], weights=vol[sel], minlength=SESSION_MINUTES)
+        if per_min.sum() > 0:
+            days.append(np.concatenate([[0.0], np.cumsum(per_min)]) / per_min.sum())
+    if not days:
+        return None
+    return _normalize(np.median(np.vstack(days), axis=0))
+
+
+def build_curve(symbol):
+    """최근 5일 1분봉으로 곡선을 만든다 (국내는 야후 .KS, 없으면 .KQ)"""
+    from .replay import yf_intraday
+
+    is_kr = symbol.isdigit()
+    for ticker in ([f"{symbol}.KS", f"{symbol}.KQ"] if is_kr else [symbol]):
+        try:
+            curve = curve_from_minutes(yf_intraday(ticker), is_kr)
+        except Exception:
+            curve = None
+        if curve is not None:
+            return curve
+    return None
+
+
+def expected_fraction(curve, elapsed_min):
+    """장 시작 후 elapsed_min 분까지 찼어야 할 하루 거래량 비율 (첫 1분봉까지는 찬 것으로 본다)"""
+    m = min(max(elapsed_min, 1.0), float(SESSION_MINUTES))
+    i = min(int(m), SESSION_MINUTES - 1)
+    frac = curve[i] + (curve[i + 1] - curve[i]) * (m - i)
+    return max(float(frac), MIN_FRACTION)
+
+
+# --- [곡선 보관소] ---
+class ProfileStore:
+    """모든 종목 곡선을 (종목 수 × 391) float32 한 판에 모아 두는 보관소"""
+
+    def __init__(self, path=None, max_age_days=7):
+        self.path = path or os.path.join(DATA_DIR, "volume_profile.npz")
+        self.max_age_days = max_age_days
+        self.index = {}
+        self.curves = np.zeros((0, CURVE_LEN), np.float32)
+        self.built = np.zeros(0, np.int32)  # 만든 날 (1970-01-01 부터 일수)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=None, max_age_days=7):
+        store = cls(path, max_age_days)
+        try:
+            with np.load(store.path) as z:
+                store.curves, store.built = z["curves"].astype(np.float32), z["built"].astype(np.int32)
+                store.index = {str(s): i for i, s in enumerate(z["symbols"])}
+        except (OSError, KeyError, ValueError):
+            pass
+        return store
+
+    def save(self):
+        with self._lock:
+            symbols = np.array(sorted(self.index, key=self.index.get))
+            curves, built = self.curves.copy(), self.built.copy()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, symbols=symbols, curves=curves, built=built)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _today():
+        return int(time.time() // 86400)
+
+    def get(self, symbol):
+        """곡선 (없거나 max_age_days 지났으면 None)"""
+        with self._lock:
+            row = self.index.get(symbol)
+            if row is None or self._today() - self.built[row] > self.max_age_days:
+                return None
+            return self.curves[row]
+
+    def put(self, symbol, curve):
+        with self._lock:
+            row = self.index.get(symbol)
+            if row is None:
+                row = self.index[symbol] = len(self.curves)
+                self.curves = np.vstack([self.curves, np.zeros((1, CURVE_LEN), np.float32)])
+                self.built = np.append(self.built, np.int32(0))
+            self.curves[row] = curve
+            self.built[row] = self._today()
+
+
+_store = None
+_store_lock = threading.Lock()
+_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="yisoo-profile")
+
+
+def default_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore.load()
+        return _store
+
+
+def _build_and_keep(symbol, store):
+    curve = build_curve(symbol)
+    if curve is None:
+        return default_curve(symbol.isdigit())
+    store.put(symbol, curve)
+    store.save()
+    return curve
+
+
+def volume_curve(symbol, store=None, wait=True):
+    """종목 곡선. 보관분이 없거나 오래되면 분봉으로 다시 만들고, 못 만들면 시장 기본 곡선.
+
+    wait=False 면 만드는 일은 뒤에서 돌리고 이번엔 기본 곡선을 돌려준다 (화면이 분봉 다운로드를 기다리지 않게).
+    같은 종목을 동시에 만들지 않도록 공용 창고 'profile' 로 한 번만 출격한다.
+    """
+    s = store or default_store()
+    curve = s.get(symbol)
+    if curve is not None:
+        return curve
+    job = functools.partial(CACHE.get, "profile", symbol, functools.partial(_build_and_keep, symbol, s))
+    if wait:
+        return job()
+    _POOL.submit(job)
+    return default_curve(symbol.isdigit())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="장중 거래량 분포 곡선 만들기")
+    parser.add_argument("symbols", nargs="+", help="종목번호 또는 티커")
+    args = parser.parse_args(argv)
+    store = default_store()
+    marks = [10, 30, 60, 120, 195, 300, 360, 389, 390]
+    rows = {}
+    for sym in (s.strip().upper() for s in args.symbols):
+        curve = build_curve(sym)
+        if curve is None:
+            print(f"{sym}: 분봉이 모자라 시장 기본 곡선을 쓰구먼.")
+            curve = default_curve(sym.isdigit())
+        else:
+            store.put(sym, curve)
+        rows[sym] = [round(expected_fraction(curve, m) * 100, 1) for m in marks]
+    store.save()
+    print(pd.DataFrame(rows, index=[f"{m}분" for m in marks]).T.to_string())
+
+
+if __name__ == "__main__":
+    main()